@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class OfferBulkStatusEnum(str, Enum):
+    """
+    Enumeration for the outcome of a single offer in a bulk ingest.
+    """
+    CREATED = 'created'
+    UPDATED = 'updated'
+    SKIPPED = 'skipped'
@@ -0,0 +1,10 @@
+from enum import Enum
+
+
+class OfferCountEnum(Enum):
+    """
+    Enumeration for the ways of counting offers matching a listing.
+    """
+    EXACT = 'exact'
+    ESTIMATE = 'estimate'
+    NONE = 'none'
@@ -9,3 +9,4 @@ class OfferSortEnum(Enum):
     PRICE_HIGHEST = 'price_highest'
     NEWEST = 'newest'
     OLDEST = 'oldest'
+    RELEVANCE = 'relevance'
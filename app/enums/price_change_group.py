@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class PriceChangeGroupEnum(str, Enum):
+    """
+    Enumeration for the grouping of offer price change statistics.
+    """
+    CITY = 'city'
+    CATEGORY = 'category'
@@ -5,7 +5,9 @@ from config.settings import settings
 from routers.api import router
 from utils.init_db import create_tables
 from tasks.celery_worker import create_notifications
-from config.database import get_db
+from config.database import get_db, SessionLocal
+from models.offer_price_history import create_partitions
+from utils.location_cache import warm_location_cache
 
 app = FastAPI(
     debug=bool(settings.DEBUG),
@@ -16,9 +18,14 @@ app = FastAPI(
 @app.on_event("startup")
 def on_startup() -> None:
     """
-    Initializes the database tables when the application starts up.
+    Initializes the database tables and the upcoming price history partitions, and warms the
+    location caches when the application starts up.
     """
     create_tables()
+    with SessionLocal() as session:
+        create_partitions(session.connection())
+        session.commit()
+        warm_location_cache(session)
 
 
 if settings.DEBUG:
@@ -0,0 +1,89 @@
+"""Offer listing indexes
+
+Composite and partial indexes matching the filter and sort combinations of
+`GET /api/v1/offer`, plus the foreign key index used to load offer photos.
+Tables themselves are still created by `utils.init_db.create_tables`, which
+also creates these indexes on fresh databases, hence `if_not_exists`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_offers_created_at_id", "offers", ["created_at", "id"], if_not_exists=True)
+    op.create_index("ix_offers_price_id", "offers", ["price", "id"], if_not_exists=True)
+    op.create_index("ix_offers_city_id", "offers", ["city_id"], if_not_exists=True)
+    op.create_index(
+        "ix_offers_category_sub_category_created_at",
+        "offers",
+        ["category", "sub_category", "created_at", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_offers_category_sub_category_price",
+        "offers",
+        ["category", "sub_category", "price", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_offers_furnished_category_sub_category_created_at",
+        "offers",
+        ["category", "sub_category", "created_at", "id"],
+        postgresql_where=sa.text("furniture = true"),
+        sqlite_where=sa.text("furniture = 1"),
+        if_not_exists=True,
+    )
+    if op.get_bind().dialect.name == "postgresql":
+        # Descending twins for NEWEST and PRICE_HIGHEST, which sort DESC NULLS LAST
+        created_at_desc = [sa.text("created_at DESC NULLS LAST"), sa.text("id DESC")]
+        price_desc = [sa.text("price DESC NULLS LAST"), sa.text("id DESC")]
+        op.create_index("ix_offers_created_at_id_desc", "offers", created_at_desc, if_not_exists=True)
+        op.create_index("ix_offers_price_id_desc", "offers", price_desc, if_not_exists=True)
+        op.create_index(
+            "ix_offers_category_sub_category_created_at_desc",
+            "offers",
+            ["category", "sub_category", *created_at_desc],
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_offers_category_sub_category_price_desc",
+            "offers",
+            ["category", "sub_category", *price_desc],
+            if_not_exists=True,
+        )
+        op.create_index(
+            "ix_offers_furnished_category_sub_category_created_at_desc",
+            "offers",
+            ["category", "sub_category", *created_at_desc],
+            postgresql_where=sa.text("furniture = true"),
+            if_not_exists=True,
+        )
+    op.create_index("ix_photos_offer_id", "photos", ["offer_id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_photos_offer_id", table_name="photos", if_exists=True)
+    op.drop_index("ix_offers_furnished_category_sub_category_created_at_desc", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_category_sub_category_price_desc", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_category_sub_category_created_at_desc", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_price_id_desc", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_created_at_id_desc", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_furnished_category_sub_category_created_at", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_category_sub_category_price", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_category_sub_category_created_at", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_city_id", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_price_id", table_name="offers", if_exists=True)
+    op.drop_index("ix_offers_created_at_id", table_name="offers", if_exists=True)
@@ -0,0 +1,47 @@
+"""Offer full-text search
+
+Adds the full-text index over offer title and description used by the `query`
+filter and RELEVANCE sorting: a generated, GIN indexed tsvector column on
+PostgreSQL and an FTS5 table kept in sync by triggers on SQLite.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from models.offer_search import POSTGRES_SEARCH_DDL, SQLITE_SEARCH_DDL, SQLITE_SEARCH_DROP_DDL
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        for ddl in POSTGRES_SEARCH_DDL:
+            op.execute(ddl)
+    elif dialect == "sqlite":
+        for ddl in SQLITE_SEARCH_DDL:
+            op.execute(ddl)
+        # Index the offers stored before the triggers existed
+        op.execute("INSERT INTO offers_fts(offers_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP INDEX IF EXISTS ix_offers_search_vector")
+        op.execute("ALTER TABLE offers DROP COLUMN IF EXISTS search_vector")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS offers_fts_insert")
+        op.execute("DROP TRIGGER IF EXISTS offers_fts_delete")
+        op.execute("DROP TRIGGER IF EXISTS offers_fts_update")
+        for ddl in SQLITE_SEARCH_DROP_DDL:
+            op.execute(ddl)
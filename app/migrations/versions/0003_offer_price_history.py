@@ -0,0 +1,45 @@
+"""Offer price history
+
+Adds the append-only log of price and rent changes written when rescraped offers
+are upserted. On PostgreSQL the table is range partitioned by month; partitions
+for the current and upcoming months are created here, on application startup and
+daily by Celery beat.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+from models.offer_price_history import create_partitions
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "offer_price_history",
+        sa.Column("offer_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("offers.id", ondelete="CASCADE")),
+        sa.Column("changed_at", sa.DateTime()),
+        sa.Column("price", sa.FLOAT(), nullable=True),
+        sa.Column("rent", sa.FLOAT(), nullable=True),
+        sa.Column("previous_price", sa.FLOAT(), nullable=True),
+        sa.Column("previous_rent", sa.FLOAT(), nullable=True),
+        sa.PrimaryKeyConstraint("offer_id", "changed_at"),
+        postgresql_partition_by="RANGE (changed_at)",
+    )
+    create_partitions(op.get_bind())
+
+
+def downgrade() -> None:
+    # Dropping a partitioned table drops its partitions
+    op.drop_table("offer_price_history")
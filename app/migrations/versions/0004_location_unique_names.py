@@ -0,0 +1,64 @@
+"""Unique region and city names
+
+Regions and cities are resolved by name during bulk and streaming ingest, and
+concurrent ingests could insert the same name twice. Existing duplicates are
+merged into the row with the lowest ID, then the names are made unique so
+ingests can insert missing locations with ON CONFLICT DO NOTHING.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _merge_duplicates(table: str, referencing_table: str, referencing_column: str) -> None:
+    """
+    Point references to duplicate names at the row with the lowest ID and delete the duplicates.
+
+    Args:
+        table (str): Table with a name column, regions or cities.
+        referencing_table (str): Table referencing it.
+        referencing_column (str): Foreign key column of the referencing table.
+    """
+    op.execute(
+        f"""
+        UPDATE {referencing_table} SET {referencing_column} = (
+            SELECT keep.id FROM {table} keep JOIN {table} duplicate ON keep.name = duplicate.name
+            WHERE duplicate.id = {referencing_table}.{referencing_column}
+            ORDER BY keep.id LIMIT 1
+        )
+        WHERE {referencing_column} IN (
+            SELECT duplicate.id FROM {table} duplicate
+            WHERE EXISTS (SELECT 1 FROM {table} keep WHERE keep.name = duplicate.name AND keep.id < duplicate.id)
+        )
+        """
+    )
+    op.execute(
+        f"""
+        DELETE FROM {table}
+        WHERE EXISTS (SELECT 1 FROM {table} keep WHERE keep.name = {table}.name AND keep.id < {table}.id)
+        """
+    )
+
+
+def upgrade() -> None:
+    # Regions first, so cities of merged regions can be merged too
+    _merge_duplicates("regions", "cities", "region_id")
+    _merge_duplicates("cities", "offers", "city_id")
+    op.create_index("ix_regions_name", "regions", ["name"], unique=True, if_not_exists=True)
+    op.create_index("ix_cities_name", "cities", ["name"], unique=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_cities_name", table_name="cities", if_exists=True)
+    op.drop_index("ix_regions_name", table_name="regions", if_exists=True)
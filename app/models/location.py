@@ -11,7 +11,7 @@ class Region(Base):
     __tablename__ = "regions"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, unique=True, index=True)
     cities = relationship("City", back_populates="region")
 
 
@@ -19,7 +19,7 @@ class City(Base):
     __tablename__ = "cities"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, unique=True, index=True)
     region_id = Column(UUID(as_uuid=True), ForeignKey("regions.id"))
     region = relationship("Region", back_populates="cities")
     offers = relationship("Offer", back_populates="city")
@@ -1,13 +1,14 @@
 import uuid
 from enum import Enum
 
-from sqlalchemy import Column, Integer, String, FLOAT, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, FLOAT, Boolean, ForeignKey, DateTime, func, Index, event
 from sqlalchemy import Enum as SQLAlchemyEnum
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
 from config.database import Base
 from models.notification import notification_offer_association
+from models.offer_search import POSTGRES_SEARCH_DDL, SQLITE_SEARCH_DDL, SQLITE_SEARCH_DROP_DDL
 
 
 class CategoryEnum(str, Enum):
@@ -73,3 +74,47 @@ class Offer(Base):
         secondary=notification_offer_association,
         back_populates="offers"
     )
+
+    # Indexes backing the listing filters and the keyset pagination of `OfferRepository.get_all`.
+    # Keep in sync with the migrations in `migrations/versions`.
+    __table_args__ = (
+        Index("ix_offers_created_at_id", created_at, id),
+        Index("ix_offers_price_id", price, id),
+        Index("ix_offers_city_id", city_id),
+        Index("ix_offers_category_sub_category_created_at", category, sub_category, created_at, id),
+        Index("ix_offers_category_sub_category_price", category, sub_category, price, id),
+        Index(
+            "ix_offers_furnished_category_sub_category_created_at",
+            category, sub_category, created_at, id,
+            postgresql_where=furniture == True,
+            sqlite_where=furniture == True,
+        ),
+        # NEWEST and PRICE_HIGHEST sort DESC NULLS LAST, while a backward scan of the ascending
+        # indexes above returns NULLs first, so PostgreSQL needs descending twins to avoid a sort
+        Index(
+            "ix_offers_created_at_id_desc", created_at.desc().nulls_last(), id.desc()
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_offers_price_id_desc", price.desc().nulls_last(), id.desc()).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_offers_category_sub_category_created_at_desc",
+            category, sub_category, created_at.desc().nulls_last(), id.desc()
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_offers_category_sub_category_price_desc",
+            category, sub_category, price.desc().nulls_last(), id.desc()
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_offers_furnished_category_sub_category_created_at_desc",
+            category, sub_category, created_at.desc().nulls_last(), id.desc(),
+            postgresql_where=furniture == True,
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# Full-text search index over title and description, see `search` for the queries using it
+for ddl in POSTGRES_SEARCH_DDL:
+    event.listen(Offer.__table__, "after_create", ddl.execute_if(dialect="postgresql"))
+for ddl in SQLITE_SEARCH_DDL:
+    event.listen(Offer.__table__, "after_create", ddl.execute_if(dialect="sqlite"))
+for ddl in SQLITE_SEARCH_DROP_DDL:
+    event.listen(Offer.__table__, "before_drop", ddl.execute_if(dialect="sqlite"))
@@ -0,0 +1,91 @@
+from datetime import date
+from typing import Any, List
+
+from sqlalchemy import Column, DateTime, FLOAT, ForeignKey, event, text
+from sqlalchemy.dialects.postgresql import UUID
+
+from config.database import Base
+from config.settings import settings
+
+
+class OfferPriceHistory(Base):
+    """
+    Append-only log of price and rent changes of rescraped offers.
+
+    A row is written only when a rescrape changes the price or the rent of an offer, and
+    holds the values before and after the change. The price an offer was first stored with
+    is the previous price of its first row, or its current price if it never changed.
+    """
+    __tablename__ = "offer_price_history"
+
+    offer_id = Column(UUID(as_uuid=True), ForeignKey("offers.id", ondelete="CASCADE"), primary_key=True)
+    changed_at = Column(DateTime, primary_key=True)
+    price = Column(FLOAT, nullable=True)
+    rent = Column(FLOAT, nullable=True)
+    previous_price = Column(FLOAT, nullable=True)
+    previous_rent = Column(FLOAT, nullable=True)
+
+    # On PostgreSQL the table is partitioned by month, see `create_partitions`
+    __table_args__ = {"postgresql_partition_by": "RANGE (changed_at)"}
+
+
+def _add_months(month: date, months: int) -> date:
+    """
+    Get the first day of the month a number of months after the given one.
+
+    Args:
+        month (date): First day of a month.
+        months (int): Number of months to add.
+
+    Returns:
+        date: First day of the resulting month.
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_ddl(month: date) -> str:
+    """
+    Get the statement creating the partition of the price history holding one month.
+
+    Args:
+        month (date): Any day of the month.
+
+    Returns:
+        str: The CREATE TABLE statement, doing nothing if the partition exists.
+    """
+    start = month.replace(day=1)
+    return (
+        f"CREATE TABLE IF NOT EXISTS {OfferPriceHistory.__tablename__}_{start:%Y_%m} "
+        f"PARTITION OF {OfferPriceHistory.__tablename__} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{_add_months(start, 1).isoformat()}')"
+    )
+
+
+def create_partitions(connection: Any, months_ahead: int = settings.PRICE_HISTORY_PARTITIONS_AHEAD) -> List[str]:
+    """
+    Create the monthly partitions of the price history for this month and the next ones.
+
+    Rows can only be written to months that have a partition, so this runs when the table
+    is created, on application startup and daily from Celery beat. Does nothing on databases
+    other than PostgreSQL, where the table is not partitioned.
+
+    Args:
+        connection (Any): Database connection, e.g. `Session.connection()`.
+        months_ahead (int): Number of months after the current one to create.
+
+    Returns:
+        List[str]: The executed statements.
+    """
+    if connection.dialect.name != "postgresql":
+        return []
+    this_month = date.today().replace(day=1)
+    statements = [partition_ddl(_add_months(this_month, i)) for i in range(months_ahead + 1)]
+    for statement in statements:
+        connection.execute(text(statement))
+    return statements
+
+
+@event.listens_for(OfferPriceHistory.__table__, "after_create")
+def _create_partitions_after_create(target, connection, **kwargs) -> None:
+    create_partitions(connection)
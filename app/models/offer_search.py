@@ -0,0 +1,65 @@
+from sqlalchemy import DDL
+
+# Name of the PostgreSQL text search configuration used for offers. It is created by
+# `POSTGRES_SEARCH_DDL` as a copy of `simple` with accents folded by `unaccent`, and can be
+# switched to a Polish ispell dictionary with ALTER TEXT SEARCH CONFIGURATION on servers that have one.
+TEXT_SEARCH_CONFIG = "polish"
+
+POSTGRES_SEARCH_DDL = [
+    DDL("CREATE EXTENSION IF NOT EXISTS unaccent"),
+    DDL(
+        f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{TEXT_SEARCH_CONFIG}') THEN
+                CREATE TEXT SEARCH CONFIGURATION {TEXT_SEARCH_CONFIG} (COPY = simple);
+                ALTER TEXT SEARCH CONFIGURATION {TEXT_SEARCH_CONFIG}
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, simple;
+            END IF;
+        END
+        $$
+        """
+    ),
+    DDL(
+        f"""
+        ALTER TABLE offers ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+            setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('{TEXT_SEARCH_CONFIG}', coalesce(description, '')), 'B')
+        ) STORED
+        """
+    ),
+    DDL("CREATE INDEX IF NOT EXISTS ix_offers_search_vector ON offers USING GIN (search_vector)"),
+]
+
+# SQLite has no tsvector, so DEBUG databases keep an external content FTS5 index in sync with triggers.
+# It is keyed by the implicit rowid of `offers`, whose primary key is a UUID, and VACUUM may renumber
+# such rowids. After a VACUUM the index must be rebuilt with
+# INSERT INTO offers_fts(offers_fts) VALUES ('rebuild'), otherwise searches match the wrong offers.
+SQLITE_SEARCH_DDL = [
+    DDL(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS offers_fts USING fts5("
+        "title, description, content='offers', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS offers_fts_insert AFTER INSERT ON offers BEGIN "
+        "INSERT INTO offers_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description); "
+        "END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS offers_fts_delete AFTER DELETE ON offers BEGIN "
+        "INSERT INTO offers_fts(offers_fts, rowid, title, description) "
+        "VALUES ('delete', old.rowid, old.title, old.description); "
+        "END"
+    ),
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS offers_fts_update AFTER UPDATE OF title, description ON offers BEGIN "
+        "INSERT INTO offers_fts(offers_fts, rowid, title, description) "
+        "VALUES ('delete', old.rowid, old.title, old.description); "
+        "INSERT INTO offers_fts(rowid, title, description) VALUES (new.rowid, new.title, new.description); "
+        "END"
+    ),
+]
+
+SQLITE_SEARCH_DROP_DDL = [
+    DDL("DROP TABLE IF EXISTS offers_fts"),
+]
@@ -12,5 +12,5 @@ class Photo(Base):
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     url = Column(String, nullable=False)
-    offer_id = Column(UUID(as_uuid=True), ForeignKey("offers.id"))
+    offer_id = Column(UUID(as_uuid=True), ForeignKey("offers.id"), index=True)
     offer = relationship("Offer", back_populates="photos")
@@ -1,10 +1,13 @@
-from typing import List, Optional, Type
+import uuid
+from typing import Dict, Iterable, List, Optional, Type
 
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
 from models.location import City
 from schemas.location import CityInput, CityOutput, RegionOutput, CityInDb
+from utils.dialect_insert import dialect_insert
+from utils.location_cache import city_cache
 
 
 class CityRepository:
@@ -35,6 +38,7 @@ class CityRepository:
         self.session.add(city)
         self.session.commit()
         self.session.refresh(city)
+        city_cache.discard(city.name)
         return CityInDb(**city.__dict__)
 
     def get_all(self) -> List[Optional[CityOutput]]:
@@ -106,6 +110,42 @@ class CityRepository:
         """
         return self.session.query(City).filter_by(name=name).first()
 
+    def get_ids_by_names(self, names: Iterable[str]) -> Dict[str, UUID4]:
+        """
+        Get city IDs for many names with a single query.
+
+        Args:
+            names (Iterable[str]): The city names.
+
+        Returns:
+            Dict[str, UUID4]: Mapping of city name to city ID for cities that exist.
+        """
+        names = set(names)
+        if not names:
+            return {}
+        rows = self.session.query(City.id, City.name).filter(City.name.in_(names)).all()
+        return {name: _id for _id, name in rows}
+
+    def create_many(self, cities: Dict[str, UUID4]) -> Dict[str, UUID4]:
+        """
+        Create many cities with a single multi-row INSERT.
+
+        The transaction is not committed, so the caller can group it with other writes.
+        Names inserted meanwhile by a concurrent ingest are kept and their existing IDs returned.
+
+        Args:
+            cities (Dict[str, UUID4]): Mapping of city name to the ID of its region.
+
+        Returns:
+            Dict[str, UUID4]: Mapping of city name to the ID of the city.
+        """
+        if cities:
+            stmt = dialect_insert(self.session)(City).on_conflict_do_nothing(index_elements=[City.name])
+            self.session.execute(
+                stmt, [{"id": uuid.uuid4(), "name": name, "region_id": region_id} for name, region_id in cities.items()]
+            )
+        return self.get_ids_by_names(cities)
+
     def city_exists_by_name(self, name: str) -> bool:
         """
         Check if a city exists by name.
@@ -143,10 +183,12 @@ class CityRepository:
         Returns:
             CityInput: The updated city data.
         """
+        old_name = city.name
         for key, value in data.model_dump(exclude_none=True).items():
             setattr(city, key, value)
         self.session.commit()
         self.session.refresh(city)
+        city_cache.discard(old_name, city.name)
         return CityInput(**city.__dict__)
 
     def delete(self, city: Type[City]) -> bool:
@@ -159,6 +201,8 @@ class CityRepository:
         Returns:
             bool: True if deletion was successful, False otherwise.
         """
+        name = city.name
         self.session.delete(city)
         self.session.commit()
+        city_cache.discard(name)
         return True
@@ -0,0 +1,40 @@
+from typing import List
+
+from pydantic import UUID4
+from sqlalchemy.orm import Session
+
+from models.offer_price_history import OfferPriceHistory
+
+
+class OfferPriceHistoryRepository:
+    """
+    Repository class for reading the price history of offers.
+
+    Rows are written in bulk by `OfferRepository.upsert_many`, in the transaction refreshing the offers.
+    """
+
+    def __init__(self, session: Session):
+        """
+        Initialize the repository with a database session.
+
+        Args:
+            session (Session): The database session.
+        """
+        self.session = session
+
+    def get_by_offer_id(self, offer_id: UUID4) -> List[OfferPriceHistory]:
+        """
+        Get the price and rent changes of an offer.
+
+        Args:
+            offer_id (UUID4): The ID of the offer.
+
+        Returns:
+            List[OfferPriceHistory]: The changes, oldest first.
+        """
+        return (
+            self.session.query(OfferPriceHistory)
+            .filter(OfferPriceHistory.offer_id == offer_id)
+            .order_by(OfferPriceHistory.changed_at)
+            .all()
+        )
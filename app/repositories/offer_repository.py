@@ -1,14 +1,22 @@
-from typing import Type, Dict, Any, List
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Type, Dict, Any, List, Iterable, Iterator, Set, Tuple, Optional
 
 from pydantic import UUID4
-from sqlalchemy import asc, desc
-from sqlalchemy.orm import Session
+from sqlalchemy import asc, desc, insert, func, or_, and_, case, tuple_, ColumnElement
+from sqlalchemy.orm import Session, Query, joinedload, selectinload
 
 from enums.offer_sort import OfferSortEnum
-from models.offer import Offer
+from models.location import City
+from models.offer import Offer, CategoryEnum, SubCategoryEnum, BuildingTypeEnum
+from models.offer_price_history import OfferPriceHistory
 from models.photo import Photo
 from schemas.location import CityOutput, RegionOutput
-from schemas.offer import OfferScraper, OfferList
+from schemas.offer import OfferScraper, OfferList, OfferFacets, PriceFacet
+from search.search_factory import get_search_strategy
+from utils.dialect_insert import dialect_insert
 
 
 class OfferRepository:
@@ -16,6 +24,30 @@ class OfferRepository:
     Repository class for handling offers.
     """
 
+    # Sort column and whether it is descending, for every sorting option
+    SORT_KEYS = {
+        OfferSortEnum.NEWEST: ("created_at", True),
+        OfferSortEnum.OLDEST: ("created_at", False),
+        OfferSortEnum.PRICE_LOWEST: ("price", False),
+        OfferSortEnum.PRICE_HIGHEST: ("price", True),
+        OfferSortEnum.RELEVANCE: ("relevance", True),
+    }
+
+    # Room counts with their own facet bucket, larger ones are grouped into a single "N+" bucket
+    ROOM_FACETS = (1, 2, 3, 4)
+
+    # Price facet buckets as [min, max) ranges, None meaning unbounded
+    PRICE_FACETS = (
+        (0, 1000), (1000, 2000), (2000, 3000), (3000, 5000), (5000, 100000), (100000, 300000),
+        (300000, 500000), (500000, 1000000), (1000000, None),
+    )
+
+    # Columns refreshed by an upsert when a rescraped offer differs from the stored one
+    UPSERT_COLUMNS = (
+        "title", "category", "sub_category", "building_type", "price", "rent", "description", "price_per_m",
+        "area", "building_floot", "floor", "rooms", "furniture", "city_id",
+    )
+
     def __init__(self, session: Session):
         """
         Initialize the repository with a database session.
@@ -50,6 +82,162 @@ class OfferRepository:
 
         return db_offer
 
+    def create_many(self, offers: List[OfferScraper], city_ids: Dict[str, UUID4]) -> List[UUID4]:
+        """
+        Create many offers and their photos with multi-row INSERTs in a single transaction.
+
+        Args:
+            offers (List[OfferScraper]): The offers data.
+            city_ids (Dict[str, UUID4]): Mapping of city name to city ID.
+
+        Returns:
+            List[UUID4]: IDs of the created offers, in the same order as the input.
+        """
+        ids, offer_rows, photo_rows = [], [], []
+        for offer in offers:
+            offer_id = uuid.uuid4()
+            row = offer.model_dump(exclude={"photos", "region_name", "city_name"})
+            row.update(id=offer_id, city_id=city_ids[offer.city_name])
+            offer_rows.append(row)
+            photo_rows.extend({"id": uuid.uuid4(), "url": photo.url, "offer_id": offer_id} for photo in offer.photos)
+            ids.append(offer_id)
+
+        if offer_rows:
+            self.session.execute(insert(Offer), offer_rows)
+        if photo_rows:
+            self.session.execute(insert(Photo), photo_rows)
+        self.session.commit()
+        return ids
+
+    def upsert_many(
+            self,
+            offers: List[OfferScraper],
+            city_ids: Dict[str, UUID4]
+    ) -> Tuple[Dict[str, UUID4], Dict[str, UUID4]]:
+        """
+        Insert or refresh many offers with a single ON CONFLICT (details_url) DO UPDATE statement.
+
+        An existing offer is only rewritten when at least one of `UPSERT_COLUMNS` differs,
+        so `updated_at` is bumped only for offers that actually changed. Photos are inserted
+        for new offers only. When a URL appears more than once, the last occurrence wins.
+        Price and rent changes of existing offers are appended to the price history in the
+        same transaction.
+
+        Args:
+            offers (List[OfferScraper]): The offers data.
+            city_ids (Dict[str, UUID4]): Mapping of city name to city ID.
+
+        Returns:
+            Tuple[Dict[str, UUID4], Dict[str, UUID4]]: Mappings of details URL to offer ID
+            for created and for updated offers.
+        """
+        offers = list({offer.details_url: offer for offer in offers}.values())
+        if not offers:
+            return {}, {}
+
+        existing_prices = self.get_prices_by_urls(offer.details_url for offer in offers)
+
+        rows = []
+        for offer in offers:
+            row = offer.model_dump(exclude={"photos", "region_name", "city_name"})
+            row.update(id=uuid.uuid4(), city_id=city_ids[offer.city_name])
+            rows.append(row)
+
+        stmt = self._dialect_insert()(Offer)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Offer.details_url],
+            set_={**{column: stmt.excluded[column] for column in self.UPSERT_COLUMNS}, "updated_at": func.now()},
+            where=or_(*[getattr(Offer, column).is_distinct_from(stmt.excluded[column]) for column in self.UPSERT_COLUMNS])
+        ).returning(Offer.id, Offer.details_url)
+
+        created, updated = {}, {}
+        for _id, details_url in self.session.execute(stmt, rows).all():
+            if details_url in existing_prices:
+                updated[details_url] = _id
+            else:
+                created[details_url] = _id
+
+        photo_rows = [
+            {"id": uuid.uuid4(), "url": photo.url, "offer_id": created[offer.details_url]}
+            for offer in offers if offer.details_url in created
+            for photo in offer.photos
+        ]
+        if photo_rows:
+            self.session.execute(insert(Photo), photo_rows)
+
+        changed_at = datetime.now()
+        history_rows = [
+            {
+                "offer_id": updated[offer.details_url],
+                "changed_at": changed_at,
+                "price": offer.price,
+                "rent": offer.rent,
+                "previous_price": existing_prices[offer.details_url][0],
+                "previous_rent": existing_prices[offer.details_url][1],
+            }
+            for offer in offers
+            if offer.details_url in updated and (offer.price, offer.rent) != existing_prices[offer.details_url]
+        ]
+        if history_rows:
+            self.session.execute(insert(OfferPriceHistory), history_rows)
+        self.session.commit()
+        return created, updated
+
+    def _dialect_insert(self):
+        """
+        Get the INSERT construct supporting ON CONFLICT for the database in use.
+
+        Returns:
+            The PostgreSQL or SQLite `insert` function.
+        """
+        return dialect_insert(self.session)
+
+    def get_prices_by_urls(self, urls: Iterable[str]) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+        """
+        Get the price and rent of the offers with the given URLs, with a single query.
+
+        Args:
+            urls (Iterable[str]): The URLs to look up.
+
+        Returns:
+            Dict[str, Tuple[Optional[float], Optional[float]]]: Price and rent by URL, for existing offers only.
+        """
+        urls = set(urls)
+        if not urls:
+            return {}
+        rows = self.session.query(Offer.details_url, Offer.price, Offer.rent).filter(Offer.details_url.in_(urls))
+        return {details_url: (price, rent) for details_url, price, rent in rows}
+
+    def get_existing_urls(self, urls: Iterable[str]) -> Set[str]:
+        """
+        Get the subset of URLs that already belong to an offer, with a single query.
+
+        Args:
+            urls (Iterable[str]): The URLs to check.
+
+        Returns:
+            Set[str]: URLs of existing offers.
+        """
+        urls = set(urls)
+        if not urls:
+            return set()
+        rows = self.session.query(Offer.details_url).filter(Offer.details_url.in_(urls)).all()
+        return {row[0] for row in rows}
+
+    def iter_urls(self, batch_size: int = 10000) -> Iterator[str]:
+        """
+        Iterate over the URLs of all offers without loading them at once.
+
+        Args:
+            batch_size (int): Number of rows fetched per round trip.
+
+        Returns:
+            Iterator[str]: Offer URLs.
+        """
+        query = self.session.query(Offer.details_url).execution_options(yield_per=batch_size)
+        for row in query:
+            yield row[0]
+
     def offer_exists_by_url(self, url: str) -> bool:
         """
         Check if an offer exists by URL.
@@ -99,13 +287,13 @@ class OfferRepository:
         Returns:
             Dict[str, Any]: Details of the offer.
         """
-        offer = self.session.query(Offer).filter_by(id=_id).first()
+        offer = self._query_with_relations().filter_by(id=_id).first()
         photo_list = [{"url": photo.url} for photo in offer.photos]
         return self._map_model_to_schema(offer, photo_list)
 
     def get_all(
             self,
-            offset: int = 1,
+            page: int = 1,
             page_limit: int = 15,
             category: str = None,
             sub_category: str = None,
@@ -119,12 +307,16 @@ class OfferRepository:
             floor: int = None,
             query: str = None,
             sort_by: OfferSortEnum = OfferSortEnum.NEWEST,
+            cursor: Optional[str] = None,
     ) -> OfferList:
         """
         Get all offers based on filters and sorting parameters.
 
+        When `cursor` is given the page continues right after the offer it points to
+        (keyset pagination) and `page` is ignored, so deep pages cost the same as the first one.
+
         Args:
-            offset (int): Offset for pagination.
+            page (int): Page number for pagination, starting from 1.
             page_limit (int): Page size for pagination.
             category (str): Offer category.
             sub_category (str): Offer sub-category.
@@ -136,16 +328,222 @@ class OfferRepository:
             rooms (int): Number of rooms.
             furniture (bool): Furniture availability.
             floor (int): Floor number.
-            query (str): Search query.
-            sort_by (OfferSortEnum): Sorting criteria.
+            query (str): Full-text search query matched against title and description.
+            sort_by (OfferSortEnum): Sorting criteria, RELEVANCE falls back to NEWEST without a query.
+            cursor (Optional[str]): Opaque cursor returned as `next_cursor` by the previous page.
 
         Returns:
             OfferList: List of offers with pagination information.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another sorting.
+        """
+        if sort_by == OfferSortEnum.RELEVANCE and not query:
+            sort_by = OfferSortEnum.NEWEST
+        sort_expression, descending = self._sort_key(sort_by, query)
+
+        offers = self._query_with_relations().add_columns(sort_expression.label("sort_value"))
+
+        offers = self._apply_filters(
+            offers, category, sub_category, building_type, price_min, price_max, area_min, area_max, rooms,
+            furniture, floor, query
+        )
+
+        direction = desc if descending else asc
+        offers = offers.order_by(direction(sort_expression).nulls_last(), direction(Offer.id))
+
+        # Fetch one extra row to know whether there is a next page
+        if cursor:
+            value, _id = self._decode_cursor(sort_by, cursor)
+            rows = offers.filter(self._after_cursor(sort_expression, descending, value, _id)).limit(page_limit + 1).all()
+            if value is not None and len(rows) <= page_limit:
+                # The non-NULL range is exhausted, continue with the offers without a sort value
+                rows += offers.filter(sort_expression.is_(None)).limit(page_limit + 1 - len(rows)).all()
+        else:
+            rows = offers.offset((page - 1) * page_limit).limit(page_limit + 1).all()
+        next_cursor = None
+        if len(rows) > page_limit:
+            rows = rows[:page_limit]
+            last_offer, last_value = rows[-1]
+            next_cursor = self._encode_cursor(sort_by, last_value, last_offer.id)
+
+        offer_list = []
+        for offer, _ in rows:
+            photo_list = [{"url": photo.url} for photo in offer.photos]
+            offer_mapped = self._map_model_to_schema(offer, photo_list)
+            offer_list.append(offer_mapped)
+
+        result = OfferList(offers=offer_list, page=page, page_size=len(offer_list), next_cursor=next_cursor)
+        return result
+
+    def count(self, **filters: Any) -> int:
+        """
+        Count offers matching the filters exactly.
+
+        Args:
+            **filters (Any): Listing filters, as accepted by `get_all`.
+
+        Returns:
+            int: Number of matching offers.
+        """
+        return self._apply_filters(self.session.query(func.count(Offer.id)), **filters).scalar()
+
+    def estimate_count(self, **filters: Any) -> Optional[int]:
+        """
+        Estimate the number of offers matching the filters from PostgreSQL planner statistics.
+
+        Without filters the table row estimate from `pg_class.reltuples` is used, otherwise the
+        row estimate of the EXPLAIN plan of the filtered query.
+
+        Args:
+            **filters (Any): Listing filters, as accepted by `get_all`.
+
+        Returns:
+            Optional[int]: The estimate, or None when the database cannot provide one.
+        """
+        bind = self.session.get_bind()
+        if bind.dialect.name != "postgresql":
+            return None
+
+        connection = self.session.connection()
+        if not any(value is not None for value in filters.values()):
+            reltuples = connection.exec_driver_sql(
+                "SELECT reltuples FROM pg_class WHERE oid = 'offers'::regclass"
+            ).scalar()
+            # reltuples is -1 until the table has been vacuumed or analyzed
+            return int(reltuples) if reltuples is not None and reltuples >= 0 else None
+
+        statement = self._apply_filters(self.session.query(Offer.id), **filters).statement
+        sql = statement.compile(dialect=bind.dialect, compile_kwargs={"literal_binds": True})
+        plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}").scalar()
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+    def get_facets(
+            self,
+            category: str = None,
+            sub_category: str = None,
+            building_type: str = None,
+            price_min: int = None,
+            price_max: int = None,
+            area_min: int = None,
+            area_max: int = None,
+            rooms: int = None,
+            furniture: bool = None,
+            floor: int = None,
+            query: str = None,
+    ) -> OfferFacets:
+        """
+        Count offers matching the filters per facet value, in a single pass over the offers.
+
+        Every facet bucket is a conditional SUM in one SELECT, so the cost is one scan no
+        matter how many facets and buckets are returned.
+
+        Args:
+            category (str): Offer category.
+            sub_category (str): Offer sub-category.
+            building_type (str): Building type.
+            price_min (int): Minimum price.
+            price_max (int): Maximum price.
+            area_min (int): Minimum area.
+            area_max (int): Maximum area.
+            rooms (int): Number of rooms.
+            furniture (bool): Furniture availability.
+            floor (int): Floor number.
+            query (str): Full-text search query matched against title and description.
+
+        Returns:
+            OfferFacets: Counts per facet value.
         """
-        offers = self.session.query(Offer)
+        buckets = {
+            "category": [(member.value, Offer.category == member) for member in CategoryEnum],
+            "sub_category": [(member.value, Offer.sub_category == member) for member in SubCategoryEnum],
+            "building_type": [(member.value, Offer.building_type == member) for member in BuildingTypeEnum],
+            "rooms": [(str(number), Offer.rooms == number) for number in self.ROOM_FACETS] + [
+                (f"{self.ROOM_FACETS[-1] + 1}+", Offer.rooms > self.ROOM_FACETS[-1])
+            ],
+            "furniture": [("true", Offer.furniture == True), ("false", Offer.furniture == False)],
+            "price": [
+                (
+                    (low, high),
+                    and_(Offer.price >= low, Offer.price < high) if high is not None else Offer.price >= low
+                )
+                for low, high in self.PRICE_FACETS
+            ],
+        }
+
+        columns = [func.count(Offer.id)]
+        for facet in buckets.values():
+            columns.extend(func.coalesce(func.sum(case((condition, 1), else_=0)), 0) for _, condition in facet)
+
+        offers = self._apply_filters(
+            self.session.query(*columns), category, sub_category, building_type, price_min, price_max, area_min,
+            area_max, rooms, furniture, floor, query
+        )
+        row = iter(offers.one())
+
+        total = next(row)
+        counts = {name: [(key, next(row)) for key, _ in facet] for name, facet in buckets.items()}
+        return OfferFacets(
+            total=total,
+            category=dict(counts["category"]),
+            sub_category=dict(counts["sub_category"]),
+            building_type=dict(counts["building_type"]),
+            rooms=dict(counts["rooms"]),
+            furniture=dict(counts["furniture"]),
+            price=[PriceFacet(min=low, max=high, count=count) for (low, high), count in counts["price"]],
+        )
 
+    def delete(self, offer: Type[Offer]) -> bool:
+        """
+        Delete an offer.
+
+        Args:
+            offer (Type[Offer]): The offer instance.
+
+        Returns:
+            bool: True if deletion was successful, False otherwise.
+        """
+        self.session.delete(offer)
+        self.session.commit()
+        return True
+
+    def _apply_filters(
+            self,
+            offers: Query,
+            category: str = None,
+            sub_category: str = None,
+            building_type: str = None,
+            price_min: int = None,
+            price_max: int = None,
+            area_min: int = None,
+            area_max: int = None,
+            rooms: int = None,
+            furniture: bool = None,
+            floor: int = None,
+            query: str = None,
+    ) -> Query:
+        """
+        Apply the listing filters to an offer query.
+
+        Args:
+            offers (Query): The query to filter.
+            category (str): Offer category.
+            sub_category (str): Offer sub-category.
+            building_type (str): Building type.
+            price_min (int): Minimum price.
+            price_max (int): Maximum price.
+            area_min (int): Minimum area.
+            area_max (int): Maximum area.
+            rooms (int): Number of rooms.
+            furniture (bool): Furniture availability.
+            floor (int): Floor number.
+            query (str): Full-text search query matched against title and description.
+
+        Returns:
+            Query: The filtered query.
+        """
         if query:
-            offers = offers.filter(Offer.title.like(f"%{query}%"))
+            offers = offers.filter(get_search_strategy(self.session).match(query))
 
         if category:
             offers = offers.filter(Offer.category == category)
@@ -167,40 +565,117 @@ class OfferRepository:
             offers = offers.filter(Offer.furniture == furniture)
         if floor:
             offers = offers.filter(Offer.floor == floor)
+        return offers
 
-        if sort_by == OfferSortEnum.NEWEST:
-            offers = offers.order_by(desc(Offer.created_at))
-        elif sort_by == OfferSortEnum.OLDEST:
-            offers = offers.order_by(asc(Offer.created_at))
-        elif sort_by == OfferSortEnum.PRICE_LOWEST:
-            offers = offers.order_by(asc(Offer.price))
-        elif sort_by == OfferSortEnum.PRICE_HIGHEST:
-            offers = offers.order_by(desc(Offer.price))
+    def _sort_key(self, sort_by: OfferSortEnum, query: Optional[str]) -> Tuple[ColumnElement, bool]:
+        """
+        Get the SQL expression offers are sorted and paginated by.
 
-        offers = offers.offset(offset).limit(page_limit).all()
+        SQLite stores `func.now()` timestamps without microseconds while bound datetimes
+        carry them, so timestamps are sorted and compared as julian days there.
 
-        offer_list = []
-        for offer in offers:
-            photo_list = [{"url": photo.url} for photo in offer.photos]
-            offer_mapped = self._map_model_to_schema(offer, photo_list)
-            offer_list.append(offer_mapped)
+        Args:
+            sort_by (OfferSortEnum): Sorting criteria.
+            query (Optional[str]): Search query, required for relevance sorting.
 
-        result = OfferList(offers=offer_list, page=offset, page_size=len(offer_list))
-        return result
+        Returns:
+            Tuple[ColumnElement, bool]: The sort expression and whether it is descending.
+        """
+        column, descending = self.SORT_KEYS[sort_by]
+        if column == "relevance":
+            return get_search_strategy(self.session).rank(query), descending
 
-    def delete(self, offer: Type[Offer]) -> bool:
+        expression = getattr(Offer, column)
+        if column == "created_at" and self.session.get_bind().dialect.name == "sqlite":
+            return func.julianday(expression), descending
+        return expression, descending
+
+    @staticmethod
+    def _after_cursor(sort_expression: ColumnElement, descending: bool, value: Any, _id: uuid.UUID):
         """
-        Delete an offer.
+        Build the keyset condition selecting offers that come after the cursor.
+
+        Rows are ordered by (sort expression NULLS LAST, id), so NULL sort values follow every
+        non-NULL one and are themselves ordered by id. A non-NULL cursor is compared as a row
+        value, which the (sort column, id) indexes serve as a range scan, and matches no NULL
+        sort values: `get_all` continues with those once the non-NULL range is exhausted.
 
         Args:
-            offer (Type[Offer]): The offer instance.
+            sort_expression (ColumnElement): The sort expression.
+            descending (bool): Whether the sort is descending.
+            value (Any): Sort value of the last offer of the previous page.
+            _id (uuid.UUID): ID of the last offer of the previous page.
 
         Returns:
-            bool: True if deletion was successful, False otherwise.
+            The SQL condition.
         """
-        self.session.delete(offer)
-        self.session.commit()
-        return True
+        if value is None:
+            return and_(sort_expression.is_(None), Offer.id < _id if descending else Offer.id > _id)
+
+        if descending:
+            return tuple_(sort_expression, Offer.id) < tuple_(value, _id)
+        return tuple_(sort_expression, Offer.id) > tuple_(value, _id)
+
+    @staticmethod
+    def _encode_cursor(sort_by: OfferSortEnum, value: Any, _id: uuid.UUID) -> str:
+        """
+        Encode the position of an offer in the listing as an opaque cursor.
+
+        Args:
+            sort_by (OfferSortEnum): Sorting criteria.
+            value (Any): Sort value of the last offer of the page.
+            _id (uuid.UUID): ID of the last offer of the page.
+
+        Returns:
+            str: The cursor.
+        """
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        payload = json.dumps({"sort": sort_by.value, "value": value, "id": str(_id)})
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(sort_by: OfferSortEnum, cursor: str) -> Tuple[Any, uuid.UUID]:
+        """
+        Decode a cursor produced by `_encode_cursor`.
+
+        Args:
+            sort_by (OfferSortEnum): Sorting criteria of the current request.
+            cursor (str): The cursor.
+
+        Returns:
+            Tuple[Any, uuid.UUID]: The sort value and the ID of the last offer of the previous page.
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another sorting.
+        """
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if payload["sort"] != sort_by.value:
+                raise ValueError("Cursor was issued for another sorting")
+            value, _id = payload["value"], uuid.UUID(payload["id"])
+            if isinstance(value, str):
+                value = datetime.fromisoformat(value)
+            elif value is not None:
+                value = float(value)
+        except (TypeError, KeyError, AttributeError, UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ValueError("Invalid cursor") from e
+        return value, _id
+
+    def _query_with_relations(self) -> Query:
+        """
+        Build an offer query that eagerly loads photos, city and region.
+
+        City and region are joined into the main query and photos are fetched with one
+        additional SELECT ... IN, so mapping a page of offers always costs two queries.
+
+        Returns:
+            Query: The offer query.
+        """
+        return self.session.query(Offer).options(
+            joinedload(Offer.city).joinedload(City.region),
+            selectinload(Offer.photos),
+        )
 
     @staticmethod
     def _map_model_to_schema(offer: Type[Offer], photo_list: List[Dict]) -> Dict[str, Any]:
@@ -1,7 +1,11 @@
+import uuid
+
 from sqlalchemy.orm import Session
 from models.location import Region
 from schemas.location import RegionInput, RegionOutput
-from typing import List, Optional, Type
+from utils.dialect_insert import dialect_insert
+from utils.location_cache import region_cache
+from typing import Dict, Iterable, List, Optional, Type
 from pydantic import UUID4
 
 class RegionRepository:
@@ -31,6 +35,7 @@ class RegionRepository:
         self.session.add(region)
         self.session.commit()
         self.session.refresh(region)
+        region_cache.discard(region.name)
         return RegionOutput(id=region.id, name=region.name)
 
     def get_all(self) -> List[Optional[RegionOutput]]:
@@ -80,6 +85,41 @@ class RegionRepository:
         """
         return self.session.query(Region).filter_by(name=name).first()
 
+    def get_ids_by_names(self, names: Iterable[str]) -> Dict[str, UUID4]:
+        """
+        Get region IDs for many names with a single query.
+
+        Args:
+            names (Iterable[str]): The names of the regions.
+
+        Returns:
+            Dict[str, UUID4]: Mapping of region name to region ID for regions that exist.
+        """
+        names = set(names)
+        if not names:
+            return {}
+        rows = self.session.query(Region.id, Region.name).filter(Region.name.in_(names)).all()
+        return {name: _id for _id, name in rows}
+
+    def create_many(self, names: Iterable[str]) -> Dict[str, UUID4]:
+        """
+        Create many regions with a single multi-row INSERT.
+
+        The transaction is not committed, so the caller can group it with other writes.
+        Names inserted meanwhile by a concurrent ingest are kept and their existing IDs returned.
+
+        Args:
+            names (Iterable[str]): The names of the regions to create.
+
+        Returns:
+            Dict[str, UUID4]: Mapping of region name to the ID of the region.
+        """
+        names = set(names)
+        if names:
+            stmt = dialect_insert(self.session)(Region).on_conflict_do_nothing(index_elements=[Region.name])
+            self.session.execute(stmt, [{"id": uuid.uuid4(), "name": name} for name in names])
+        return self.get_ids_by_names(names)
+
     def region_exists_by_id(self, _id: UUID4) -> bool:
         """
         Check if a region exists by ID.
@@ -117,9 +157,11 @@ class RegionRepository:
         Returns:
             RegionInput: The updated region data.
         """
+        old_name = region.name
         region.name = data.name
         self.session.commit()
         self.session.refresh(region)
+        region_cache.discard(old_name, region.name)
         return RegionInput(**region.__dict__)
 
     def delete(self, region: Type[Region]) -> bool:
@@ -132,6 +174,8 @@ class RegionRepository:
         Returns:
             bool: True if deletion was successful, False otherwise.
         """
+        name = region.name
         self.session.delete(region)
         self.session.commit()
+        region_cache.discard(name)
         return True
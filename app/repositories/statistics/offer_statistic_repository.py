@@ -1,10 +1,15 @@
 from collections import defaultdict
+from datetime import datetime
 from typing import Dict, List
 
-from sqlalchemy import func
+from sqlalchemy import case, func
 from sqlalchemy.orm import Session
 
-from models.offer import Offer
+from enums.price_change_group import PriceChangeGroupEnum
+from models.location import City
+from models.offer import Offer, CategoryEnum
+from models.offer_price_history import OfferPriceHistory
+from schemas.offer_price_history import PriceChangeStatistic
 
 
 class OfferStatisticRepository:
@@ -61,3 +66,58 @@ class OfferStatisticRepository:
         for offer in offers:
             subcategory_counts[offer.sub_category.value] += 1
         return subcategory_counts
+
+    def get_price_changes(
+            self,
+            group_by: PriceChangeGroupEnum,
+            date_from: datetime,
+            date_to: datetime
+    ) -> List[PriceChangeStatistic]:
+        """
+        Aggregate the price and rent changes recorded in a period by city or by category.
+
+        Only the monthly partitions of the price history overlapping the period are scanned.
+
+        Args:
+            group_by (PriceChangeGroupEnum): Whether to group by city or by category.
+            date_from (datetime): Start of the period, inclusive.
+            date_to (datetime): End of the period, exclusive.
+
+        Returns:
+            List[PriceChangeStatistic]: Statistics per group, most changes first.
+        """
+        history = OfferPriceHistory
+        group_column = City.name if group_by == PriceChangeGroupEnum.CITY else Offer.category
+        changes = func.count()
+
+        query = self.session.query(
+            group_column,
+            changes,
+            func.sum(case((history.price > history.previous_price, 1), else_=0)),
+            func.sum(case((history.price < history.previous_price, 1), else_=0)),
+            func.avg(history.price),
+            func.avg(case((
+                history.previous_price > 0,
+                (history.price - history.previous_price) * 100.0 / history.previous_price
+            ))),
+        ).join(Offer, Offer.id == history.offer_id)
+        if group_by == PriceChangeGroupEnum.CITY:
+            query = query.join(City, City.id == Offer.city_id)
+
+        rows = (
+            query.filter(history.changed_at >= date_from, history.changed_at < date_to)
+            .group_by(group_column)
+            .order_by(changes.desc())
+            .all()
+        )
+        return [
+            PriceChangeStatistic(
+                name=name.value if isinstance(name, CategoryEnum) else name,
+                changes=count,
+                increases=increases or 0,
+                decreases=decreases or 0,
+                average_price=average_price,
+                average_price_change_percent=average_change,
+            )
+            for name, count, increases, decreases, average_price, average_change in rows
+        ]
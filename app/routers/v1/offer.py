@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 from auth.auth import get_current_user
 from config.database import get_db
+from enums.offer_count import OfferCountEnum
 from enums.offer_sort import OfferSortEnum
-from schemas.offer import OfferScraper, OfferList
+from schemas.offer import OfferScraper, OfferList, OfferBulkResult, OfferFacets, OfferIngestResult
+from schemas.offer_price_history import OfferPriceHistoryOutput
 from schemas.user import UserIn
 from services.offer_service import OfferService
+from utils.ndjson import iter_ndjson
 
 router = APIRouter(
     prefix="/offer",
@@ -31,6 +34,59 @@ def create(offer: List[OfferScraper], session: Session = Depends(get_db)):
     return _service
 
 
+@router.post("/bulk", status_code=201, response_model=OfferBulkResult)
+def create_bulk(offer: List[OfferScraper], session: Session = Depends(get_db)):
+    """
+    Create many offers in a single transaction, skipping the ones that already exist.
+
+    Args:
+        offer (List[OfferScraper]): Details of the offers to be created.
+        session (Session): Database session.
+
+    Returns:
+        OfferBulkResult: Per-offer outcome of the ingest.
+    """
+    _service = OfferService(session).bulk_create(offer)
+    return _service
+
+
+@router.put("/bulk", status_code=200, response_model=OfferBulkResult)
+def upsert_bulk(offer: List[OfferScraper], session: Session = Depends(get_db)):
+    """
+    Create new offers and refresh the ones that already exist, matched by details URL.
+
+    Args:
+        offer (List[OfferScraper]): Details of the offers to be created or refreshed.
+        session (Session): Database session.
+
+    Returns:
+        OfferBulkResult: Per-offer outcome of the ingest.
+    """
+    _service = OfferService(session).upsert(offer)
+    return _service
+
+
+@router.post("/stream", status_code=201, response_model=OfferIngestResult)
+async def create_stream(request: Request, upsert: bool = False, session: Session = Depends(get_db)):
+    """
+    Create offers from a newline delimited JSON body, optionally gzip-compressed.
+
+    The body is read as a stream and offers are validated and committed in chunks, so
+    batches of any size are stored without holding them in memory.
+
+    Args:
+        request (Request): The request, with one offer per line and `Content-Encoding: gzip` if compressed.
+        upsert (bool): Refresh offers that already exist instead of skipping them.
+        session (Session): Database session.
+
+    Returns:
+        OfferIngestResult: Totals of the ingest and the first invalid lines.
+    """
+    compressed = request.headers.get("Content-Encoding", "").lower() == "gzip"
+    _service = await OfferService(session).ingest_stream(iter_ndjson(request.stream(), compressed), upsert=upsert)
+    return _service
+
+
 @router.delete("/{_id}", status_code=204)
 def delete(_id: UUID4, session: Session = Depends(get_db),
            current_user: UserIn = Depends(get_current_user)):
@@ -51,6 +107,7 @@ def delete(_id: UUID4, session: Session = Depends(get_db),
 
 @router.get("", status_code=200)
 def get_all(
+        request: Request,
         session: Session = Depends(get_db),
         page: int = Query(1, gt=0),
         page_size: int = Query(15, gt=0),
@@ -65,12 +122,17 @@ def get_all(
         furniture: bool = Query(None),
         floor: int = Query(None),
         query: str = Query(None),
-        sort_by: OfferSortEnum = Query(OfferSortEnum.NEWEST)
+        sort_by: OfferSortEnum = Query(OfferSortEnum.NEWEST),
+        cursor: str = Query(None),
+        count: OfferCountEnum = Query(OfferCountEnum.NONE),
 ):
     """
     Retrieve all offers based on the provided filters and sorting criteria.
 
+    Anonymous requests are served from the response cache.
+
     Args:
+        request (Request): Incoming request.
         session (Session): Database session.
         page (int): Page number for pagination (default is 1).
         page_size (int): Number of offers per page (default is 15).
@@ -86,12 +148,14 @@ def get_all(
         floor (int): Floor filter.
         query (str): Search query.
         sort_by (OfferSortEnum): Sorting criteria (default is NEWEST).
+        cursor (str): `next_cursor` of the previous page, takes precedence over `page`.
+        count (OfferCountEnum): Whether to return an exact, an estimated or no total (default is NONE).
 
     Returns:
         List[OfferScraper]: List of offers based on the provided filters and sorting criteria.
     """
-    _service = OfferService(session).get_all(
-        offset=page,
+    params = dict(
+        page=page,
         page_size=page_size,
         category=category,
         sub_category=sub_category,
@@ -105,21 +169,99 @@ def get_all(
         floor=floor,
         query=query,
         sort_by=sort_by,
+        cursor=cursor,
+        count=count,
+    )
+    _service = OfferService(session)
+    if request.headers.get("Authorization"):
+        return _service.get_all(**params)
+    return Response(_service.get_all_cached(**params), media_type="application/json")
+
+
+@router.get("/facets", status_code=200, response_model=OfferFacets)
+def get_facets(
+        session: Session = Depends(get_db),
+        category: str = Query(None),
+        sub_category: str = Query(None),
+        building_type: str = Query(None),
+        price_min: int = Query(None, gt=0),
+        price_max: int = Query(None, gt=0),
+        area_min: int = Query(None, gt=0),
+        area_max: int = Query(None, gt=0),
+        rooms: int = Query(None, gt=0),
+        furniture: bool = Query(None),
+        floor: int = Query(None),
+        query: str = Query(None),
+):
+    """
+    Retrieve offer counts per category, sub-category, building type, rooms, furniture and price
+    bucket for the offers matching the provided filters.
+
+    Args:
+        session (Session): Database session.
+        category (str): Category filter.
+        sub_category (str): Sub-category filter.
+        building_type (str): Building type filter.
+        price_min (int): Minimum price filter.
+        price_max (int): Maximum price filter.
+        area_min (int): Minimum area filter.
+        area_max (int): Maximum area filter.
+        rooms (int): Number of rooms filter.
+        furniture (bool): Furniture filter.
+        floor (int): Floor filter.
+        query (str): Search query.
+
+    Returns:
+        OfferFacets: Offer counts per facet value.
+    """
+    _service = OfferService(session).get_facets(
+        category=category,
+        sub_category=sub_category,
+        building_type=building_type,
+        price_min=price_min,
+        price_max=price_max,
+        area_min=area_min,
+        area_max=area_max,
+        rooms=rooms,
+        furniture=furniture,
+        floor=floor,
+        query=query,
     )
     return _service
 
 
+@router.get("/{_id}/price-history", status_code=200, response_model=List[OfferPriceHistoryOutput])
+def get_price_history(_id: UUID4, session: Session = Depends(get_db)):
+    """
+    Retrieve the price and rent changes of an offer.
+
+    Args:
+        _id (UUID4): The ID of the offer.
+        session (Session): Database session.
+
+    Returns:
+        List[OfferPriceHistoryOutput]: Changes of the offer, oldest first.
+    """
+    _service = OfferService(session)
+    return _service.get_price_history(_id)
+
+
 @router.get("/{_id}", status_code=200)
-def get_details(_id: UUID4, session: Session = Depends(get_db)) -> Dict[str, Any]:
+def get_details(_id: UUID4, request: Request, session: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Retrieve details of a specific offer.
 
+    Anonymous requests are served from the response cache.
+
     Args:
         _id (UUID4): The ID of the offer to retrieve details for.
+        request (Request): Incoming request.
         session (Session): Database session.
 
     Returns:
         OfferScraper: Details of the requested offer.
     """
-    _service = OfferService(session).get_by_id(_id)
-    return _service
+    _service = OfferService(session)
+    if request.headers.get("Authorization"):
+        return _service.get_by_id(_id)
+    return Response(_service.get_by_id_cached(_id), media_type="application/json")
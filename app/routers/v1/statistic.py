@@ -1,8 +1,13 @@
+from datetime import datetime
+from typing import List
+
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from auth.auth import get_current_user
 from config.database import get_db
+from enums.price_change_group import PriceChangeGroupEnum
+from schemas.offer_price_history import PriceChangeStatistic
 from schemas.user import UserInDB
 from services.statistics.offer_statistic_service import OfferStatisticService
 from services.statistics.user_statistic_service import UserStatisticService
@@ -70,6 +75,50 @@ def get_offer_count_by_subcategory(
     return _service.count_offers_by_subcategory(current_user.id)
 
 
+@router.get("/offer/cache")
+def get_offer_cache_stats(
+        db: Session = Depends(get_db),
+        current_user: UserInDB = Depends(get_current_user)
+):
+    """
+    Retrieve hit and miss counters of the offer response cache.
+
+    Args:
+        db (Session): Database session.
+        current_user (UserInDB): Current user's details.
+
+    Returns:
+        Statistics: Hits and misses of cached offer listings and details.
+    """
+    _service = OfferStatisticService(db)
+    return _service.get_response_cache_stats(current_user.id)
+
+
+@router.get("/offer/price-changes", response_model=List[PriceChangeStatistic])
+def get_offer_price_changes(
+        group_by: PriceChangeGroupEnum = PriceChangeGroupEnum.CITY,
+        date_from: datetime = None,
+        date_to: datetime = None,
+        db: Session = Depends(get_db),
+        current_user: UserInDB = Depends(get_current_user)
+):
+    """
+    Retrieve price changes of rescraped offers grouped by city or by category.
+
+    Args:
+        group_by (PriceChangeGroupEnum): Whether to group by city or by category.
+        date_from (datetime): Start of the period, 30 days before its end by default.
+        date_to (datetime): End of the period, now by default.
+        db (Session): Database session.
+        current_user (UserInDB): Current user's details.
+
+    Returns:
+        List[PriceChangeStatistic]: Number of changes, increases, decreases and average prices per group.
+    """
+    _service = OfferStatisticService(db)
+    return _service.get_price_changes(current_user.id, group_by, date_from, date_to)
+
+
 @router.get("/user/timeline")
 def get_user_timeline(
         db: Session = Depends(get_db),
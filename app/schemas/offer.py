@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional
 
 from pydantic import BaseModel, UUID4
 
+from enums.offer_bulk_status import OfferBulkStatusEnum
 from models.offer import SubCategoryEnum, BuildingTypeEnum, CategoryEnum
 from schemas.location import CityOutput
 from schemas.photo import PhotoInput
@@ -73,3 +74,49 @@ class OfferList(BaseModel):
     page: int
     page_size: int
     offers: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+
+class PriceFacet(BaseModel):
+    min: float
+    max: Optional[float] = None
+    count: int
+
+
+class OfferFacets(BaseModel):
+    total: int
+    category: Dict[str, int]
+    sub_category: Dict[str, int]
+    building_type: Dict[str, int]
+    rooms: Dict[str, int]
+    furniture: Dict[str, int]
+    price: List[PriceFacet]
+
+
+class OfferBulkItem(BaseModel):
+    details_url: str
+    status: OfferBulkStatusEnum
+    id: Optional[UUID4] = None
+
+
+class OfferBulkResult(BaseModel):
+    created: int
+    skipped: int
+    updated: int = 0
+    items: List[OfferBulkItem]
+
+
+class OfferIngestError(BaseModel):
+    line: int
+    detail: str
+
+
+class OfferIngestResult(BaseModel):
+    created: int = 0
+    skipped: int = 0
+    updated: int = 0
+    invalid: int = 0
+    chunks: int = 0
+    errors: List[OfferIngestError] = []
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class OfferPriceHistoryOutput(BaseModel):
+    changed_at: datetime
+    price: Optional[float] = None
+    rent: Optional[float] = None
+    previous_price: Optional[float] = None
+    previous_rent: Optional[float] = None
+
+    class Config:
+        orm_mode = True
+
+
+class PriceChangeStatistic(BaseModel):
+    name: str
+    changes: int
+    increases: int
+    decreases: int
+    average_price: Optional[float] = None
+    average_price_change_percent: Optional[float] = None
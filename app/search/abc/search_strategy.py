@@ -0,0 +1,35 @@
+from abc import ABC, abstractmethod
+
+from sqlalchemy import ColumnElement
+
+
+class SearchStrategy(ABC):
+    """
+    Abstract base class for full-text search strategies over offers.
+    """
+
+    @abstractmethod
+    def match(self, query: str) -> ColumnElement[bool]:
+        """
+        Abstract method building the condition selecting offers matching the query.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            ColumnElement[bool]: The SQL condition.
+        """
+        pass
+
+    @abstractmethod
+    def rank(self, query: str) -> ColumnElement[float]:
+        """
+        Abstract method building the relevance of an offer for the query, higher is better.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            ColumnElement[float]: The SQL expression.
+        """
+        pass
@@ -0,0 +1,53 @@
+from sqlalchemy import ColumnElement, Float, cast, func, literal_column
+
+from models.offer_search import TEXT_SEARCH_CONFIG
+from .abc import search_strategy
+
+
+class PostgresSearchStrategy(search_strategy.SearchStrategy):
+    """
+    Search strategy using the GIN indexed `offers.search_vector` tsvector column.
+    """
+
+    search_vector = literal_column("offers.search_vector")
+
+    @staticmethod
+    def _ts_query(query: str) -> ColumnElement:
+        """
+        Build a tsquery from user input, accepting web search syntax such as quotes and `-`.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            ColumnElement: The tsquery expression.
+        """
+        return func.websearch_to_tsquery(literal_column(f"'{TEXT_SEARCH_CONFIG}'::regconfig"), query)
+
+    def match(self, query: str) -> ColumnElement[bool]:
+        """
+        Match offers whose title or description contains the query terms.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            ColumnElement[bool]: The SQL condition.
+        """
+        return self.search_vector.op("@@")(self._ts_query(query))
+
+    def rank(self, query: str) -> ColumnElement[float]:
+        """
+        Rank offers by cover density, title matches weigh more than description ones.
+
+        `ts_rank_cd` returns a float4, which is cast to double precision so that the sort, the
+        rank stored in listing cursors and the keyset comparison with it use the same type.
+        Otherwise offers tying on rank with the last offer of a page would be skipped.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            ColumnElement[float]: The SQL expression.
+        """
+        return cast(func.ts_rank_cd(self.search_vector, self._ts_query(query)), Float(53))
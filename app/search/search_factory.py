@@ -0,0 +1,20 @@
+from sqlalchemy.orm import Session
+
+from .abc.search_strategy import SearchStrategy
+from .postgres_search import PostgresSearchStrategy
+from .sqlite_search import SqliteSearchStrategy
+
+
+def get_search_strategy(session: Session) -> SearchStrategy:
+    """
+    Get the full-text search strategy for the database the session is bound to.
+
+    Args:
+        session (Session): The database session.
+
+    Returns:
+        SearchStrategy: PostgreSQL tsvector search, or the FTS5 fallback for SQLite.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return PostgresSearchStrategy()
+    return SqliteSearchStrategy()
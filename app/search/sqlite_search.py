@@ -0,0 +1,73 @@
+import re
+
+from sqlalchemy import ColumnElement, column, func, literal_column, select, table
+
+from .abc import search_strategy
+
+
+class SqliteSearchStrategy(search_strategy.SearchStrategy):
+    """
+    Search strategy using the `offers_fts` FTS5 table, used by DEBUG SQLite databases.
+    """
+
+    fts_table = table("offers_fts", column("rowid"))
+    offer_rowid = literal_column("offers.rowid")
+    # bm25 weights of the title and description columns
+    weights = (10.0, 1.0)
+
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        """
+        Turn user input into an FTS5 query matching every word as a prefix.
+
+        Words are quoted, so FTS5 operators typed by the user are treated as plain text.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            str: The FTS5 query.
+        """
+        words = re.findall(r"\w+", query)
+        return " ".join(f'"{word}"*' for word in words) or '""'
+
+    def _matching(self, query: str) -> ColumnElement[bool]:
+        """
+        Build the FTS5 MATCH condition.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            ColumnElement[bool]: The SQL condition on `offers_fts`.
+        """
+        return literal_column("offers_fts").op("MATCH")(self._fts_query(query))
+
+    def match(self, query: str) -> ColumnElement[bool]:
+        """
+        Match offers whose title or description contains the query words.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            ColumnElement[bool]: The SQL condition.
+        """
+        return self.offer_rowid.in_(select(self.fts_table.c.rowid).where(self._matching(query)))
+
+    def rank(self, query: str) -> ColumnElement[float]:
+        """
+        Rank offers with bm25, title matches weigh more than description ones.
+
+        Args:
+            query (str): The search query entered by the user.
+
+        Returns:
+            ColumnElement[float]: The SQL expression.
+        """
+        bm25 = select(func.bm25(literal_column("offers_fts"), *self.weights)).where(
+            self._matching(query),
+            self.fts_table.c.rowid == self.offer_rowid,
+        ).scalar_subquery()
+        # bm25 is lower for better matches
+        return -bm25
@@ -1,23 +1,42 @@
-from typing import Dict, Any, List
+from enum import Enum
+from typing import Dict, Any, AsyncIterator, Iterable, List, Tuple
 
 from fastapi import HTTPException
-from pydantic import UUID4
+from fastapi.concurrency import run_in_threadpool
+from pydantic import UUID4, ValidationError
 from sqlalchemy.orm import Session
 
+from config.settings import settings
+from enums.offer_bulk_status import OfferBulkStatusEnum
+from enums.offer_count import OfferCountEnum
 from enums.offer_sort import OfferSortEnum
 from models.offer import Offer
+from models.offer_price_history import OfferPriceHistory
 from repositories.city_repository import CityRepository
+from repositories.offer_price_history_repository import OfferPriceHistoryRepository
 from repositories.offer_repository import OfferRepository
 from repositories.region_repository import RegionRepository
-from schemas.location import RegionInput, CityInput
-from schemas.offer import OfferScraper, OfferList
+from schemas.offer import (
+    OfferScraper, OfferList, OfferBulkItem, OfferBulkResult, OfferFacets, OfferIngestError, OfferIngestResult
+)
 from services.user_service import UserService
+from utils.location_cache import region_cache, city_cache
+from utils.response_cache import ResponseCache
+from utils.ttl_cache import TTLCache
+
+facet_cache = TTLCache(maxsize=settings.FACET_CACHE_SIZE, ttl=settings.FACET_CACHE_TTL)
+count_cache = TTLCache(maxsize=settings.COUNT_CACHE_SIZE, ttl=settings.COUNT_CACHE_TTL)
+response_cache = ResponseCache.from_url(settings.RESPONSE_CACHE_URL, ttl=settings.RESPONSE_CACHE_TTL)
 
 
 class OfferService:
     """
     Service class for handling offers.
     """
+    LISTING_CACHE = "offer:list"
+    DETAILS_CACHE = "offer:details"
+    # Maximum number of invalid lines reported back by a streaming ingest
+    INGEST_MAX_ERRORS = 100
 
     def __init__(self, session: Session):
         """
@@ -27,6 +46,7 @@ class OfferService:
             session (Session): Database session.
         """
         self.repository = OfferRepository(session)
+        self.price_history_repository = OfferPriceHistoryRepository(session)
         self.region_repository = RegionRepository(session)
         self.city_repository = CityRepository(session)
         self.user_service = UserService(session)
@@ -42,22 +62,217 @@ class OfferService:
             List[Offer}: Details of the created offers.
         """
         result = []
+        try:
+            for offer in offers:
+
+                if self.repository.offer_exists_by_url(offer.details_url):
+                    raise HTTPException(status_code=400, detail="Offer already exists")
+
+                city_ids, region_ids = self._resolve_city_ids([offer])
+                result.append(self.repository.create(offer, city_ids[offer.city_name]))
+                city_cache.set_many(city_ids)
+                region_cache.set_many(region_ids)
+        finally:
+            # offers created before a duplicate was found are already committed
+            if result:
+                self.invalidate_cache()
+        return result
+
+    def bulk_create(self, offers: List[OfferScraper]) -> OfferBulkResult:
+        """
+        Create many offers at once, skipping the ones that already exist.
+
+        Existing offers, regions and cities are looked up with one query each, missing
+        regions, cities, offers and photos are inserted with multi-row INSERTs and
+        everything is committed in a single transaction.
+
+        Args:
+            offers (List[OfferScraper]): Details of the offers to be created.
+
+        Returns:
+            OfferBulkResult: Per-offer outcome of the ingest.
+        """
+        known_urls = self.repository.get_existing_urls(offer.details_url for offer in offers)
+
+        new_offers = []
+        for offer in offers:
+            if offer.details_url in known_urls:
+                continue
+            known_urls.add(offer.details_url)
+            new_offers.append(offer)
+
+        city_ids, region_ids = self._resolve_city_ids(new_offers)
+        created_ids = dict(zip(
+            (offer.details_url for offer in new_offers),
+            self.repository.create_many(new_offers, city_ids)
+        ))
+        city_cache.set_many(city_ids)
+        region_cache.set_many(region_ids)
+        if created_ids:
+            self.invalidate_cache()
+
+        items = []
+        for offer in offers:
+            _id = created_ids.pop(offer.details_url, None)
+            if _id:
+                items.append(OfferBulkItem(details_url=offer.details_url, status=OfferBulkStatusEnum.CREATED, id=_id))
+            else:
+                items.append(OfferBulkItem(details_url=offer.details_url, status=OfferBulkStatusEnum.SKIPPED))
+
+        return OfferBulkResult(created=len(new_offers), skipped=len(offers) - len(new_offers), items=items)
+
+    def upsert(self, offers: List[OfferScraper]) -> OfferBulkResult:
+        """
+        Create new offers and refresh already stored ones in a single statement.
+
+        Offers that already exist and did not change are reported as skipped.
+
+        Args:
+            offers (List[OfferScraper]): Details of the offers to be created or refreshed.
+
+        Returns:
+            OfferBulkResult: Per-offer outcome of the ingest.
+        """
+        city_ids, region_ids = self._resolve_city_ids(offers)
+        created, updated = self.repository.upsert_many(offers, city_ids)
+        city_cache.set_many(city_ids)
+        region_cache.set_many(region_ids)
+        if created or updated:
+            self.invalidate_cache(updated.values())
+
+        items = []
         for offer in offers:
+            if offer.details_url in created:
+                item = OfferBulkItem(
+                    details_url=offer.details_url,
+                    status=OfferBulkStatusEnum.CREATED,
+                    id=created.pop(offer.details_url)
+                )
+            elif offer.details_url in updated:
+                item = OfferBulkItem(
+                    details_url=offer.details_url,
+                    status=OfferBulkStatusEnum.UPDATED,
+                    id=updated.pop(offer.details_url)
+                )
+            else:
+                item = OfferBulkItem(details_url=offer.details_url, status=OfferBulkStatusEnum.SKIPPED)
+            items.append(item)
+
+        return OfferBulkResult(
+            created=sum(item.status == OfferBulkStatusEnum.CREATED for item in items),
+            updated=sum(item.status == OfferBulkStatusEnum.UPDATED for item in items),
+            skipped=sum(item.status == OfferBulkStatusEnum.SKIPPED for item in items),
+            items=items,
+        )
+
+    async def ingest_stream(
+            self,
+            lines: AsyncIterator[bytes],
+            chunk_size: int = settings.OFFER_INGEST_CHUNK_SIZE,
+            upsert: bool = False,
+    ) -> OfferIngestResult:
+        """
+        Create offers from a stream of JSON documents, validating and committing them in chunks.
+
+        Only one chunk is held in memory at a time. Every chunk is stored like `bulk_create`
+        (or `upsert`) in its own transaction, so chunks committed before a failure stay
+        stored and the stream can be sent again. Invalid lines are counted and skipped.
+
+        Args:
+            lines (AsyncIterator[bytes]): One offer JSON document per item.
+            chunk_size (int): Number of offers committed at once.
+            upsert (bool): Refresh offers that already exist instead of skipping them.
+
+        Returns:
+            OfferIngestResult: Totals of the ingest and the first invalid lines.
+
+        Raises:
+            HTTPException: If the stream cannot be decoded.
+        """
+        result = OfferIngestResult()
+        store = self.upsert if upsert else self.bulk_create
 
-            if self.repository.offer_exists_by_url(offer.details_url):
-                raise HTTPException(status_code=400, detail="Offer already exists")
+        async def flush(chunk: List[OfferScraper]) -> None:
+            chunk_result = await run_in_threadpool(store, chunk)
+            result.created += chunk_result.created
+            result.updated += chunk_result.updated
+            result.skipped += chunk_result.skipped
+            result.chunks += 1
 
-            if not self.region_repository.region_exists_by_name(offer.region_name):
-                self.region_repository.create(RegionInput(name=offer.region_name))
-            region = self.region_repository.get_by_name(offer.region_name)
+        chunk, line_number = [], 0
 
-            if not self.city_repository.city_exists_by_name(offer.city_name):
-                self.city_repository.create(CityInput(name=offer.city_name, region_id=region.id))
-            city = self.city_repository.get_by_name(offer.city_name)
+        async def decoded_lines() -> AsyncIterator[bytes]:
+            # Only decoding errors are the client's fault, errors while storing are not caught here
+            try:
+                async for decoded_line in lines:
+                    yield decoded_line
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=400, detail=f"{e}, {result.chunks} chunks before line {line_number + 1} were stored"
+                )
 
-            result.append(self.repository.create(offer, city.id))
+        async for line in decoded_lines():
+            line_number += 1
+            try:
+                chunk.append(OfferScraper.model_validate_json(line))
+            except ValidationError as e:
+                result.invalid += 1
+                if len(result.errors) < self.INGEST_MAX_ERRORS:
+                    result.errors.append(OfferIngestError(line=line_number, detail=str(e)))
+                continue
+
+            if len(chunk) >= chunk_size:
+                await flush(chunk)
+                chunk = []
+
+        if chunk:
+            await flush(chunk)
         return result
 
+    def _resolve_city_ids(self, offers: List[OfferScraper]) -> Tuple[Dict[str, UUID4], Dict[str, UUID4]]:
+        """
+        Resolve city IDs for the given offers, creating missing regions and cities.
+
+        Follows the same rules as `create`: cities are matched by name and a missing
+        city is created in the region named by the first offer that references it.
+        Known names are served from the location caches without querying the database.
+        Created regions and cities are not committed, so the caller caches them once
+        its transaction is committed.
+
+        Args:
+            offers (List[OfferScraper]): Offers to resolve cities for.
+
+        Returns:
+            Tuple[Dict[str, UUID4], Dict[str, UUID4]]: Mappings of city name to city ID and of
+            region name to region ID for the regions of created cities.
+        """
+        city_names = {offer.city_name for offer in offers}
+        city_ids = city_cache.get_many(city_names)
+        if len(city_ids) < len(city_names):
+            stored_city_ids = self.city_repository.get_ids_by_names(city_names - city_ids.keys())
+            city_cache.set_many(stored_city_ids)
+            city_ids.update(stored_city_ids)
+
+        missing_cities = {}
+        for offer in offers:
+            if offer.city_name not in city_ids:
+                missing_cities.setdefault(offer.city_name, offer.region_name)
+        if not missing_cities:
+            return city_ids, {}
+
+        region_names = set(missing_cities.values())
+        region_ids = region_cache.get_many(region_names)
+        if len(region_ids) < len(region_names):
+            stored_region_ids = self.region_repository.get_ids_by_names(region_names - region_ids.keys())
+            region_cache.set_many(stored_region_ids)
+            region_ids.update(stored_region_ids)
+        region_ids.update(self.region_repository.create_many(region_names - region_ids.keys()))
+
+        city_ids.update(self.city_repository.create_many(
+            {city_name: region_ids[region_name] for city_name, region_name in missing_cities.items()}
+        ))
+        return city_ids, region_ids
+
     def delete(self, _id: int, user_id: UUID4) -> bool:
         """
         Delete an offer.
@@ -76,11 +291,12 @@ class OfferService:
             raise HTTPException(status_code=404, detail="Offer not found")
         offer = self.repository.get_offer_by_id(_id)
         self.repository.delete(offer)
+        self.invalidate_cache([_id])
         return True
 
     def get_all(
             self,
-            offset: int = 1,
+            page: int = 1,
             page_size: int = 15,
             category: str = None,
             sub_category: str = None,
@@ -93,13 +309,15 @@ class OfferService:
             furniture: bool = None,
             floor: int = None,
             query: str = None,
-            sort_by: OfferSortEnum = OfferSortEnum.NEWEST
+            sort_by: OfferSortEnum = OfferSortEnum.NEWEST,
+            cursor: str = None,
+            count: OfferCountEnum = OfferCountEnum.NONE
     ) -> OfferList:
         """
         Retrieve a list of offers based on filtering criteria.
 
         Args:
-            offset (int): Offset for pagination.
+            page (int): Page number for pagination.
             page_size (int): Number of offers per page.
             category (str): Offer category.
             sub_category (str): Offer sub-category.
@@ -113,27 +331,99 @@ class OfferService:
             floor (int): Floor number.
             query (str): Search query.
             sort_by (OfferSortEnum): Sorting criteria.
+            cursor (str): Cursor of the next page, takes precedence over `page`.
+            count (OfferCountEnum): How to compute the total number of matching offers: exactly,
+                as the database planner estimate (falling back to a cached exact count) or not at all.
 
         Returns:
             OfferList: List of offers based on the provided criteria.
         """
-        return self.repository.get_all(
-            offset,
-            page_size,
-            category,
-            sub_category,
-            building_type,
-            price_min,
-            price_max,
-            area_min,
-            area_max,
-            rooms,
-            furniture,
-            floor,
-            query,
-            sort_by
+        filters = dict(
+            category=category,
+            sub_category=sub_category,
+            building_type=building_type,
+            price_min=price_min,
+            price_max=price_max,
+            area_min=area_min,
+            area_max=area_max,
+            rooms=rooms,
+            furniture=furniture,
+            floor=floor,
+            query=query,
+        )
+        try:
+            result = self.repository.get_all(page, page_size, sort_by=sort_by, cursor=cursor, **filters)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+        if count == OfferCountEnum.EXACT:
+            result.total = self.repository.count(**filters)
+        elif count == OfferCountEnum.ESTIMATE:
+            result.total = self.repository.estimate_count(**filters)
+            if result.total is None:
+                result.total = count_cache.get_or_set(
+                    self.normalize_filters(filters),
+                    lambda: self.repository.count(**filters)
+                )
+            result.total_is_estimate = True
+        return result
+
+    def get_all_cached(self, **params: Any) -> bytes:
+        """
+        Retrieve the serialized offer listing, served from the response cache when possible.
+
+        Args:
+            **params (Any): Listing parameters, as accepted by `get_all`.
+
+        Returns:
+            bytes: JSON-encoded `OfferList`.
+        """
+        return response_cache.get_or_set(
+            self.LISTING_CACHE,
+            self.normalize_filters(params),
+            lambda: self.get_all(**params)
+        )
+
+    def get_facets(self, **filters: Any) -> OfferFacets:
+        """
+        Retrieve per-facet offer counts for a filter set, cached per normalized filter set.
+
+        Args:
+            **filters (Any): Listing filters, as accepted by `get_all`.
+
+        Returns:
+            OfferFacets: Counts per facet value.
+        """
+        return facet_cache.get_or_set(
+            self.normalize_filters(filters),
+            lambda: self.repository.get_facets(**filters)
         )
 
+    @staticmethod
+    def normalize_filters(filters: Dict[str, Any]) -> Tuple[Tuple[str, Any], ...]:
+        """
+        Build a hashable key identifying a filter set.
+
+        Unset filters are dropped, enums are replaced by their values and the search query
+        is lowercased, so equivalent requests share the key.
+
+        Args:
+            filters (Dict[str, Any]): Listing filters.
+
+        Returns:
+            Tuple[Tuple[str, Any], ...]: Sorted (name, value) pairs of the set filters.
+        """
+        normalized = []
+        for name, value in filters.items():
+            if value is None or value == "":
+                continue
+            if isinstance(value, Enum):
+                value = value.value
+            if name == "query":
+                value = " ".join(value.lower().split())
+            normalized.append((name, value))
+        return tuple(sorted(normalized))
+
     def get_by_id(self, _id: UUID4) -> Dict[str, Any]:
         """
         Retrieve details of an offer by its ID.
@@ -147,3 +437,42 @@ class OfferService:
         if not self.repository.offer_exists_by_id(_id):
             raise HTTPException(status_code=404, detail="Offer not found")
         return self.repository.get_details(_id)
+
+    def get_price_history(self, _id: UUID4) -> List[OfferPriceHistory]:
+        """
+        Retrieve the price and rent changes of an offer recorded when it was rescraped.
+
+        Args:
+            _id (UUID4): ID of the offer.
+
+        Returns:
+            List[OfferPriceHistory]: The changes, oldest first.
+        """
+        if not self.repository.offer_exists_by_id(_id):
+            raise HTTPException(status_code=404, detail="Offer not found")
+        return self.price_history_repository.get_by_offer_id(_id)
+
+    def get_by_id_cached(self, _id: UUID4) -> bytes:
+        """
+        Retrieve serialized details of an offer, served from the response cache when possible.
+
+        Args:
+            _id (UUID4): ID of the offer.
+
+        Returns:
+            bytes: JSON-encoded details of the offer.
+        """
+        return response_cache.get_or_set(self.DETAILS_CACHE, str(_id), lambda: self.get_by_id(_id))
+
+    def invalidate_cache(self, offer_ids: Iterable[UUID4] = ()) -> None:
+        """
+        Drop cached responses after offers were written.
+
+        Every listing may contain a new or changed offer, so all cached listings are dropped,
+        while cached details are only dropped for the given offers.
+
+        Args:
+            offer_ids (Iterable[UUID4]): IDs of the changed or deleted offers.
+        """
+        response_cache.invalidate(self.LISTING_CACHE)
+        response_cache.invalidate(self.DETAILS_CACHE, [str(_id) for _id in offer_ids])
@@ -1,10 +1,14 @@
-from typing import List, Dict
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional
 
 from fastapi import HTTPException
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
+from enums.price_change_group import PriceChangeGroupEnum
 from repositories.statistics.offer_statistic_repository import OfferStatisticRepository
+from schemas.offer_price_history import PriceChangeStatistic
+from services.offer_service import OfferService, response_cache
 from services.user_service import UserService
 
 
@@ -67,3 +71,44 @@ class OfferStatisticService:
             raise HTTPException(status_code=403, detail="Forbidden")
 
         return self.repository.count_offers_by_subcategory()
+
+    def get_response_cache_stats(self, user_id: UUID4) -> Dict[str, Dict[str, int]]:
+        """
+        Get hit and miss counters of the offer listing and details response cache.
+
+        Args:
+            user_id (UUID4): User ID.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Hits and misses per cached endpoint.
+        """
+        if not self.user_service.is_superuser(user_id):
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+        return response_cache.stats([OfferService.LISTING_CACHE, OfferService.DETAILS_CACHE])
+
+    def get_price_changes(
+            self,
+            user_id: UUID4,
+            group_by: PriceChangeGroupEnum,
+            date_from: Optional[datetime] = None,
+            date_to: Optional[datetime] = None,
+    ) -> List[PriceChangeStatistic]:
+        """
+        Get price change statistics of rescraped offers by city or by category.
+
+        Args:
+            user_id (UUID4): User ID.
+            group_by (PriceChangeGroupEnum): Whether to group by city or by category.
+            date_from (Optional[datetime]): Start of the period, 30 days before its end by default.
+            date_to (Optional[datetime]): End of the period, now by default.
+
+        Returns:
+            List[PriceChangeStatistic]: Statistics per group, most changes first.
+        """
+        if not self.user_service.is_superuser(user_id):
+            raise HTTPException(status_code=403, detail="Forbidden")
+
+        date_to = date_to or datetime.now()
+        date_from = date_from or date_to - timedelta(days=30)
+        return self.repository.get_price_changes(group_by, date_from, date_to)
@@ -2,7 +2,9 @@ from celery import Celery
 from celery.schedules import crontab
 from sqlalchemy.orm import Session
 
+from config.database import SessionLocal
 from config.settings import settings
+from models.offer_price_history import create_partitions
 from notification.context import Context
 from notification.email_notification import EmailNotificationStrategy
 from schemas.notification import NotificationInput
@@ -20,10 +22,24 @@ celery_app.conf.beat_schedule = {
     "create_notification": {
         "task": "create_notifications",
         "schedule": crontab(minute="0", hour="0")
-    }
+    },
+    "create_price_history_partitions": {
+        "task": "create_price_history_partitions",
+        "schedule": crontab(minute="30", hour="0")
+    },
 }
 
 
+@celery_app.task(name="create_price_history_partitions")
+def create_price_history_partitions() -> None:
+    """
+    Celery task to create the monthly price history partitions ahead of the rows written to them.
+    """
+    with SessionLocal() as session:
+        create_partitions(session.connection())
+        session.commit()
+
+
 @celery_app.task(name="create_notifications")
 def create_notifications(db: Session) -> None:
     """
@@ -39,7 +55,7 @@ def create_notifications(db: Session) -> None:
             continue
 
         offers = OfferService(db).get_all(
-            offset=1,
+            page=1,
             page_size=100,
             category=notification_filter.category,
             sub_category=notification_filter.sub_category,
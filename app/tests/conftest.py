@@ -9,10 +9,11 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from models import offer, location, user, favourite, photo, notification, notification_filter
+from models import offer, location, user, favourite, photo, notification, notification_filter, offer_price_history
 from config.database import get_db
 from routers.api import router
 from utils.init_db import create_tables
+from utils.location_cache import region_cache, city_cache
 
 engine = create_engine(
     "sqlite:///:memory:",
@@ -30,6 +31,16 @@ def test_init_db() -> None:
     favourite.Favorite.metadata.create_all(bind=engine)
     notification.Notification.metadata.create_all(bind=engine)
     notification_filter.NotificationFilter.metadata.create_all(bind=engine)
+    offer_price_history.OfferPriceHistory.metadata.create_all(bind=engine)
+
+
+@pytest.fixture(autouse=True)
+def clear_location_cache() -> None:
+    """
+    Every test starts with an empty database, so cached location IDs must not leak between tests.
+    """
+    region_cache.clear()
+    city_cache.clear()
 
 
 def start_app():
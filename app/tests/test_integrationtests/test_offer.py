@@ -1,3 +1,7 @@
+import gzip
+import json
+
+from services.offer_service import facet_cache, count_cache
 from .fixtures import user_admin_access_token, user, user_access_token, city, region, offer, offer_data, user_admin
 
 
@@ -149,3 +153,160 @@ def test_error_return_status_code_404_get_offer_not_found(client) -> None:
         f"/api/v1/offer/279dcf76-a100-48b2-9fd4-f891d5093f4c",
     )
     assert response.status_code == 404
+
+
+def test_success_return_status_code_200_get_offer_price_history(client, offer) -> None:
+    test_client, test_session = client
+
+    response = test_client.put(
+        "/api/v1/offer/bulk",
+        json=[{**offer_data, "price": 1200.00}],
+    )
+    assert response.status_code == 200
+
+    response = test_client.get(
+        f"/api/v1/offer/{offer.id}/price-history",
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.json()[0]["previous_price"] == 1000.00
+    assert response.json()[0]["price"] == 1200.00
+
+
+def test_error_return_status_code_404_get_offer_price_history_not_found(client) -> None:
+    test_client, test_session = client
+
+    response = test_client.get(
+        f"/api/v1/offer/279dcf76-a100-48b2-9fd4-f891d5093f4c/price-history",
+    )
+    assert response.status_code == 404
+
+
+def test_success_return_status_code_201_create_bulk_offer(client) -> None:
+    test_client, test_session = client
+
+    response = test_client.post(
+        "/api/v1/offer/bulk",
+        json=[offer_data, {**offer_data, "details_url": "string2"}],
+    )
+    assert response.status_code == 201
+    assert response.json()["created"] == 2
+    assert response.json()["skipped"] == 0
+
+
+def test_success_create_bulk_offer_skips_duplicates(client, offer) -> None:
+    test_client, test_session = client
+
+    response = test_client.post(
+        "/api/v1/offer/bulk",
+        json=[offer_data, {**offer_data, "details_url": "string2"}, {**offer_data, "details_url": "string2"}],
+    )
+    assert response.status_code == 201
+    assert response.json()["created"] == 1
+    assert response.json()["skipped"] == 2
+    assert [item["status"] for item in response.json()["items"]] == ["skipped", "created", "skipped"]
+
+
+def test_success_return_status_code_200_upsert_bulk_offer(client, offer) -> None:
+    test_client, test_session = client
+
+    response = test_client.put(
+        "/api/v1/offer/bulk",
+        json=[{**offer_data, "price": 1000.00}, {**offer_data, "details_url": "string2"}],
+    )
+    assert response.status_code == 200
+    assert response.json()["created"] == 1
+    assert response.json()["updated"] == 1
+    assert response.json()["skipped"] == 0
+
+
+def test_error_return_status_code_400_get_offers_invalid_cursor(client, offer) -> None:
+    test_client, test_session = client
+
+    response = test_client.get(
+        "/api/v1/offer?cursor=invalid",
+    )
+    assert response.status_code == 400
+
+
+def test_success_return_status_code_200_get_offers_sort_by_relevance(client, offer) -> None:
+    test_client, test_session = client
+
+    response = test_client.get(
+        "/api/v1/offer?query=test&sort_by=relevance",
+    )
+    assert response.status_code == 200
+    assert len(response.json()["offers"]) == 1
+
+
+def test_success_return_status_code_200_get_offer_facets(client, offer) -> None:
+    test_client, test_session = client
+    facet_cache.clear()
+
+    response = test_client.get(
+        "/api/v1/offer/facets?category=Mieszkanie",
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert response.json()["category"]["Mieszkanie"] == 1
+
+
+def test_success_return_status_code_200_get_offers_exact_count(client, offer) -> None:
+    test_client, test_session = client
+
+    response = test_client.get(
+        "/api/v1/offer?count=exact&page_size=1",
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert response.json()["total_is_estimate"] is False
+
+
+def test_success_return_status_code_200_get_offers_estimated_count(client, offer) -> None:
+    test_client, test_session = client
+    count_cache.clear()
+
+    response = test_client.get(
+        "/api/v1/offer?count=estimate",
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    assert response.json()["total_is_estimate"] is True
+
+
+def test_success_return_status_code_200_get_offers_without_count(client, offer) -> None:
+    test_client, test_session = client
+
+    response = test_client.get(
+        "/api/v1/offer",
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] is None
+
+
+def test_success_return_status_code_201_create_stream_offer(client, offer) -> None:
+    test_client, test_session = client
+    lines = [json.dumps({**offer_data, "details_url": f"stream{i}"}) for i in range(5)]
+    body = "\n".join([json.dumps(offer_data), *lines, "{\"title\": \"invalid\"}", ""]).encode()
+
+    response = test_client.post(
+        "/api/v1/offer/stream",
+        content=gzip.compress(body),
+        headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 201
+    assert response.json()["created"] == 5
+    assert response.json()["skipped"] == 1
+    assert response.json()["invalid"] == 1
+    assert response.json()["errors"][0]["line"] == 7
+
+
+def test_error_return_status_code_400_create_stream_offer_invalid_gzip(client) -> None:
+    test_client, test_session = client
+
+    response = test_client.post(
+        "/api/v1/offer/stream",
+        content=b"not gzip",
+        headers={"Content-Type": "application/x-ndjson", "Content-Encoding": "gzip"},
+    )
+    assert response.status_code == 400
@@ -0,0 +1,32 @@
+from utils.lru_cache import LRUCache
+
+
+def test_success_lru_cache_get_many_returns_cached_keys() -> None:
+    cache = LRUCache(maxsize=10)
+    cache.set_many({"a": 1, "b": 2})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "b": 2}
+
+
+def test_success_lru_cache_evicts_least_recently_used() -> None:
+    cache = LRUCache(maxsize=2)
+    cache.set_many({"a": 1, "b": 2})
+    cache.get_many(["a"])
+    cache.set_many({"c": 3})
+
+    assert cache.get_many(["a", "b", "c"]) == {"a": 1, "c": 3}
+
+
+def test_success_lru_cache_discard() -> None:
+    cache = LRUCache(maxsize=10)
+    cache.set_many({"a": 1, "b": 2})
+    cache.discard("a", "missing")
+
+    assert cache.get_many(["a", "b"]) == {"b": 2}
+
+
+def test_success_lru_cache_disabled_with_zero_size() -> None:
+    cache = LRUCache(maxsize=0)
+    cache.set_many({"a": 1})
+
+    assert len(cache) == 0
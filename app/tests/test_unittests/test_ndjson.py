@@ -0,0 +1,31 @@
+import asyncio
+import gzip
+
+import pytest
+
+from utils.ndjson import iter_ndjson
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _lines(data: bytes, size: int, compressed: bool = False):
+    async def collect():
+        return [line async for line in iter_ndjson(_chunks(data, size), compressed)]
+
+    return asyncio.run(collect())
+
+
+def test_success_iter_ndjson_lines_split_across_chunks() -> None:
+    assert _lines(b'{"a": 1}\n\n{"b": 2}\n{"c": 3}', 3) == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+
+def test_success_iter_ndjson_gzip() -> None:
+    assert _lines(gzip.compress(b'{"a": 1}\n{"b": 2}\n'), 5, compressed=True) == [b'{"a": 1}', b'{"b": 2}']
+
+
+def test_error_iter_ndjson_truncated_gzip() -> None:
+    with pytest.raises(ValueError):
+        _lines(gzip.compress(b'{"a": 1}\n' * 100)[:-10], 5, compressed=True)
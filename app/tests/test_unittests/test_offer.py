@@ -1,16 +1,25 @@
+import asyncio
 import os
 import sys
+from datetime import datetime, timedelta
 
 import pytest
+from sqlalchemy import event
 
 from ..conftest import test_get_db
+from enums.offer_sort import OfferSortEnum
+from enums.price_change_group import PriceChangeGroupEnum
 from models.offer import SubCategoryEnum, CategoryEnum, BuildingTypeEnum
 from repositories.city_repository import CityRepository
+from repositories.offer_price_history_repository import OfferPriceHistoryRepository
 from repositories.offer_repository import OfferRepository
 from repositories.region_repository import RegionRepository
+from repositories.statistics.offer_statistic_repository import OfferStatisticRepository
 from schemas.location import CityInput, RegionInput
 from schemas.offer import OfferScraper
 from schemas.photo import PhotoInput
+from services.offer_service import OfferService
+from utils.location_cache import warm_location_cache, city_cache, region_cache
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -83,3 +92,283 @@ def test_success_offer_exists_by_id(test_get_db, offer, city) -> None:
     repository = OfferRepository(test_get_db)
     offer = repository.create(offer, city.id)
     assert repository.offer_exists_by_id(offer.id)
+
+
+def test_success_create_many_offers(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    second = offer.model_copy(update={"details_url": "https://google.com/2"})
+    ids = repository.create_many([offer, second], {"Łódź": city.id})
+
+    assert len(ids) == 2
+    created = repository.get_offer_by_id(ids[0])
+    assert created.details_url == "https://google.com"
+    assert created.city_id == city.id
+    assert created.photos[0].url == "https://google.com/img123"
+    assert repository.get_existing_urls(["https://google.com", "https://google.com/2", "https://other.com"]) == {
+        "https://google.com", "https://google.com/2"
+    }
+
+
+def test_success_upsert_many_offers(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    created, updated = repository.upsert_many([offer], {"Łódź": city.id})
+    assert list(created) == ["https://google.com"]
+    assert updated == {}
+
+    stored = repository.get_offer_by_id(created["https://google.com"])
+    first_updated_at = stored.updated_at
+
+    created, updated = repository.upsert_many([offer], {"Łódź": city.id})
+    assert created == {}
+    assert updated == {}
+
+    created, updated = repository.upsert_many([offer.model_copy(update={"price": 500.0})], {"Łódź": city.id})
+    assert created == {}
+    assert list(updated) == ["https://google.com"]
+
+    test_get_db.expire_all()
+    stored = repository.get_offer_by_id(updated["https://google.com"])
+    assert stored.price == 500.0
+    assert stored.updated_at >= first_updated_at
+    assert len(stored.photos) == 1
+
+
+def test_success_upsert_many_records_price_changes_only(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    created, _ = repository.upsert_many([offer], {"Łódź": city.id})
+    offer_id = created["https://google.com"]
+    history_repository = OfferPriceHistoryRepository(test_get_db)
+
+    repository.upsert_many([offer.model_copy(update={"description": "changed"})], {"Łódź": city.id})
+    assert history_repository.get_by_offer_id(offer_id) == []
+
+    repository.upsert_many([offer.model_copy(update={"price": 1200.0})], {"Łódź": city.id})
+    repository.upsert_many([offer.model_copy(update={"price": 1200.0, "rent": 150})], {"Łódź": city.id})
+
+    history = history_repository.get_by_offer_id(offer_id)
+    assert [(row.previous_price, row.price, row.previous_rent, row.rent) for row in history] == [
+        (999.999, 1200.0, 100, 100),
+        (1200.0, 1200.0, 100, 150),
+    ]
+
+    statistics = OfferStatisticRepository(test_get_db).get_price_changes(
+        PriceChangeGroupEnum.CATEGORY, datetime.now() - timedelta(days=1), datetime.now() + timedelta(days=1)
+    )
+    assert len(statistics) == 1
+    assert statistics[0].name == CategoryEnum.POKOJ.value
+    assert statistics[0].changes == 2
+    assert statistics[0].increases == 1
+    assert statistics[0].decreases == 0
+
+
+def test_success_get_all_query_count_does_not_depend_on_page_size(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many(
+        [offer.model_copy(update={"details_url": f"https://google.com/{i}"}) for i in range(10)],
+        {"Łódź": city.id}
+    )
+    test_get_db.expire_all()
+
+    statements = []
+
+    def count_statement(*args, **kwargs):
+        statements.append(args)
+
+    bind = test_get_db.get_bind()
+    event.listen(bind, "before_cursor_execute", count_statement)
+    try:
+        small_page = repository.get_all(page=1, page_limit=2)
+        small_page_queries = len(statements)
+        test_get_db.expire_all()
+        statements.clear()
+        large_page = repository.get_all(page=1, page_limit=10)
+        large_page_queries = len(statements)
+    finally:
+        event.remove(bind, "before_cursor_execute", count_statement)
+
+    assert small_page.page_size == 2
+    assert large_page.page_size == 10
+    assert small_page_queries == large_page_queries == 2
+
+
+@pytest.mark.parametrize("sort_by", list(OfferSortEnum))
+def test_success_get_all_cursor_pagination_visits_every_offer_once(test_get_db, offer, city, sort_by) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many(
+        [
+            offer.model_copy(update={"details_url": f"https://google.com/{i}", "price": [None, 100.0, 200.0][i % 3]})
+            for i in range(10)
+        ],
+        {"Łódź": city.id}
+    )
+
+    expected = [item["id"] for item in repository.get_all(page=1, page_limit=10, sort_by=sort_by).offers]
+
+    visited, cursor = [], None
+    while True:
+        result = repository.get_all(page_limit=3, sort_by=sort_by, cursor=cursor)
+        visited.extend(item["id"] for item in result.offers)
+        cursor = result.next_cursor
+        if not cursor:
+            break
+
+    assert visited == expected
+    assert len(set(visited)) == 10
+
+
+def test_success_get_all_page_is_not_a_row_offset(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many(
+        [offer.model_copy(update={"details_url": f"https://google.com/{i}"}) for i in range(4)],
+        {"Łódź": city.id}
+    )
+
+    first_page = repository.get_all(page=1, page_limit=2)
+    second_page = repository.get_all(page=2, page_limit=2)
+
+    assert first_page.next_cursor is not None
+    assert not {item["id"] for item in first_page.offers} & {item["id"] for item in second_page.offers}
+
+
+def test_error_get_all_cursor_for_another_sorting(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many(
+        [offer.model_copy(update={"details_url": f"https://google.com/{i}"}) for i in range(2)],
+        {"Łódź": city.id}
+    )
+    cursor = repository.get_all(page_limit=1, sort_by=OfferSortEnum.NEWEST).next_cursor
+
+    with pytest.raises(ValueError):
+        repository.get_all(page_limit=1, sort_by=OfferSortEnum.PRICE_LOWEST, cursor=cursor)
+
+
+def test_success_get_all_full_text_search_matches_title_and_description(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many(
+        [
+            offer.model_copy(update={"details_url": "https://google.com/1", "title": "Dom z ogrodem",
+                                     "description": "Cicha okolica"}),
+            offer.model_copy(update={"details_url": "https://google.com/2", "title": "Mieszkanie w bloku",
+                                     "description": "Blisko ogrodu botanicznego"}),
+            offer.model_copy(update={"details_url": "https://google.com/3", "title": "Kawalerka",
+                                     "description": "Centrum miasta"}),
+        ],
+        {"Łódź": city.id}
+    )
+
+    result = repository.get_all(query="ogrod", sort_by=OfferSortEnum.RELEVANCE)
+
+    assert [item["details_url"] for item in result.offers] == ["https://google.com/1", "https://google.com/2"]
+
+
+def test_success_get_all_full_text_search_ignores_query_syntax(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many([offer], {"Łódź": city.id})
+
+    assert repository.get_all(query='"test" offer*').page_size == 1
+    assert repository.get_all(query="NEAR(").page_size == 0
+
+
+def test_success_get_facets(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many(
+        [
+            offer.model_copy(update={"details_url": "https://google.com/1", "rooms": 2, "price": 1500.0}),
+            offer.model_copy(update={"details_url": "https://google.com/2", "rooms": 6, "price": 400000.0,
+                                     "category": CategoryEnum.DOM, "furniture": False}),
+            offer.model_copy(update={"details_url": "https://google.com/3", "rooms": 1, "price": None,
+                                     "category": CategoryEnum.DOM}),
+        ],
+        {"Łódź": city.id}
+    )
+
+    facets = repository.get_facets()
+    assert facets.total == 3
+    assert facets.category["Pokój"] == 1
+    assert facets.category["Dom"] == 2
+    assert facets.sub_category == {"Wynajem": 3, "Sprzedaż": 0}
+    assert facets.rooms == {"1": 1, "2": 1, "3": 0, "4": 0, "5+": 1}
+    assert facets.furniture == {"true": 2, "false": 1}
+    assert [(bucket.min, bucket.count) for bucket in facets.price if bucket.count] == [(1000, 1), (300000, 1)]
+
+    facets = repository.get_facets(category=CategoryEnum.DOM)
+    assert facets.total == 2
+    assert facets.category["Pokój"] == 0
+
+
+def test_success_count_offers(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many(
+        [
+            offer.model_copy(update={"details_url": "https://google.com/1"}),
+            offer.model_copy(update={"details_url": "https://google.com/2", "category": CategoryEnum.DOM}),
+        ],
+        {"Łódź": city.id}
+    )
+
+    assert repository.count() == 2
+    assert repository.count(category=CategoryEnum.DOM) == 1
+    assert repository.estimate_count(category=CategoryEnum.DOM) is None
+
+
+def test_success_bulk_create_does_not_query_known_locations(test_get_db, offer, city) -> None:
+    warm_location_cache(test_get_db)
+    statements = []
+
+    def count_location_statement(conn, cursor, statement, *args):
+        if "cities" in statement or "regions" in statement:
+            statements.append(statement)
+
+    bind = test_get_db.get_bind()
+    event.listen(bind, "before_cursor_execute", count_location_statement)
+    try:
+        OfferService(test_get_db).bulk_create([offer])
+        assert statements == []
+
+        new_city = offer.model_copy(update={
+            "details_url": "https://google.com/2", "city_name": "Kraków", "region_name": "Małopolskie"
+        })
+        OfferService(test_get_db).bulk_create([new_city])
+        assert statements
+
+        statements.clear()
+        OfferService(test_get_db).bulk_create([new_city.model_copy(update={"details_url": "https://google.com/3"})])
+        assert statements == []
+    finally:
+        event.remove(bind, "before_cursor_execute", count_location_statement)
+
+    assert CityRepository(test_get_db).get_ids_by_names(["Kraków"]) == city_cache.get_many(["Kraków"])
+    assert RegionRepository(test_get_db).get_ids_by_names(["Małopolskie"]) == region_cache.get_many(["Małopolskie"])
+
+
+def test_success_city_update_invalidates_location_cache(test_get_db, city) -> None:
+    warm_location_cache(test_get_db)
+    repository = CityRepository(test_get_db)
+    repository.update(city, CityInput(name="Lodz", region_id=city.region_id))
+
+    assert city_cache.get_many(["Łódź", "Lodz"]) == {}
+
+
+def test_success_iter_urls(test_get_db, offer, city) -> None:
+    repository = OfferRepository(test_get_db)
+    repository.create_many(
+        [offer.model_copy(update={"details_url": f"https://google.com/{i}"}) for i in range(3)],
+        {"Łódź": city.id}
+    )
+
+    assert sorted(repository.iter_urls(batch_size=2)) == [f"https://google.com/{i}" for i in range(3)]
+
+
+def test_error_ingest_stream_store_failure_is_not_a_client_error(test_get_db, offer, city) -> None:
+    service = OfferService(test_get_db)
+
+    def failing_store(offers):
+        raise ValueError("store failed")
+
+    service.bulk_create = failing_store
+
+    async def lines():
+        yield offer.model_dump_json().encode()
+
+    with pytest.raises(ValueError, match="store failed"):
+        asyncio.run(service.ingest_stream(lines(), chunk_size=1))
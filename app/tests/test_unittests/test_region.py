@@ -42,3 +42,14 @@ def test_success_delete_region(test_get_db) -> None:
     created_region = repository.create(RegionInput(name="Test Region"))
     region = repository.get_by_id(created_region.id)
     assert repository.delete(region)
+
+
+def test_success_create_many_regions_keeps_existing_names(test_get_db) -> None:
+    repository = RegionRepository(test_get_db)
+    existing = repository.create(RegionInput(name="Test Region"))
+
+    region_ids = repository.create_many(["Test Region", "Other Region"])
+    test_get_db.commit()
+
+    assert region_ids["Test Region"] == existing.id
+    assert len(repository.get_all()) == 2
@@ -0,0 +1,104 @@
+import orjson
+from redis import ConnectionError
+
+from utils.response_cache import ResponseCache
+
+
+class InMemoryRedis:
+    """
+    Minimal stand-in for the subset of the Redis client used by the response cache.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.commands = None
+
+    def get(self, key):
+        if self.commands is not None:
+            self.commands.append(lambda: self.data.get(key))
+            return self
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        if self.commands is not None:
+            self.commands.append(lambda: self.set(key, value, ex))
+            return self
+        self.data[key] = value
+        return True
+
+    def incr(self, key):
+        if self.commands is not None:
+            self.commands.append(lambda: self.incr(key))
+            return self
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        self.commands = []
+        return self
+
+    def execute(self):
+        commands, self.commands = self.commands, None
+        return [command() for command in commands]
+
+
+class UnavailableRedis:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError("Connection refused")
+        return fail
+
+
+def test_success_response_cache_serves_cached_response() -> None:
+    cache = ResponseCache(InMemoryRedis(), ttl=60)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return {"calls": len(calls)}
+
+    assert orjson.loads(cache.get_or_set("offer:list", ("page", 1), factory)) == {"calls": 1}
+    assert orjson.loads(cache.get_or_set("offer:list", ("page", 1), factory)) == {"calls": 1}
+    assert cache.stats(["offer:list"]) == {"offer:list": {"hits": 1, "misses": 1}}
+
+
+def test_success_response_cache_invalidate_namespace() -> None:
+    cache = ResponseCache(InMemoryRedis(), ttl=60)
+    cache.get_or_set("offer:list", "a", lambda: 1)
+    cache.get_or_set("offer:details", "b", lambda: 1)
+    cache.invalidate("offer:list")
+
+    assert cache.get_or_set("offer:list", "a", lambda: 2) == b"2"
+    assert cache.get_or_set("offer:details", "b", lambda: 2) == b"1"
+
+
+def test_success_response_cache_invalidate_keys() -> None:
+    cache = ResponseCache(InMemoryRedis(), ttl=60)
+    cache.get_or_set("offer:details", "a", lambda: 1)
+    cache.get_or_set("offer:details", "b", lambda: 1)
+    cache.invalidate("offer:details", ["a"])
+
+    assert cache.get_or_set("offer:details", "a", lambda: 2) == b"2"
+    assert cache.get_or_set("offer:details", "b", lambda: 2) == b"1"
+
+
+def test_success_response_cache_falls_back_when_redis_unavailable() -> None:
+    cache = ResponseCache(UnavailableRedis(), ttl=60)
+    cache.invalidate("offer:list")
+
+    assert cache.get_or_set("offer:list", "a", lambda: [1]) == b"[1]"
+    assert cache.stats(["offer:list"]) == {"offer:list": {"hits": 0, "misses": 0}}
+
+
+def test_success_response_cache_disabled_without_client() -> None:
+    cache = ResponseCache(None, ttl=60)
+    cache.get_or_set("offer:list", "a", lambda: 1)
+
+    assert cache.get_or_set("offer:list", "a", lambda: 2) == b"2"
@@ -0,0 +1,32 @@
+from utils.ttl_cache import TTLCache
+
+
+def test_success_ttl_cache_returns_cached_value() -> None:
+    cache = TTLCache(maxsize=10, ttl=60)
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get_or_set("key", factory) == 1
+    assert cache.get_or_set("key", factory) == 1
+    assert len(calls) == 1
+
+
+def test_success_ttl_cache_evicts_least_recently_used() -> None:
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.get_or_set("a", lambda: 1)
+    cache.get_or_set("b", lambda: 2)
+    cache.get_or_set("a", lambda: 0)
+    cache.get_or_set("c", lambda: 3)
+
+    assert cache.get_or_set("a", lambda: 0) == 1
+    assert cache.get_or_set("b", lambda: 0) == 0
+
+
+def test_success_ttl_cache_disabled_with_zero_ttl() -> None:
+    cache = TTLCache(maxsize=10, ttl=0)
+    cache.get_or_set("key", lambda: 1)
+
+    assert cache.get_or_set("key", lambda: 2) == 2
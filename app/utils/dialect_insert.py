@@ -0,0 +1,17 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(session: Session):
+    """
+    Get the INSERT construct supporting ON CONFLICT for the database of a session.
+
+    Args:
+        session (Session): Database session.
+
+    Returns:
+        The PostgreSQL or SQLite `insert` function.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
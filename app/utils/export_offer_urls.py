@@ -0,0 +1,40 @@
+"""
+Export the URLs of all stored offers, one per line.
+
+The scraper builds its known URLs snapshot from this file (`python main.py import-known-urls <file>`)
+to stop incremental crawls at offers that are already stored.
+
+Run from the `app` directory with the usual application environment, e.g.:
+
+    python -m utils.export_offer_urls --output offer_urls.txt
+"""
+import argparse
+
+from config.database import SessionLocal
+from repositories.offer_repository import OfferRepository
+
+
+def export_offer_urls(output: str) -> int:
+    """
+    Write the URL of every offer to a file.
+
+    Args:
+        output (str): Path of the output file.
+
+    Returns:
+        int: Number of exported URLs.
+    """
+    count = 0
+    with SessionLocal() as session, open(output, "w", encoding="utf-8") as file:
+        for url in OfferRepository(session).iter_urls():
+            file.write(url)
+            file.write("\n")
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="offer_urls.txt", help="Path of the output file")
+    args = parser.parse_args()
+    print(f"Exported {export_offer_urls(args.output)} offer URLs to {args.output}")
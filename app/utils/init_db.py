@@ -4,6 +4,7 @@ from models.location import Region, City
 from models.notification import Notification
 from models.notification_filter import NotificationFilter
 from models.offer import Offer
+from models.offer_price_history import OfferPriceHistory
 from models.photo import Photo
 from models.user import User
 
@@ -21,3 +22,4 @@ def create_tables():
     Favorite.metadata.create_all(bind=engine)
     NotificationFilter.metadata.create_all(bind=engine)
     Notification.metadata.create_all(bind=engine)
+    OfferPriceHistory.metadata.create_all(bind=engine)
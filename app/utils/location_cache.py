@@ -0,0 +1,26 @@
+from sqlalchemy.orm import Session
+
+from config.settings import settings
+from models.location import Region, City
+from utils.lru_cache import LRUCache
+
+# Name to ID caches of regions and cities, entries are only added once they are committed
+region_cache = LRUCache(maxsize=settings.LOCATION_CACHE_SIZE)
+city_cache = LRUCache(maxsize=settings.LOCATION_CACHE_SIZE)
+
+
+def warm_location_cache(session: Session) -> None:
+    """
+    Load region and city IDs into the name to ID caches.
+
+    Args:
+        session (Session): Database session.
+    """
+    region_cache.clear()
+    region_cache.set_many({
+        name: _id for _id, name in session.query(Region.id, Region.name).limit(settings.LOCATION_CACHE_SIZE)
+    })
+    city_cache.clear()
+    city_cache.set_many({
+        name: _id for _id, name in session.query(City.id, City.name).limit(settings.LOCATION_CACHE_SIZE)
+    })
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable
+
+
+class LRUCache:
+    """
+    Bounded in-process mapping that evicts the least recently used entry when full.
+    """
+
+    def __init__(self, maxsize: int):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize (int): Maximum number of entries, 0 disables caching.
+        """
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """
+        Get the cached values of many keys.
+
+        Args:
+            keys (Iterable[Hashable]): The cache keys.
+
+        Returns:
+            Dict[Hashable, Any]: Mapping of key to value for the cached keys.
+        """
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[key] = self._entries[key]
+        return found
+
+    def set_many(self, entries: Dict[Hashable, Any]) -> None:
+        """
+        Store many entries, evicting the least recently used ones when full.
+
+        Args:
+            entries (Dict[Hashable, Any]): Mapping of key to value.
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            for key, value in entries.items():
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, *keys: Hashable) -> None:
+        """
+        Remove the given keys, ignoring the ones that are not cached.
+
+        Args:
+            *keys (Hashable): The cache keys.
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Remove every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,37 @@
+import zlib
+from typing import AsyncIterator
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes], compressed: bool = False) -> AsyncIterator[bytes]:
+    """
+    Split a streamed body into newline delimited JSON documents without reading it whole.
+
+    Args:
+        chunks (AsyncIterator[bytes]): Body chunks, e.g. `Request.stream()`.
+        compressed (bool): Whether the body is gzip-compressed.
+
+    Yields:
+        bytes: Every non-empty line of the body.
+
+    Raises:
+        ValueError: If a compressed body is not valid gzip.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+    buffer = b""
+    async for chunk in chunks:
+        if decompressor:
+            try:
+                chunk = decompressor.decompress(chunk)
+            except zlib.error as e:
+                raise ValueError(f"Invalid gzip body: {e}")
+
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+
+    if decompressor and not decompressor.eof:
+        raise ValueError("Invalid gzip body: truncated")
+    if buffer.strip():
+        yield buffer
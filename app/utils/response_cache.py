@@ -0,0 +1,197 @@
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional
+
+import orjson
+from pydantic import BaseModel
+from redis import Redis, RedisError
+
+logger = logging.getLogger(__name__)
+
+
+def _default(obj: Any) -> Any:
+    """
+    Serialize values orjson does not support natively.
+
+    Args:
+        obj (Any): Value to serialize.
+
+    Returns:
+        Any: JSON-compatible representation of the value.
+    """
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Serialize a response body to JSON with orjson.
+
+    Args:
+        value (Any): Response body, pydantic models are dumped first.
+
+    Returns:
+        bytes: Serialized JSON.
+    """
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    return orjson.dumps(value, default=_default)
+
+
+class ResponseCache:
+    """
+    Redis-backed read-through cache of serialized JSON responses.
+
+    Entries live in namespaces. Every namespace has a generation number which is part
+    of the entry keys, so bumping it drops the whole namespace at once; stale entries
+    simply expire. The generation is read before the value is computed, so a response
+    built from data older than an invalidation is stored under the previous generation
+    and never served.
+
+    Any Redis error is treated as a miss, so an unavailable Redis only disables caching.
+    Without a client the cache is disabled and responses are always computed.
+    """
+
+    def __init__(self, client: Optional[Redis], ttl: int, prefix: str = "response-cache"):
+        """
+        Initialize the cache.
+
+        Args:
+            client (Optional[Redis]): Redis client, None disables the cache.
+            ttl (int): Time to live of an entry, in seconds (0 disables the cache).
+            prefix (str): Prefix of all keys written by the cache.
+        """
+        self.client = client if ttl > 0 else None
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: Optional[str], ttl: int) -> "ResponseCache":
+        """
+        Create a cache connected to the Redis server at the given URL.
+
+        The connection is opened lazily on first use.
+
+        Args:
+            url (Optional[str]): Redis connection URL, empty or None disables the cache.
+            ttl (int): Time to live of an entry, in seconds.
+
+        Returns:
+            ResponseCache: The cache.
+        """
+        client = Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5) if url else None
+        return cls(client, ttl)
+
+    def get_or_set(self, namespace: str, key: Hashable, factory: Callable[[], Any]) -> bytes:
+        """
+        Get the cached response for a key, computing and storing it on a miss.
+
+        Args:
+            namespace (str): Namespace of the entry.
+            key (Hashable): Key identifying the response within the namespace, must have a stable repr.
+            factory (Callable[[], Any]): Builds the response body on a miss.
+
+        Returns:
+            bytes: Serialized JSON response.
+        """
+        if self.client is None:
+            return dumps(factory())
+
+        try:
+            entry_key = self._entry_key(namespace, key)
+            value, _ = self.client.pipeline(transaction=False) \
+                .get(entry_key) \
+                .incr(self._stat_key(namespace, "requests")) \
+                .execute()
+        except RedisError as e:
+            logger.warning("Response cache lookup failed: %s", e)
+            return dumps(factory())
+
+        if value is not None:
+            return value
+
+        value = dumps(factory())
+        try:
+            self.client.pipeline(transaction=False) \
+                .set(entry_key, value, ex=self.ttl) \
+                .incr(self._stat_key(namespace, "misses")) \
+                .execute()
+        except RedisError as e:
+            logger.warning("Response cache store failed: %s", e)
+        return value
+
+    def invalidate(self, namespace: str, keys: Optional[Iterable[Hashable]] = None) -> None:
+        """
+        Drop cached responses.
+
+        Args:
+            namespace (str): Namespace of the entries.
+            keys (Optional[Iterable[Hashable]]): Keys of the entries to drop, None drops the whole namespace.
+        """
+        if self.client is None:
+            return
+
+        try:
+            if keys is None:
+                self.client.incr(self._generation_key(namespace))
+                return
+            entry_keys = [self._entry_key(namespace, key) for key in keys]
+            if entry_keys:
+                self.client.delete(*entry_keys)
+        except RedisError as e:
+            logger.warning("Response cache invalidation failed: %s", e)
+
+    def stats(self, namespaces: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Get hit and miss counters of the given namespaces.
+
+        Args:
+            namespaces (Iterable[str]): Namespaces to report.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Hits and misses per namespace, zeros when the cache is disabled.
+        """
+        namespaces = list(namespaces)
+        counters = [0, 0] * len(namespaces)
+        if self.client is not None:
+            try:
+                keys = []
+                for namespace in namespaces:
+                    keys += [self._stat_key(namespace, "requests"), self._stat_key(namespace, "misses")]
+                counters = [int(value or 0) for value in self.client.mget(keys)]
+            except RedisError as e:
+                logger.warning("Response cache stats failed: %s", e)
+
+        result = {}
+        for i, namespace in enumerate(namespaces):
+            requests, misses = counters[2 * i], counters[2 * i + 1]
+            result[namespace] = {"hits": requests - misses, "misses": misses}
+        return result
+
+    def _entry_key(self, namespace: str, key: Hashable) -> str:
+        """
+        Build the Redis key of an entry in the current generation of its namespace.
+
+        Args:
+            namespace (str): Namespace of the entry.
+            key (Hashable): Key of the entry.
+
+        Returns:
+            str: Redis key.
+        """
+        generation = int(self.client.get(self._generation_key(namespace)) or 0)
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return f"{self.prefix}:{namespace}:{generation}:{digest}"
+
+    def _generation_key(self, namespace: str) -> str:
+        """
+        Build the Redis key holding the generation number of a namespace.
+        """
+        return f"{self.prefix}:{namespace}:generation"
+
+    def _stat_key(self, namespace: str, counter: str) -> str:
+        """
+        Build the Redis key of a namespace counter.
+        """
+        return f"{self.prefix}:{namespace}:stats:{counter}"
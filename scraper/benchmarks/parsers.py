@@ -0,0 +1,262 @@
+"""
+Parser throughput benchmark and golden-output check.
+
+Parses the recorded pages in `benchmarks/fixtures` with every parser variant (OLX, and
+Otodom with every available HTML backend) and reports offers parsed per second, peak RSS
+and allocations per page. Before timing, the offers of every variant are compared with the
+golden output recorded next to each fixture, so a faster variant must produce identical
+`Offer` dataclasses. The process exits with status 1 when a variant differs.
+
+Run from the `scraper` directory with the usual scraper environment, e.g.:
+
+    python -m benchmarks.parsers --repeat 50
+    python -m benchmarks.parsers --record 5        # replace fixtures with pages stored in MongoDB
+    python -m benchmarks.parsers --update-golden   # after an intended change of the parsed output
+"""
+import argparse
+import dataclasses
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from data.offer import Offer
+from parser.html_backend import available_backends
+from parser.olx_parser import OlxParser
+from parser.otodom_parser import OtodomParser
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+MANIFEST_PATH = os.path.join(FIXTURES_DIR, "manifest.json")
+
+# A fixture is (site, file name, category, sub_category)
+Fixture = Tuple[str, str, Any, Any]
+
+
+def variants() -> Dict[str, Tuple[str, Callable[[], Any]]]:
+    """
+    Get the parser variants to benchmark.
+
+    Returns:
+        Dict[str, Tuple[str, Callable[[], Any]]]: Site and parser factory of every variant, by name.
+    """
+    result = {"olx": ("olx", OlxParser)}
+    for backend in available_backends():
+        result[f"otodom[{backend}]"] = ("otodom", lambda backend=backend: OtodomParser(backend))
+    return result
+
+
+def load_fixtures() -> List[Fixture]:
+    """
+    Read the fixtures manifest.
+
+    Returns:
+        List[Fixture]: The recorded pages.
+    """
+    with open(MANIFEST_PATH, encoding="utf-8") as file:
+        return [(f["site"], f["file"], f["category"], f["sub_category"]) for f in json.load(file)]
+
+
+def read_page(file_name: str) -> str:
+    """
+    Read a recorded page.
+
+    Args:
+        file_name (str): File name in the fixtures directory.
+
+    Returns:
+        str: The raw page.
+    """
+    with open(os.path.join(FIXTURES_DIR, file_name), encoding="utf-8") as file:
+        return file.read()
+
+
+def golden_path(file_name: str) -> str:
+    """
+    Get the path of the golden output of a recorded page.
+
+    Args:
+        file_name (str): File name in the fixtures directory.
+
+    Returns:
+        str: Path of the golden file.
+    """
+    return os.path.join(FIXTURES_DIR, f"{file_name}.golden.json")
+
+
+def to_json(offers: List[Offer]) -> List[Dict[str, Any]]:
+    """
+    Convert parsed offers to their JSON form, as stored in the golden files.
+
+    Args:
+        offers (List[Offer]): Parsed offers.
+
+    Returns:
+        List[Dict[str, Any]]: The offers as plain dictionaries.
+    """
+    return json.loads(json.dumps([dataclasses.asdict(offer) for offer in offers or []], ensure_ascii=False))
+
+
+def check_golden(pages: List[Tuple[Fixture, str]], update: bool) -> bool:
+    """
+    Compare the offers of every variant with the golden output of every page.
+
+    Args:
+        pages (List[Tuple[Fixture, str]]): Fixtures with their raw pages.
+        update (bool): Write the output of the first variant of each site as the new golden output.
+
+    Returns:
+        bool: True if every variant produced the golden output.
+    """
+    ok, written = True, set()
+    for name, (site, factory) in variants().items():
+        parser = factory()
+        for (fixture_site, file_name, category, sub_category), data in pages:
+            if fixture_site != site:
+                continue
+            offers = to_json(parser.parse(data, category=category, sub_category=sub_category))
+
+            path = golden_path(file_name)
+            if update and path not in written:
+                with open(path, "w", encoding="utf-8") as file:
+                    json.dump(offers, file, ensure_ascii=False, indent=1)
+                written.add(path)
+                print(f"{name}: wrote {len(offers)} golden offers for {file_name}")
+                continue
+
+            with open(path, encoding="utf-8") as file:
+                golden = json.load(file)
+            if offers == golden:
+                print(f"{name}: {file_name} matches golden output ({len(offers)} offers)")
+                continue
+
+            ok = False
+            print(f"{name}: {file_name} differs from golden output ({len(offers)} offers, {len(golden)} expected)")
+            for index, (offer, expected) in enumerate(zip(offers, golden)):
+                if offer != expected:
+                    fields = [key for key in expected if offer.get(key) != expected[key]]
+                    print(f"  first difference in offer {index}: {', '.join(fields)}")
+                    break
+    return ok
+
+
+def measure(name: str, pages: List[Tuple[Fixture, str]], repeat: int) -> Dict[str, float]:
+    """
+    Measure a variant, meant to run in a fresh process so that peak RSS belongs to that variant only.
+
+    Args:
+        name (str): Variant name.
+        pages (List[Tuple[Fixture, str]]): Fixtures with their raw pages.
+        repeat (int): Number of timed passes over the pages.
+
+    Returns:
+        Dict[str, float]: Pages, offers, offers/sec, pages/sec, peak RSS and allocations per page.
+    """
+    site, factory = variants()[name]
+    parser = factory()
+    pages = [(fixture, data) for fixture, data in pages if fixture[0] == site]
+
+    # One untimed pass with allocation tracing, per page
+    tracemalloc.start()
+    allocated = blocks = 0
+    for (_, _, category, sub_category), data in pages:
+        tracemalloc.reset_peak()
+        before = sys.getallocatedblocks()
+        parser.parse(data, category=category, sub_category=sub_category)
+        blocks += max(sys.getallocatedblocks() - before, 0)
+        allocated += tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    offers = 0
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        for (_, _, category, sub_category), data in pages:
+            offers += len(parser.parse(data, category=category, sub_category=sub_category) or [])
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        "pages": len(pages) * repeat,
+        "offers": offers,
+        "offers_per_sec": offers / elapsed if elapsed else 0,
+        "pages_per_sec": len(pages) * repeat / elapsed if elapsed else 0,
+        "peak_rss_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "peak_alloc_kib_per_page": allocated / len(pages) / 1024 if pages else 0,
+        "retained_blocks_per_page": blocks / len(pages) if pages else 0,
+    }
+
+
+def report(results: Dict[str, Dict[str, float]]) -> None:
+    """
+    Print the measurements of every variant.
+
+    Args:
+        results (Dict[str, Dict[str, float]]): Measurements by variant name.
+    """
+    print(f"\n{'variant':<22}{'pages':>8}{'offers/s':>12}{'pages/s':>10}{'peak RSS MiB':>14}"
+          f"{'alloc KiB/page':>16}{'blocks/page':>13}")
+    for name, r in results.items():
+        print(f"{name:<22}{r['pages']:>8}{r['offers_per_sec']:>12.1f}{r['pages_per_sec']:>10.1f}"
+              f"{r['peak_rss_mib']:>14.1f}{r['peak_alloc_kib_per_page']:>16.1f}{r['retained_blocks_per_page']:>13.1f}")
+
+
+def record(sample: int) -> None:
+    """
+    Replace the fixtures with pages sampled from MongoDB and record their golden output.
+
+    Args:
+        sample (int): Number of pages per site.
+    """
+    from service.olx_service import OlxService
+    from service.otodom_service import OtodomService
+    from utils.compression import decompress
+
+    fixtures = []
+    for site, service, extension in (("olx", OlxService(), "json"), ("otodom", OtodomService(), "html")):
+        for d in service.get_sample(sample):
+            data = decompress(d.get("data"), d.get("encoding"))
+            if not isinstance(data, str):
+                data = json.dumps(data, ensure_ascii=False)
+            file_name = f"{site}_{d['_id']}.{extension}"
+            with open(os.path.join(FIXTURES_DIR, file_name), "w", encoding="utf-8") as file:
+                file.write(data)
+            fixtures.append({
+                "site": site, "file": file_name, "category": d.get("category"), "sub_category": d.get("sub_category")
+            })
+
+    with open(MANIFEST_PATH, "w", encoding="utf-8") as file:
+        json.dump(fixtures, file, ensure_ascii=False, indent=1)
+    print(f"Recorded {len(fixtures)} pages")
+
+
+def main(repeat: int, update_golden: bool) -> None:
+    """
+    Check the golden output of every variant, then measure them one process at a time.
+
+    Args:
+        repeat (int): Number of timed passes over the pages.
+        update_golden (bool): Record the current output as the golden output.
+    """
+    pages = [(fixture, read_page(fixture[1])) for fixture in load_fixtures()]
+    if not check_golden(pages, update_golden):
+        sys.exit(1)
+
+    results = {}
+    for name in variants():
+        with multiprocessing.get_context("spawn").Pool(1) as pool:
+            results[name] = pool.apply(measure, (name, pages, repeat))
+    report(results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed passes over the fixtures per variant")
+    parser.add_argument("--update-golden", action="store_true", help="Record the current output as golden")
+    parser.add_argument("--record", type=int, metavar="N", help="Replace the fixtures with N stored pages per site")
+    args = parser.parse_args()
+    if args.record:
+        record(args.record)
+        args.update_golden = True
+    main(args.repeat, args.update_golden)
@@ -1,14 +1,52 @@
-from typing import Any, Mapping, Union
+import threading
+from typing import Any, Mapping, Optional, Union
 
 from pymongo import MongoClient
 from pymongo.database import Database
 
 from .settings import settings
 
+_client: Optional[MongoClient] = None
+_client_lock = threading.Lock()
+
 
 def client() -> MongoClient:
-    """Connects to the MongoDB client."""
-    return MongoClient(settings.MONGO_CONNECTION_STRING)
+    """
+    Returns the process-wide MongoDB client, connecting on first use.
+
+    The client holds a connection pool shared by every repository, its size, write concern
+    and timeouts come from the settings.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                w = settings.MONGO_WRITE_CONCERN
+                _client = MongoClient(
+                    settings.MONGO_CONNECTION_STRING,
+                    maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+                    minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+                    maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+                    connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+                    socketTimeoutMS=settings.MONGO_SOCKET_TIMEOUT_MS,
+                    serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    w=int(w) if w.isdigit() else w,
+                    connect=False,
+                )
+    return _client
+
+
+def close_client() -> None:
+    """
+    Closes the shared MongoDB client, the next `client()` call creates a new one.
+
+    Must be called in forked processes, which cannot reuse the parent's connections.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
 
 
 def get_db() -> Database[Union[Mapping[str, Any], Any]]:
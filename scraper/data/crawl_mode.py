@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class CrawlMode(Enum):
+    FULL = "full"
+    # Newest first, stopping at the first page with only known offers
+    INCREMENTAL = "incremental"
@@ -1,6 +1,6 @@
-from typing import Optional, Annotated, Any
+from typing import Optional, Annotated
 
-from pydantic import BaseModel, BeforeValidator, Field, Json
+from pydantic import BaseModel, BeforeValidator, Field
 
 PyObjectId = Annotated[str, BeforeValidator(str)]
 
@@ -9,6 +9,8 @@ class Olx(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     category: str
     sub_category: int
-    data: Json[Any]
+    # Raw JSON response, compressed with `encoding`
+    data: bytes
+    encoding: Optional[str] = None
     parsed: bool = False
     send: bool = False
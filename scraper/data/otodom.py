@@ -9,6 +9,8 @@ class Otodom(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     category: str
     sub_category: str
-    data: str
+    # Raw HTML page, compressed with `encoding`
+    data: bytes
+    encoding: Optional[str] = None
     parsed: bool = False
     send: bool = False
@@ -0,0 +1,18 @@
+from typing import Optional, Union
+
+from pydantic import BaseModel
+
+
+class PageState(BaseModel):
+    site: str
+    # Crawl modes request different URLs for the same page number, see `CrawlMode`
+    mode: str = "full"
+    category: str
+    sub_category: Union[int, str]
+    page: int
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    # Pagination read from the page, needed to keep crawling when the page is unchanged
+    next_url: Optional[str] = None
+    total_pages: Optional[int] = None
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class Sink(Enum):
+    API = "api"
+    DB = "db"
@@ -0,0 +1,298 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import (
+    Boolean, Column, DateTime, Float, Integer, MetaData, String, Table, Uuid, create_engine, func, or_, select, Engine
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+
+from config.settings import settings
+from data.buildingtype_enum import BuildingTypeEnum
+from data.category_enum import CategoryEnum
+from data.offer import Offer
+from data.subcategory_enum import SubCategoryEnum
+from .save import map_offer
+
+# Columns of the app tables written by the sink, the app models and migrations own the schema
+metadata = MetaData()
+
+regions = Table(
+    "regions", metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("name", String, nullable=False),
+)
+
+cities = Table(
+    "cities", metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("name", String, nullable=False),
+    Column("region_id", Uuid),
+)
+
+offers = Table(
+    "offers", metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("title", String, nullable=False),
+    Column("details_url", String, nullable=False, unique=True),
+    # The app stores enum names, e.g. MIESZKANIE for "Mieszkanie"
+    Column("category", String, nullable=False),
+    Column("sub_category", String, nullable=False),
+    Column("building_type", String),
+    Column("price", Float),
+    Column("rent", Float),
+    Column("description", String),
+    Column("price_per_m", Float),
+    Column("area", Float),
+    Column("building_floot", Integer),
+    Column("floor", Integer),
+    Column("rooms", Integer),
+    Column("furniture", Boolean),
+    Column("city_id", Uuid),
+    Column("created_at"),
+    Column("updated_at"),
+)
+
+photos = Table(
+    "photos", metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("url", String, nullable=False),
+    Column("offer_id", Uuid),
+)
+
+offer_price_history = Table(
+    "offer_price_history", metadata,
+    Column("offer_id", Uuid, primary_key=True),
+    Column("changed_at", DateTime, primary_key=True),
+    Column("price", Float),
+    Column("rent", Float),
+    Column("previous_price", Float),
+    Column("previous_rent", Float),
+)
+
+# Columns refreshed when a rescraped offer differs from the stored one, as in `OfferRepository.UPSERT_COLUMNS`
+UPSERT_COLUMNS = (
+    "title", "category", "sub_category", "building_type", "price", "rent", "description", "price_per_m",
+    "area", "building_floot", "floor", "rooms", "furniture", "city_id",
+)
+
+
+class DatabaseSink:
+    """
+    Writes parsed offers straight into the app database, bypassing the HTTP API.
+
+    Offers are stored like the app's bulk ingest: regions and cities are resolved with the
+    rules of `OfferService.create` (cities are matched by name and a missing city is created
+    in the region named by the first offer referencing it) and every batch is one transaction
+    of multi-row statements. With `upsert`, offers whose URL already exists are refreshed like
+    `OfferRepository.upsert_many` does, recording their price and rent changes in the price
+    history, otherwise they are skipped. The app's response cache is not invalidated, so changes
+    show up in cached listings once their entries expire.
+    """
+
+    def __init__(self, url: str = settings.APP_DATABASE_URL, upsert: bool = settings.EXPORT_UPSERT):
+        """
+        Initialize the sink.
+
+        Args:
+            url (str): SQLAlchemy URL of the app database.
+            upsert (bool): Whether to refresh offers that already exist instead of skipping them.
+        """
+        if not url:
+            raise ValueError("APP_DATABASE_URL is not set")
+        self.engine: Engine = create_engine(url, pool_pre_ping=True)
+        self.upsert = upsert
+        self.insert = postgresql.insert if self.engine.dialect.name == "postgresql" else sqlite.insert
+        self.city_ids: Dict[str, Any] = {}
+        self.region_ids: Dict[str, Any] = {}
+
+    @staticmethod
+    def __to_row(offer: Offer) -> Optional[Dict[str, Any]]:
+        """
+        Map an offer to a row of the offers table, as the app's `OfferScraper` schema would.
+
+        Args:
+            offer (Offer): The offer.
+
+        Returns:
+            Optional[Dict[str, Any]]: The row, or None if the offer would be rejected by the app.
+        """
+        row = map_offer(offer)
+        try:
+            row["category"] = CategoryEnum(row["category"]).name
+            row["sub_category"] = SubCategoryEnum(row["sub_category"]).name
+            if row["building_type"] is not None:
+                row["building_type"] = BuildingTypeEnum(row["building_type"]).name
+        except ValueError:
+            return None
+        if not row["title"] or not row["details_url"] or not row["city_name"] or not row["region_name"]:
+            return None
+        return row
+
+    def __resolve_city_ids(self, connection: Any, rows: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Resolve city IDs of the rows, creating missing regions and cities in the open transaction.
+
+        Names are unique in the app database, so regions and cities are inserted with ON CONFLICT
+        DO NOTHING and selected again: parallel workers inserting the same name share one row.
+
+        Args:
+            connection (Any): Connection with an open transaction.
+            rows (List[Dict[str, Any]]): Offer rows with city and region names.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: City IDs and IDs of the regions of missing cities, by name.
+        """
+        city_ids = {name: self.city_ids[name] for name in {row["city_name"] for row in rows} if name in self.city_ids}
+        unknown = {row["city_name"] for row in rows} - city_ids.keys()
+        if unknown:
+            city_ids.update(connection.execute(
+                select(cities.c.name, cities.c.id).where(cities.c.name.in_(unknown))
+            ).all())
+
+        missing_cities = {}
+        for row in rows:
+            if row["city_name"] not in city_ids:
+                missing_cities.setdefault(row["city_name"], row["region_name"])
+        if not missing_cities:
+            return city_ids, {}
+
+        region_names = set(missing_cities.values())
+        region_ids = {name: self.region_ids[name] for name in region_names if name in self.region_ids}
+        if len(region_ids) < len(region_names):
+            region_ids.update(connection.execute(
+                select(regions.c.name, regions.c.id).where(regions.c.name.in_(region_names - region_ids.keys()))
+            ).all())
+        missing_regions = region_names - region_ids.keys()
+        if missing_regions:
+            connection.execute(
+                self.insert(regions).on_conflict_do_nothing(index_elements=[regions.c.name]),
+                [{"id": uuid.uuid4(), "name": name} for name in missing_regions]
+            )
+            region_ids.update(connection.execute(
+                select(regions.c.name, regions.c.id).where(regions.c.name.in_(missing_regions))
+            ).all())
+
+        connection.execute(
+            self.insert(cities).on_conflict_do_nothing(index_elements=[cities.c.name]),
+            [
+                {"id": uuid.uuid4(), "name": name, "region_id": region_ids[region_name]}
+                for name, region_name in missing_cities.items()
+            ]
+        )
+        city_ids.update(connection.execute(
+            select(cities.c.name, cities.c.id).where(cities.c.name.in_(missing_cities.keys()))
+        ).all())
+        return city_ids, region_ids
+
+    def __insert_offers(self, connection: Any, offer_rows: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Insert offer rows, refreshing or skipping the ones that already exist.
+
+        When refreshing, an existing offer is only rewritten when one of `UPSERT_COLUMNS` differs,
+        and a change of its price or rent is appended to the price history.
+
+        Args:
+            connection (Any): Connection with an open transaction.
+            offer_rows (List[Dict[str, Any]]): Rows of the offers table, with unique URLs.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: IDs of the created and of the updated offers, by URL.
+        """
+        stmt = self.insert(offers).values(created_at=func.now(), updated_at=func.now())
+        if not self.upsert:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[offers.c.details_url])
+            stmt = stmt.returning(offers.c.id, offers.c.details_url)
+            return dict((details_url, _id) for _id, details_url in connection.execute(stmt, offer_rows).all()), {}
+
+        existing_prices = {
+            details_url: (price, rent)
+            for details_url, price, rent in connection.execute(
+                select(offers.c.details_url, offers.c.price, offers.c.rent)
+                .where(offers.c.details_url.in_([row["details_url"] for row in offer_rows]))
+            ).all()
+        }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[offers.c.details_url],
+            set_={**{column: stmt.excluded[column] for column in UPSERT_COLUMNS}, "updated_at": func.now()},
+            where=or_(*[offers.c[column].is_distinct_from(stmt.excluded[column]) for column in UPSERT_COLUMNS]),
+        ).returning(offers.c.id, offers.c.details_url)
+
+        created, updated = {}, {}
+        for _id, details_url in connection.execute(stmt, offer_rows).all():
+            if details_url in existing_prices:
+                updated[details_url] = _id
+            else:
+                created[details_url] = _id
+
+        changed_at = datetime.now()
+        history_rows = [
+            {
+                "offer_id": updated[row["details_url"]],
+                "changed_at": changed_at,
+                "price": row["price"],
+                "rent": row["rent"],
+                "previous_price": existing_prices[row["details_url"]][0],
+                "previous_rent": existing_prices[row["details_url"]][1],
+            }
+            for row in offer_rows
+            if row["details_url"] in updated and (row["price"], row["rent"]) != existing_prices[row["details_url"]]
+        ]
+        if history_rows:
+            connection.execute(offer_price_history.insert(), history_rows)
+        return created, updated
+
+    def save(self, parsed_offers: List[Offer]) -> Optional[Set[str]]:
+        """
+        Store offers in a single transaction, refreshing or skipping the ones that already exist.
+
+        Args:
+            parsed_offers (List[Offer]): The offers to store.
+
+        Returns:
+            Optional[Set[str]]: URLs of the offers rejected as invalid, or None if saving failed.
+        """
+        rows, rejected, invalid = {}, set(), 0
+        for offer in parsed_offers:
+            row = self.__to_row(offer)
+            if row is None:
+                print(f"Offer {offer.url} rejected: missing title, URL or location, or unknown category")
+                rejected.add(offer.url)
+                invalid += 1
+                continue
+            rows.setdefault(row["details_url"], row)
+        rows = list(rows.values())
+        if not rows:
+            print(f"0 offers saved, {invalid} invalid")
+            return rejected
+
+        try:
+            with self.engine.begin() as connection:
+                city_ids, region_ids = self.__resolve_city_ids(connection, rows)
+
+                offer_rows = []
+                for row in rows:
+                    offer_row = {key: value for key, value in row.items() if key not in ("photos", "city_name", "region_name")}
+                    offer_row.update(id=uuid.uuid4(), city_id=city_ids[row["city_name"]])
+                    offer_rows.append(offer_row)
+
+                created, updated = self.__insert_offers(connection, offer_rows)
+
+                photo_rows = [
+                    {"id": uuid.uuid4(), "url": photo["url"], "offer_id": created[row["details_url"]]}
+                    for row in rows if row["details_url"] in created
+                    for photo in row["photos"]
+                ]
+                if photo_rows:
+                    connection.execute(photos.insert(), photo_rows)
+        except SQLAlchemyError as e:
+            print(f"Error: {e}")
+            return None
+
+        # Names are remembered only once their rows are committed
+        self.city_ids.update(city_ids)
+        self.region_ids.update(region_ids)
+        skipped = len(rows) - len(created) - len(updated)
+        print(f"{len(created)} offers saved, {len(updated)} updated, {skipped} skipped, {invalid} invalid")
+        return rejected
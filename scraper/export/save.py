@@ -1,10 +1,35 @@
-import json
-from typing import Dict, Any, List
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Optional, Set
 
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 
+from config.settings import settings
 from data.offer import Offer
 
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def session() -> requests.Session:
+    """
+    Returns the process-wide HTTP session, created on first use.
+
+    Its connection pool holds a connection per parallel request, kept open between batches.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.EXPORT_PARALLELISM)
+                _session.mount("http://", adapter)
+                _session.mount("https://", adapter)
+    return _session
+
 
 def map_offer(offer: Offer) -> Dict[str, Any]:
     """
@@ -39,56 +64,98 @@ def map_offer(offer: Offer) -> Dict[str, Any]:
     return data
 
 
-def post(offers: List[Dict[str, Any]]) -> bool:
+def encode(offers: List[Offer], compress: bool) -> Iterator[bytes]:
     """
-    Post offer data to the server.
+    Encode offers as newline delimited JSON, one offer at a time.
 
     Args:
-        offers (List[Dict[str, Any]]): A dictionary containing offer data.
+        offers (List[Offer]): The offers to encode.
+        compress (bool): Whether to gzip the stream.
+
+    Yields:
+        bytes: Pieces of the body.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+    for offer in offers:
+        line = orjson.dumps(map_offer(offer)) + b"\n"
+        piece = compressor.compress(line) if compressor else line
+        # An empty piece would end a chunked body early
+        if piece:
+            yield piece
+    if compressor:
+        yield compressor.flush()
+
+
+def post(offers: List[Offer]) -> Optional[Set[str]]:
+    """
+    Stream offers to the server's NDJSON ingest endpoint.
+
+    With EXPORT_UPSERT offers that already exist are refreshed, which records their price
+    and rent changes in the server's price history, otherwise they are skipped.
+
+    Offers rejected by the server are reported with the reason, by URL. The server reports
+    the reasons of a limited number of lines, if it rejects more lines every offer is reported.
+
+    Args:
+        offers (List[Offer]): The offers to send.
 
     Returns:
-        bool: True if the offer is successfully saved, False otherwise.
+        Optional[Set[str]]: URLs of the offers rejected as invalid, or None if the request failed.
     """
+    headers = {"accept": "application/json", "Content-Type": "application/x-ndjson"}
+    if settings.EXPORT_COMPRESS:
+        headers["Content-Encoding"] = "gzip"
     try:
-        response = requests.post(
-            "http://localhost:8000/api/v1/offer",
-            data=json.dumps(offers),
-            headers={
-                "accept": "application/json",
-                "Content-Type": "application/json"
-            }
+        response = session().post(
+            f"{settings.API_BASE_URL}/api/v1/offer/stream",
+            params={"upsert": str(settings.EXPORT_UPSERT).lower()},
+            data=encode(offers, settings.EXPORT_COMPRESS),
+            headers=headers,
+            timeout=settings.EXPORT_TIMEOUT,
         )
         response.raise_for_status()
         if response.status_code != 201:
             print(f"Offer not saved, {response.status_code}")
-            return False
-        print("Offer saved")
-        return True
+            return None
+        result = response.json()
+        print(f"{result['created']} offers saved, {result['updated']} updated, {result['skipped']} skipped, "
+              f"{result['invalid']} invalid")
     except requests.ConnectionError as e:
         print(f"Error: {e}")
-        return False
+        return None
     except Exception as e:
         print(f"Error: {e}")
-        return False
+        return None
 
+    # Lines are numbered from 1 and hold one offer each
+    rejected = set()
+    for error in result["errors"]:
+        url = offers[error["line"] - 1].url
+        print(f"Offer {url} rejected: {error['detail']}")
+        rejected.add(url)
+    if result["invalid"] > len(rejected):
+        return {offer.url for offer in offers}
+    return rejected
 
-def save_offer(offers: List[Offer]) -> bool:
+
+def save_offer(offers: List[Offer]) -> Optional[Set[str]]:
     """
-    Save offer by mapping, then posting it to the server.
+    Save offers by posting them to the server in chunks, several at a time.
 
     Args:
-        offers (List[Offer]): The offer object to be saved.
+        offers (List[Offer]): The offer objects to be saved.
 
     Returns:
-        bool: True if the offer is successfully saved, False otherwise.
+        Optional[Set[str]]: URLs of the offers rejected as invalid, or None if any chunk failed.
     """
-    try:
-        offers_to_send = []
-        for offer in offers:
-            mapped_offer = map_offer(offer)
-            offers_to_send.append(mapped_offer)
-        post(offers_to_send)
-        return True
-    except Exception as e:
-        print(f"Save offer error: {e}")
-        return False
+    chunk_size = max(settings.EXPORT_CHUNK_SIZE, 1)
+    chunks = [offers[start:start + chunk_size] for start in range(0, len(offers), chunk_size)]
+    if len(chunks) <= 1:
+        results = [post(chunk) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(min(settings.EXPORT_PARALLELISM, len(chunks))) as executor:
+            results = list(executor.map(post, chunks))
+
+    if any(result is None for result in results):
+        return None
+    return set().union(*results)
@@ -1,8 +1,14 @@
+import json
+
 import typer
 
+from data.sink import Sink
 from data.site import Site
-from service import otodom_service, olx_service
+from service import otodom_service, olx_service, page_state_service
+from scrape import known_urls
+from parser import otodom_parser
 from tasks import run_parser, run_scraper
+from utils import compression
 
 app = typer.Typer()
 
@@ -25,6 +31,43 @@ def delete_parsed_otodom() -> None:
     service.delete_all_parsed()
 
 
+@app.command()
+def delete_page_state() -> None:
+    """
+    Forget ETags and content hashes of scraped pages, so the next scrape stores every page.
+    """
+    service = page_state_service.PageStateService()
+    service.delete_all()
+
+
+@app.command()
+def compression_report(site: Site = Site.OLX, sample: int = 100) -> None:
+    """
+    Compare raw and compressed size of a sample of stored pages for every available compression.
+    """
+    service = olx_service.OlxService() if site == Site.OLX else otodom_service.OtodomService()
+
+    payloads = []
+    for d in service.get_sample(sample):
+        data = compression.decompress(d.get("data"), d.get("encoding"))
+        payloads.append(data.encode("utf-8") if isinstance(data, str) else json.dumps(data).encode("utf-8"))
+    compression.compare_encodings(payloads)
+
+
+@app.command()
+def parser_benchmark(sample: int = 50) -> None:
+    """
+    Compare the parsing speed of every available HTML backend on a sample of stored Otodom pages.
+    """
+    service = otodom_service.OtodomService()
+
+    pages = []
+    for d in service.get_sample(sample):
+        data = compression.decompress(d.get("data"), d.get("encoding"))
+        pages.append((data, d.get("category"), d.get("sub_category")))
+    otodom_parser.compare_backends(pages)
+
+
 @app.command()
 def scrape_otodom() -> None:
     """
@@ -34,27 +77,45 @@ def scrape_otodom() -> None:
 
 
 @app.command()
-def scrape_olx() -> None:
+def scrape_olx(
+        incremental: bool = typer.Option(False, help="Stop every category at the first page with only known offers.")
+) -> None:
     """
     Scrape data from OLX website.
     """
-    run_scraper.run_scrape(Site.OLX)
+    run_scraper.run_scrape(Site.OLX, incremental=incremental)
+
+
+@app.command()
+def import_known_urls(path: str) -> None:
+    """
+    Build the known URLs snapshot used by incremental scraping from a file with one offer URL per line.
+    """
+    known_urls.import_known_urls(path)
 
 
 @app.command()
-def parse_otodom() -> None:
+def parse_otodom(
+        workers: int = typer.Option(1, help="Number of worker processes, each parsing a range of pages."),
+        sink: Sink = typer.Option(Sink.API, help="Store offers through the app API or directly in the app database."),
+) -> None:
     """
     Parse data from Otodom website.
     """
-    run_parser.run_parser(Site.OTODOM)
+    if workers > 1:
+        run_parser.run_parser_parallel(Site.OTODOM, workers, sink=sink)
+    else:
+        run_parser.run_parser(Site.OTODOM, sink=sink)
 
 
 @app.command()
-def parse_olx() -> None:
+def parse_olx(
+        sink: Sink = typer.Option(Sink.API, help="Store offers through the app API or directly in the app database.")
+) -> None:
     """
     Parse data from OLX website.
     """
-    run_parser.run_parser(Site.OLX)
+    run_parser.run_parser(Site.OLX, sink=sink)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,39 @@
+from typing import Optional, Tuple
+
+try:
+    import lxml
+except ImportError:  # optional, the html.parser of the standard library is used without it
+    lxml = None
+
+HTML_PARSER = "html.parser"
+LXML = "lxml"
+
+
+def available_backends() -> Tuple[str, ...]:
+    """
+    Get the BeautifulSoup HTML backends supported in this environment.
+
+    Returns:
+        Tuple[str, ...]: Backend names, fastest last.
+    """
+    return (HTML_PARSER, LXML) if lxml else (HTML_PARSER,)
+
+
+def resolve_backend(backend: Optional[str]) -> str:
+    """
+    Map a configured HTML backend to a supported one, falling back from lxml to html.parser.
+
+    Args:
+        backend (Optional[str]): Configured backend, the standard library parser by default.
+
+    Returns:
+        str: Backend to pass to BeautifulSoup.
+    """
+    if not backend:
+        return HTML_PARSER
+    if backend == LXML and not lxml:
+        print("lxml is not installed, parsing with html.parser")
+        return HTML_PARSER
+    if backend not in (HTML_PARSER, LXML):
+        raise ValueError(f"Unknown HTML backend: {backend}")
+    return backend
@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional
 
+import orjson
 from data.location import Location
 from data.offer import Offer
 from data.subcategory_enum import SubCategoryEnum
@@ -8,22 +9,63 @@ from .parse_strategy import ParseStrategy
 
 
 class OlxParser(ParseStrategy):
+    # List of labels from which script should take values
+    LABEL_KEYS = {"roomsize", "floor_select", "builttype", "floor", "type"}
+
+    @classmethod
+    def __index_params(cls, params_data: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Build a dictionary of parameter values by key in a single pass over the offer's parameters.
+
+        Args:
+            params_data (Optional[List[Dict[str, Any]]]): Parameters of the offer.
+
+        Returns:
+            Dict[str, Any]: Parameter values by key.
+        """
+        params = {}
+        for param in params_data or []:
+            key_name, value = param.get("key", None), param.get("value") or {}
+            if key_name == "price":
+                value = value.get("value", None)
+            elif key_name in cls.LABEL_KEYS:
+                value = value.get("label")
+            else:
+                value = value.get("key")
+                # If value is "yes" or "no", convert to boolean
+                if value == "yes" or value == "no":
+                    value = True if value == "yes" else False
+            params.setdefault(key_name, value)
+        return params
 
     @staticmethod
-    def __get_param_value(params: List[Dict[str, Any]], key: str) -> Any:
+    def __get_param_value(params: Dict[str, Any], key: str) -> Any:
         """
-        Retrieve parameter value based on key from a list of parameters.
+        Retrieve parameter value based on key, falling back to the first key containing it.
 
         Args:
-            params (List[Dict[str, Any]]): List of parameters.
+            params (Dict[str, Any]): Parameter values by key.
             key (str): Key to search for.
 
         Returns:
             Any: Value corresponding to the key, if found.
         """
-        for param in params:
-            if key in param["key_name"]:
-                return param["value"]
+        if key in params:
+            return params[key]
+        return next((value for key_name, value in params.items() if key_name and key in key_name), None)
+
+    @staticmethod
+    def __to_float(value: Any) -> Optional[float]:
+        """
+        Convert a parameter value to float.
+
+        Args:
+            value (Any): Parameter value.
+
+        Returns:
+            Optional[float]: The value as float, None if it is missing.
+        """
+        return float(value) if value is not None else None
 
     @staticmethod
     def __remove_html_tags(text: Optional[str]) -> Optional[str]:
@@ -129,7 +171,8 @@ class OlxParser(ParseStrategy):
         Returns:
             List[Offer]: List of parsed Offer objects.
         """
-        content = data
+        # Raw JSON of pages stored since compression was introduced, decoded document before
+        content = orjson.loads(data) if isinstance(data, (str, bytes)) else data
         category, sub_category = kwargs["category"], kwargs["sub_category"]
 
         offers = content.get("data", None)
@@ -166,30 +209,7 @@ class OlxParser(ParseStrategy):
                 full_link = link.format(width=width, height=height)
                 photos.append(full_link)
 
-            params_data = offer.get("params", None)
-            parsed_params = []
-            for param in params_data:
-                # List of labels from which script should take values
-                label_keys = ["roomsize", "floor_select", "builttype", "floor", "type"]
-
-                key_name = param.get("key", None)
-                if key_name == "price":
-                    value = param.get("value", None).get("value", None)
-                elif key_name in label_keys:
-                    value = param.get("value").get("label")
-                else:
-                    value = param.get("value").get("key")
-                    # If value is "yes" or "no", convert to boolean
-                    if value == "yes" or value == "no":
-                        value = True if value == "yes" else False
-
-                param = {"key_name": key_name, "value": value}
-                parsed_params.append(param)
-
-            meters = self.__get_param_value(parsed_params, "m"),
-            rent = self.__get_param_value(parsed_params, "rent")
-            if rent:
-                rent = float(rent)
+            parsed_params = self.__index_params(offer.get("params", None))
 
             # Create Offer object
             offer = Offer(
@@ -198,11 +218,11 @@ class OlxParser(ParseStrategy):
                 category=category,
                 sub_category=self.__map_sub_category(sub_category),
                 building_type=self.__get_param_value(parsed_params, "builttype"),
-                price=float(self.__get_param_value(parsed_params, "price")),
-                rent=rent,
+                price=self.__to_float(self.__get_param_value(parsed_params, "price")),
+                rent=self.__to_float(self.__get_param_value(parsed_params, "rent")),
                 description=self.__remove_html_tags(description),
-                price_per_meter=float(self.__get_param_value(parsed_params, "price_per_m")),
-                area=float(meters[0]),
+                price_per_meter=self.__to_float(self.__get_param_value(parsed_params, "price_per_m")),
+                area=self.__to_float(self.__get_param_value(parsed_params, "m")),
                 building_floor=self.__map_floor(self.__get_param_value(parsed_params, "floor_select")),
                 floor=self.__map_floor(self.__get_param_value(parsed_params, "floor")),
                 room_number=self.__map_room_number(self.__get_param_value(parsed_params, "rooms")),
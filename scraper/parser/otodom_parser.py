@@ -1,16 +1,28 @@
 import re
+import time
 from typing import Optional, Tuple, List, Dict, Any
 
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+from config.settings import settings
 from data.category_enum import CategoryEnum
 from data.location import Location
 from data.offer import Offer
 from data.subcategory_enum import SubCategoryEnum
 
+from .html_backend import available_backends, resolve_backend
 from .parse_strategy import ParseStrategy
 
 
 class OtodomParser(ParseStrategy):
+    def __init__(self, backend: str = settings.PARSER_HTML_BACKEND):
+        """
+        Initialize the parser.
+
+        Args:
+            backend (str): BeautifulSoup HTML backend, "lxml" or "html.parser".
+        """
+        self.backend = resolve_backend(backend)
+
     @staticmethod
     def __get_city_region(full_location: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -153,7 +165,8 @@ class OtodomParser(ParseStrategy):
         category, sub_category = kwargs.get("category"), kwargs.get("sub_category")
 
         content = data
-        soup = BeautifulSoup(content, "html.parser")
+        # Only the offer articles are built into the tree, the rest of the page is skipped
+        soup = BeautifulSoup(content, self.backend, parse_only=SoupStrainer("article"))
         offers = soup.find_all("article")
 
         # Return if there is no offers
@@ -181,7 +194,7 @@ class OtodomParser(ParseStrategy):
                     images.append(image.get("src"))
 
             params = []
-            dt_tags, dd_tags = soup.find_all('dt'), soup.find_all('dd')
+            dt_tags, dd_tags = offer.find_all('dt'), offer.find_all('dd')
             for dt_tag, dd_tag in zip(dt_tags, dd_tags):
                 key = dt_tag.text.strip()
                 value = dd_tag.text.strip()
@@ -197,7 +210,7 @@ class OtodomParser(ParseStrategy):
             area = self.__string_to_int(self.__get_param_value(params, "Powierzchnia"))
             room_number = self.__string_to_int(self.__get_param_value(params, "Liczba pokoi"))
             floor = self.__string_to_int(self.__get_param_value(params, "Piętro"))
-            full_url = f"otodom.pl{url.get("href")}"
+            full_url = f"otodom.pl{url.get('href')}"
 
             offer = Offer(
                 title=title.text,
@@ -219,3 +232,25 @@ class OtodomParser(ParseStrategy):
             )
             parsed_offers.append(offer)
         return parsed_offers
+
+
+def compare_backends(pages: List[Tuple[str, str, str]]) -> None:
+    """
+    Print the parsing throughput of every available HTML backend on sample pages.
+
+    Args:
+        pages (List[Tuple[str, str, str]]): Raw pages with their category and sub-category.
+    """
+    raw_size = sum(len(data) for data, _, _ in pages)
+    print(f"{len(pages)} pages, {raw_size / 1024 / 1024:.2f} MiB raw")
+    for backend in available_backends():
+        parser = OtodomParser(backend)
+        started_at = time.perf_counter()
+        offers = 0
+        for data, category, sub_category in pages:
+            offers += len(parser.parse(data, category=category, sub_category=sub_category) or [])
+        elapsed = time.perf_counter() - started_at
+        print(
+            f"{backend}: {offers} offers, {len(pages) / elapsed if elapsed else 0:.1f} pages/sec, "
+            f"{offers / elapsed if elapsed else 0:.1f} offers/sec"
+        )
@@ -1,4 +1,4 @@
-from typing import Any, List, Optional
+from typing import Any, Iterator, List, Optional, Tuple
 
 from data.otodom import Otodom
 
@@ -32,6 +32,16 @@ class OtodomRepository:
         _id = self.collection.insert_one(data.dict()).inserted_id
         return
 
+    def create_many(self, data: List[Otodom]) -> None:
+        """
+        Insert many Otodom data into the database collection with a single round trip.
+
+        Parameters:
+        - data (List[Otodom]): The Otodom data to be inserted into the collection.
+        """
+        if data:
+            self.collection.insert_many([item.model_dump() for item in data], ordered=False)
+
     def get_all_unparsed(self) -> List[Optional[Otodom]]:
         """
         Retrieve all unparsed Otodom data from the collection.
@@ -41,6 +51,18 @@ class OtodomRepository:
         """
         return self.collection.find({"parsed": False})
 
+    def get_sample(self, size: int) -> List[Any]:
+        """
+        Retrieve randomly chosen Otodom data from the collection.
+
+        Parameters:
+        - size (int): Number of documents to retrieve.
+
+        Returns:
+        - List[Any]: The sampled documents.
+        """
+        return list(self.collection.aggregate([{"$sample": {"size": size}}]))
+
     def get_by_id(self, _id: str) -> Otodom:
         """
         Retrieve Otodom data from the collection by its ID.
@@ -53,11 +75,47 @@ class OtodomRepository:
         """
         return self.collection.find_one({"_id": _id})
 
-    def update_parsed(self, otodom: Otodom) -> None:
+    def update_parsed(self, _id: Any) -> None:
         """
         Update the 'parsed' field of Otodom data in the collection.
 
         Parameters:
-        - otodom (Otodom): The Otodom data object to update the 'parsed' field for.
+        - _id (Any): The ID of the Otodom data to update.
+        """
+        return self.collection.update_one({"_id": _id}, {"$set": {"parsed": True}})
+
+    def update_many_parsed(self, ids: List[Any]) -> None:
+        """
+        Update the 'parsed' field of many Otodom data in the collection with a single round trip.
+
+        Parameters:
+        - ids (List[Any]): The IDs of the Otodom data to update.
+        """
+        if ids:
+            self.collection.update_many({"_id": {"$in": ids}}, {"$set": {"parsed": True}})
+
+    def iter_unparsed(self, batch_size: int, id_range: Optional[Tuple[Any, Any]] = None) -> Iterator[Any]:
+        """
+        Stream unparsed Otodom data from the collection.
+
+        Parameters:
+        - batch_size (int): Number of documents fetched per round trip.
+        - id_range (Optional[Tuple[Any, Any]]): Lowest and highest ID to return, both inclusive.
+
+        Returns:
+        - Iterator[Any]: Unparsed documents, oldest first.
+        """
+        query = {"parsed": False}
+        if id_range:
+            query["_id"] = {"$gte": id_range[0], "$lte": id_range[1]}
+        return self.collection.find(query).sort("_id", 1).batch_size(batch_size)
+
+    def iter_unparsed_ids(self) -> Iterator[Any]:
+        """
+        Stream the IDs of unparsed Otodom data from the collection.
+
+        Returns:
+        - Iterator[Any]: IDs of unparsed documents, in ascending order.
         """
-        return self.collection.update_one({"_id": otodom.id}, {"$set": {"parsed": True}})
+        for d in self.collection.find({"parsed": False}, {"_id": 1}).sort("_id", 1):
+            yield d["_id"]
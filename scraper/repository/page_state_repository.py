@@ -0,0 +1,76 @@
+from typing import Any, List, Optional, Union
+
+from pymongo import ReplaceOne
+
+from data.page_state import PageState
+
+
+class PageStateRepository:
+    """A class to interact with the collection of scraped page states."""
+
+    KEY = ("site", "mode", "category", "sub_category", "page")
+    # Unique index of states saved before the crawl mode was part of the key
+    LEGACY_INDEX = "site_1_category_1_sub_category_1_page_1"
+
+    def __init__(self, collection: Any):
+        """
+        Initialize the page state repository with a database collection.
+
+        Parameters:
+        - collection (Any): The collection in the database to interact with.
+        """
+        self.collection = collection
+        if self.LEGACY_INDEX in self.collection.index_information():
+            # Legacy states cannot be attributed to a crawl mode, their pages are downloaded once again
+            self.collection.drop_index(self.LEGACY_INDEX)
+            self.collection.delete_many({"mode": {"$exists": False}})
+        self.collection.create_index([(field, 1) for field in self.KEY], unique=True)
+
+    def get(
+            self, site: str, mode: str, category: str, sub_category: Union[int, str], page: int
+    ) -> Optional[PageState]:
+        """
+        Retrieve the state of a page.
+
+        Parameters:
+        - site (str): The scraped site.
+        - mode (str): The crawl mode the page was requested in.
+        - category (str): The category of the page.
+        - sub_category (Union[int, str]): The sub-category of the page.
+        - page (int): The page number.
+
+        Returns:
+        - Optional[PageState]: The page state, or None if the page was never scraped.
+        """
+        document = self.collection.find_one(
+            {"site": site, "mode": mode, "category": category, "sub_category": sub_category, "page": page}
+        )
+        return PageState(**document) if document else None
+
+    def save(self, state: PageState) -> None:
+        """
+        Insert or replace the state of a page.
+
+        Parameters:
+        - state (PageState): The page state.
+        """
+        self.collection.replace_one({field: getattr(state, field) for field in self.KEY}, state.model_dump(), upsert=True)
+
+    def save_many(self, states: List[PageState]) -> None:
+        """
+        Insert or replace the state of many pages with a single round trip.
+
+        Parameters:
+        - states (List[PageState]): The page states.
+        """
+        if states:
+            self.collection.bulk_write([
+                ReplaceOne({field: getattr(state, field) for field in self.KEY}, state.model_dump(), upsert=True)
+                for state in states
+            ], ordered=False)
+
+    def delete_all(self) -> None:
+        """
+        Delete the state of every page.
+        """
+        return self.collection.delete_many({})
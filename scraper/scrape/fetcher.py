@@ -0,0 +1,153 @@
+import asyncio
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from config.settings import settings
+from .throttle import HostThrottle, backoff_delay, parse_retry_after
+
+
+class Fetcher:
+    """
+    Asynchronous HTTP client shared by the scrapers.
+
+    All requests go through one connection pool. Every host gets its own throttle: a token
+    bucket rate limit, a concurrency limit that grows while the host answers fast and
+    shrinks on errors, and a circuit breaker that skips the host after repeated failures.
+    Connection errors, 429 and 5xx responses are retried with exponential backoff and
+    jitter, honouring Retry-After. Use it as an async context manager.
+
+    Attributes:
+        pages (int): Number of successfully fetched pages.
+        bytes (int): Total size of the fetched pages.
+        retries (int): Number of retried requests.
+    """
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    def __init__(
+            self,
+            host_concurrency: int = settings.SCRAPER_HOST_CONCURRENCY,
+            max_connections: int = settings.SCRAPER_MAX_CONNECTIONS,
+            timeout: float = settings.SCRAPER_TIMEOUT,
+            headers: Optional[Dict[str, str]] = None,
+            max_retries: int = settings.SCRAPER_RETRIES,
+    ):
+        """
+        Initialize the fetcher.
+
+        Args:
+            host_concurrency (int): Maximum number of concurrent requests per host.
+            max_connections (int): Size of the connection pool.
+            timeout (float): Request timeout, in seconds.
+            headers (Optional[Dict[str, str]]): Headers sent with every request.
+            max_retries (int): Maximum number of retries of a failed request.
+        """
+        self.host_concurrency = host_concurrency
+        self.max_retries = max_retries
+        self.pages = 0
+        self.bytes = 0
+        self.retries = 0
+        self._client = httpx.AsyncClient(
+            headers=headers,
+            timeout=timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        )
+        self._throttles: Dict[str, HostThrottle] = {}
+        self._started_at = time.perf_counter()
+
+    async def __aenter__(self) -> "Fetcher":
+        self._started_at = time.perf_counter()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self._client.aclose()
+
+    def _throttle(self, host: str) -> HostThrottle:
+        """
+        Get the throttle of a host, creating it on first use.
+
+        Args:
+            host (str): Host name.
+
+        Returns:
+            HostThrottle: The host's throttle.
+        """
+        if host not in self._throttles:
+            self._throttles[host] = HostThrottle(
+                rate=settings.SCRAPER_RATE,
+                burst=settings.SCRAPER_BURST,
+                max_concurrency=self.host_concurrency,
+                target_latency=settings.SCRAPER_TARGET_LATENCY,
+                failure_threshold=settings.SCRAPER_BREAKER_THRESHOLD,
+                reset_timeout=settings.SCRAPER_BREAKER_TIMEOUT,
+            )
+        return self._throttles[host]
+
+    async def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> Optional[httpx.Response]:
+        """
+        Fetch a URL, retrying transient failures.
+
+        Args:
+            url (str): The URL to fetch.
+            headers (Optional[Dict[str, str]]): Extra headers of this request.
+
+        Returns:
+            Optional[httpx.Response]: The response, or None if the request failed or the host's circuit is open.
+        """
+        throttle = self._throttle(httpx.URL(url).host)
+
+        for attempt in range(self.max_retries + 1):
+            if not throttle.breaker.allow():
+                print(f"Circuit open, skipping {url}")
+                return None
+
+            await throttle.bucket.acquire()
+            async with throttle.limiter:
+                started_at = time.perf_counter()
+                try:
+                    response = await self._client.get(url, headers=headers)
+                except httpx.TransportError as e:
+                    print(e)
+                    response = None
+                latency = time.perf_counter() - started_at
+
+            if response is not None and response.status_code not in self.RETRY_STATUS_CODES:
+                throttle.breaker.record_success()
+                throttle.limiter.record_success(latency)
+                if response.is_error:
+                    print(f"{response.status_code} {url}")
+                    return None
+                self.pages += 1
+                self.bytes += len(response.content)
+                return response
+
+            throttle.breaker.record_failure()
+            throttle.limiter.record_failure()
+            if attempt == self.max_retries:
+                break
+
+            delay = backoff_delay(attempt, settings.SCRAPER_BACKOFF_BASE, settings.SCRAPER_BACKOFF_MAX)
+            if response is not None:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = min(retry_after, settings.SCRAPER_BACKOFF_MAX)
+                    throttle.bucket.pause(delay)
+                print(f"{response.status_code} {url}, retrying in {delay:.1f}s")
+            self.retries += 1
+            await asyncio.sleep(delay)
+
+        print(f"Giving up on {url}")
+        return None
+
+    def report(self) -> None:
+        """
+        Print the number of fetched pages and the throughput since the fetcher was opened.
+        """
+        elapsed = time.perf_counter() - self._started_at
+        print(
+            f"Fetched {self.pages} pages ({self.bytes / 1024 / 1024:.1f} MiB) in {elapsed:.1f}s, "
+            f"{self.pages / elapsed if elapsed else 0:.2f} pages/sec, {self.retries} retries"
+        )
@@ -0,0 +1,176 @@
+import hashlib
+import math
+import os
+import struct
+from typing import Iterable
+
+from config.settings import settings
+
+
+class BloomFilter:
+    """
+    Probabilistic set of URLs.
+
+    Membership tests never miss an added URL and wrongly report an unknown URL as known
+    with about the configured error rate, in a fraction of the memory of a real set.
+    """
+
+    __HEADER = struct.Struct("<4sQQQ")
+    __MAGIC = b"BLM1"
+
+    def __init__(self, size: int, hash_count: int, bits: bytearray = None, count: int = 0):
+        """
+        Initialize the filter.
+
+        Args:
+            size (int): Number of bits.
+            hash_count (int): Number of bits set per URL.
+            bits (bytearray): Existing bit array, a new empty one is created by default.
+            count (int): Number of distinct URLs already added.
+        """
+        self.size = size
+        self.hash_count = hash_count
+        self.bits = bits if bits is not None else bytearray((size + 7) // 8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        """
+        Create an empty filter sized for the given number of URLs and error rate.
+
+        Args:
+            capacity (int): Expected number of URLs.
+            error_rate (float): Acceptable false positive rate.
+
+        Returns:
+            BloomFilter: The filter.
+        """
+        capacity = max(capacity, 1)
+        size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        hash_count = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hash_count)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Number of URLs the filter was sized for, beyond which false positives exceed the configured rate.
+        """
+        return int(self.size * math.log(2) / self.hash_count)
+
+    def __positions(self, url: str) -> Iterable[int]:
+        """
+        Get the bit positions of a URL, using double hashing over one digest.
+
+        Args:
+            url (str): The URL.
+
+        Returns:
+            Iterable[int]: Bit positions.
+        """
+        digest = hashlib.blake2b(url.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, url: str) -> None:
+        """
+        Add a URL, counting it only if it was not known yet, so runs seeing the same URLs do not inflate `count`.
+
+        Args:
+            url (str): The URL.
+        """
+        added = False
+        for position in self.__positions(url):
+            mask = 1 << (position & 7)
+            if not self.bits[position >> 3] & mask:
+                self.bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+
+    def __contains__(self, url: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.__positions(url))
+
+    def save(self, path: str) -> None:
+        """
+        Write the filter to a file, replacing it atomically.
+
+        Args:
+            path (str): File path.
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(self.__HEADER.pack(self.__MAGIC, self.size, self.hash_count, self.count))
+            file.write(self.bits)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        """
+        Read a filter written by `save`.
+
+        Args:
+            path (str): File path.
+
+        Returns:
+            BloomFilter: The filter.
+
+        Raises:
+            ValueError: If the file is not a filter snapshot.
+        """
+        with open(path, "rb") as file:
+            magic, size, hash_count, count = cls.__HEADER.unpack(file.read(cls.__HEADER.size))
+            if magic != cls.__MAGIC:
+                raise ValueError(f"{path} is not a known URLs snapshot")
+            return cls(size, hash_count, bytearray(file.read()), count)
+
+
+def load_known_urls() -> BloomFilter:
+    """
+    Load the known URLs snapshot, or create an empty filter if there is none yet.
+
+    A snapshot holding more URLs than it was sized for reports unknown offers as known too
+    often, stopping incremental crawls before their new offers. It is replaced with an empty,
+    larger filter, so the run crawls every page and rebuilds it.
+
+    Returns:
+        BloomFilter: The known URLs.
+    """
+    if not os.path.exists(settings.KNOWN_URLS_PATH):
+        print(f"No known URLs snapshot at {settings.KNOWN_URLS_PATH}, starting with an empty one")
+        return BloomFilter.for_capacity(settings.KNOWN_URLS_CAPACITY, settings.KNOWN_URLS_ERROR_RATE)
+
+    known_urls = BloomFilter.load(settings.KNOWN_URLS_PATH)
+    if known_urls.count > known_urls.capacity:
+        print(
+            f"Known URLs snapshot holds {known_urls.count} URLs but was sized for {known_urls.capacity}, "
+            f"rebuilding it during this run (or rebuild it now with import-known-urls)"
+        )
+        return BloomFilter.for_capacity(
+            max(known_urls.count * 2, settings.KNOWN_URLS_CAPACITY), settings.KNOWN_URLS_ERROR_RATE
+        )
+    return known_urls
+
+
+def import_known_urls(path: str) -> BloomFilter:
+    """
+    Build the known URLs snapshot from a file with one URL per line, e.g. exported from the app database.
+
+    Args:
+        path (str): Path of the URL list.
+
+    Returns:
+        BloomFilter: The saved filter.
+    """
+    with open(path, encoding="utf-8") as file:
+        capacity = sum(1 for _ in file)
+
+    known_urls = BloomFilter.for_capacity(
+        max(capacity * 2, settings.KNOWN_URLS_CAPACITY), settings.KNOWN_URLS_ERROR_RATE
+    )
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            url = line.strip()
+            if url:
+                known_urls.add(url)
+    known_urls.save(settings.KNOWN_URLS_PATH)
+    return known_urls
@@ -1,45 +1,70 @@
-from .scrape_strategy import ScrapeStrategy
+import asyncio
 from typing import Any, Dict, Optional
-import requests
-from service import olx_service
+
+import httpx
+import orjson
+
+from config.settings import settings
+from data.crawl_mode import CrawlMode
 from data.olx import Olx
-import json
+from data.site import Site
+from service import olx_service
+from .fetcher import Fetcher
+from .known_urls import load_known_urls
+from .page_tracker import PageTracker
+from .page_writer import PageWriter
+from .scrape_strategy import ScrapeStrategy
 
 
 class OlxScraper(ScrapeStrategy):
     """
     OLX Scraper class for scraping OLX website.
 
+    Every category is paginated independently by following `links.next`, while all
+    categories are scraped at once over a shared connection pool. Pages that did not
+    change since the previous run are not stored again, the others are stored in batches.
+
+    In incremental mode categories are crawled newest first and a category stops at the
+    first page whose offers are all known, i.e. in the known URLs snapshot or seen by an
+    earlier run. URLs seen during the run are added to the snapshot.
+
     Attributes:
         __service (OlxService): An instance of OlxService.
+        CATEGORIES (dict): Seed URL for each (category, sub_category) pair.
     """
 
     __service = olx_service.OlxService()
 
-    @staticmethod
-    def __get_content(url: str) -> Optional[Dict[str, Any]]:
+    CATEGORIES = {
+        ("Mieszkanie",
+         0): "https://www.olx.pl/api/v1/offers/?offset=40&limit=40&category_id=14&filter_refiners=spell_checker&sl=18c34ade124x23bc10a5",
+        # TODO add url for each category and subcategory
+        # ("Mieszkanie", 1): "https://www.olx.pl/api/v1/offers/?offset=80&limit=40&category_id=15&filter_refiners=spell_checker&sl=18c34ade124x23bc10a5",
+        # ("Dom", 0): "",
+        # ("Dom", 1): "",
+        # ("Działka", 0): "",
+        # ("Działka", 1): "",
+        # ("Biura i lokale", 0): "",
+        # ("Biura i lokale", 1): "",
+        # ("Garaże i parkingi", 0): "",
+        # ("Garaże i parkingi", 1): "",
+        # ("Stancje i pokoje", 0): "",
+        # ("Stancje i pokoje", 1): "",
+        # ("Hale i magazyny", 0): "",
+        # ("Hale i magazyny", 1): "",
+        # ("Pozostałe", 0): "",
+        # ("Pozostałe", 1): ""
+    }
+
+    def __init__(self, incremental: bool = False):
         """
-        Get content from a given URL.
+        Initialize the scraper.
 
         Args:
-            url (str): The URL to fetch content from.
-
-        Returns:
-            Optional[Dict[str, Any]]: A dictionary containing fetched content, or None if failed.
+            incremental (bool): Stop every category at the first page with only known offers.
         """
-        try:
-            response = requests.get(url)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.HTTPError as e:
-            print(e)
-            return None
-        except requests.exceptions.RequestException as e:
-            print(e)
-            return None
-        except Exception as e:
-            print(e)
-            return None
+        self.incremental = incremental
+        self.__known_urls = None
 
     @staticmethod
     def __get_next_page_url(content: Dict[str, Any]) -> Optional[str]:
@@ -61,44 +86,111 @@ class OlxScraper(ScrapeStrategy):
         url = next_url.get("href")
         return url
 
+    async def __scrape_category(
+            self,
+            fetcher: Fetcher,
+            tracker: PageTracker,
+            writer: PageWriter,
+            category: str,
+            sub_category: int,
+            url: str
+    ) -> None:
+        """
+        Scrape every page of a single category, skipping pages that did not change.
+
+        Args:
+            fetcher (Fetcher): Shared fetcher.
+            tracker (PageTracker): Tracker of unchanged pages.
+            writer (PageWriter): Writer storing the pages.
+            category (str): The category name.
+            sub_category (int): The sub-category number.
+            url (str): URL of the first page.
+        """
+        next_page = url
+        page = 1
+        while next_page:
+            print(f"Scraping {next_page}")
+
+            result = await tracker.fetch(fetcher, next_page, category, sub_category, page)
+            if not result:
+                break
+            content, state = result
+            if content is None:
+                print("Page did not change")
+                if self.incremental:
+                    break
+                next_page, page = state.next_url, page + 1
+                continue
+
+            try:
+                decoded = orjson.loads(content)
+            except ValueError as e:
+                print(e)
+                break
+
+            next_page, page = self.__get_next_page_url(decoded), page + 1
+            state.next_url = next_page
+            await writer.add(Olx(category=category, sub_category=sub_category, data=content), state)
+
+            if self.incremental and self.__remember_urls(decoded):
+                print(f"Only known offers on page {page - 1} of {category} {sub_category}, stopping")
+                break
+
+    def __remember_urls(self, content: Dict[str, Any]) -> bool:
+        """
+        Add the offer URLs of a page to the known URLs.
+
+        Args:
+            content (Dict[str, Any]): The fetched content as a dictionary.
+
+        Returns:
+            bool: True if every offer on the page was already known.
+        """
+        urls = [offer["url"] for offer in content.get("data") or [] if offer.get("url")]
+        all_known = all(url in self.__known_urls for url in urls)
+        for url in urls:
+            self.__known_urls.add(url)
+        return all_known
+
+    @staticmethod
+    def __newest_first(url: str) -> str:
+        """
+        Sort a listing URL by creation date, newest first, starting from the newest offer.
+
+        Args:
+            url (str): Listing URL.
+
+        Returns:
+            str: The URL sorted newest first.
+        """
+        return str(httpx.URL(url).copy_set_param("sort_by", "created_at:desc").copy_set_param("offset", 0))
+
+    async def __scrape(self) -> None:
+        """Scrape all categories concurrently."""
+        tracker = PageTracker(Site.OLX, CrawlMode.INCREMENTAL if self.incremental else CrawlMode.FULL)
+        if self.incremental:
+            self.__known_urls = load_known_urls()
+
+        async with Fetcher() as fetcher, PageWriter(self.__service, tracker) as writer:
+            await asyncio.gather(*(
+                self.__scrape_category(
+                    fetcher,
+                    tracker,
+                    writer,
+                    category,
+                    sub_category,
+                    self.__newest_first(url) if self.incremental else url
+                )
+                for (category, sub_category), url in self.CATEGORIES.items()
+            ))
+        fetcher.report()
+        tracker.report()
+        writer.report()
+
+        if self.incremental:
+            self.__known_urls.save(settings.KNOWN_URLS_PATH)
+
     def scrape(self):
         """Scrape data from OLX."""
         print("Run OLX scraper")
-
-        CATEGORIES = {
-            ("Mieszkanie",
-             0): "https://www.olx.pl/api/v1/offers/?offset=40&limit=40&category_id=14&filter_refiners=spell_checker&sl=18c34ade124x23bc10a5",
-            # TODO add url for each category and subcategory
-            # ("Mieszkanie", 1): "https://www.olx.pl/api/v1/offers/?offset=80&limit=40&category_id=15&filter_refiners=spell_checker&sl=18c34ade124x23bc10a5",
-            # ("Dom", 0): "",
-            # ("Dom", 1): "",
-            # ("Działka", 0): "",
-            # ("Działka", 1): "",
-            # ("Biura i lokale", 0): "",
-            # ("Biura i lokale", 1): "",
-            # ("Garaże i parkingi", 0): "",
-            # ("Garaże i parkingi", 1): "",
-            # ("Stancje i pokoje", 0): "",
-            # ("Stancje i pokoje", 1): "",
-            # ("Hale i magazyny", 0): "",
-            # ("Hale i magazyny", 1): "",
-            # ("Pozostałe", 0): "",
-            # ("Pozostałe", 1): ""
-        }
-
-        for key, value in CATEGORIES.items():
-            category, sub_category = key
-
-            next_page = value
-            while next_page:
-                print(f"Scraping {next_page}")
-
-                content = self.__get_content(next_page)
-                if content:
-                    data = Olx(category=category, sub_category=sub_category, data=json.dumps(content))
-                    self.__service.create(data)
-                    print("Save scraped data to MongoDB")
-
-                next_page = self.__get_next_page_url(content)
-                if not next_page:
-                    break
+        asyncio.run(self.__scrape())
@@ -1,15 +1,26 @@
-from .scrape_strategy import ScrapeStrategy
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import re
 from typing import Optional
+
 from data.otodom import Otodom
+from data.page_state import PageState
+from data.site import Site
 from service.otodom_service import OtodomService
+from .fetcher import Fetcher
+from .page_tracker import PageTracker
+from .page_writer import PageWriter
+from .scrape_strategy import ScrapeStrategy
 
 
 class OtodomScraper(ScrapeStrategy):
     """
     OtodomScraper class for scraping data from Otodom website.
 
+    The number of pages of every type and category listing is read from its first page,
+    after which the remaining pages are fetched concurrently. All listings are scraped at
+    once, the shared fetcher bounds the number of requests in flight. Pages that did not
+    change since the previous run are not stored again, the others are stored in batches.
+
     Attributes:
         __service (OtodomService): An instance of OtodomService.
         __USER_AGENT (str): User agent string for HTTP requests.
@@ -23,10 +34,13 @@ class OtodomScraper(ScrapeStrategy):
     __CATEGORIES = ["mieszkanie", "kawalerka", "dom", "inwestycja", "pokoj", "dzialka", "lokal", "haleimagazyny",
                   "garaz"]
     __TYPE = ["wynajem", "sprzedaz"]
+    __TOTAL_PAGES = re.compile(r'"totalPages":\s*(\d+)')
+    __NEXT_PAGE_BUTTON = 'aria-label="Go to next Page"'
 
-    def __get_content(self, category: str, type_: str, page_num: int = 1) -> Optional[str]:
+    @staticmethod
+    def __get_url(category: str, type_: str, page_num: int = 1) -> str:
         """
-        Get content from a specified Otodom URL.
+        Build the URL of an Otodom listing page.
 
         Args:
             category (str): The category of the property.
@@ -34,25 +48,24 @@ class OtodomScraper(ScrapeStrategy):
             page_num (int): The page number to scrape. Defaults to 1.
 
         Returns:
-            Optional[str]: The scraped content as a string, or None if failed.
+            str: The page URL.
         """
-        url = f"https://www.otodom.pl/pl/wyniki/{type_}/{category}/cala-polska?viewType=listing&page={page_num}"
-        try:
-            response = requests.get(url, headers={"User-Agent": self.__USER_AGENT})
-            response.raise_for_status()
-            return response.text
-        except requests.exceptions.HTTPError as e:
-            print(e)
-            return None
-        except requests.exceptions.RequestException as e:
-            print(e)
-            return None
-        except Exception as e:
-            print(e)
-            return None
+        return f"https://www.otodom.pl/pl/wyniki/{type_}/{category}/cala-polska?viewType=listing&page={page_num}"
 
-    @staticmethod
-    def __is_next_page(content: str) -> bool:
+    def __get_total_pages(self, content: str) -> Optional[int]:
+        """
+        Read the number of pages of a listing from the pagination data embedded in its page.
+
+        Args:
+            content (str): The scraped content.
+
+        Returns:
+            Optional[int]: Number of pages, or None if the page has no pagination data.
+        """
+        match = self.__TOTAL_PAGES.search(content)
+        return int(match.group(1)) if match else None
+
+    def __is_next_page(self, content: str) -> bool:
         """
         Check if there's a next page in the scraped content.
 
@@ -62,31 +75,97 @@ class OtodomScraper(ScrapeStrategy):
         Returns:
             bool: True if there's a next page, False otherwise.
         """
-        soup = BeautifulSoup(content, "html.parser")
-        next_button = soup.find("li", {"aria-label": "Go to next Page"})
-        if next_button:
-            return True
-        return False
+        return self.__NEXT_PAGE_BUTTON in content
+
+    async def __scrape_page(
+            self,
+            fetcher: Fetcher,
+            tracker: PageTracker,
+            writer: PageWriter,
+            category: str,
+            type_: str,
+            page_num: int
+    ) -> Optional[PageState]:
+        """
+        Fetch a single listing page and queue it for storage, unless it did not change.
+
+        Args:
+            fetcher (Fetcher): Shared fetcher.
+            tracker (PageTracker): Tracker of unchanged pages.
+            writer (PageWriter): Writer storing the pages.
+            category (str): The category of the property.
+            type_ (str): The type of transaction (rental/sale).
+            page_num (int): The page number to scrape.
+
+        Returns:
+            Optional[PageState]: State of the page with its pagination, or None if failed.
+        """
+        result = await tracker.fetch(fetcher, self.__get_url(category, type_, page_num), category, type_, page_num)
+        if not result:
+            return None
+        content, state = result
+        if content is None:
+            print(f"Page {page_num} of {category} {type_} data from otodom.pl did not change")
+            return state
+        print(f"Scraped {page_num} page of {category} {type_} data from otodom.pl")
+
+        text = content.decode("utf-8", errors="replace")
+        state.total_pages = self.__get_total_pages(text)
+        if self.__is_next_page(text):
+            state.next_url = self.__get_url(category, type_, page_num + 1)
+        await writer.add(Otodom(category=category, sub_category=type_, data=content), state)
+        return state
+
+    async def __scrape_listing(
+            self,
+            fetcher: Fetcher,
+            tracker: PageTracker,
+            writer: PageWriter,
+            category: str,
+            type_: str
+    ) -> None:
+        """
+        Scrape every page of a single type and category listing.
+
+        Args:
+            fetcher (Fetcher): Shared fetcher.
+            tracker (PageTracker): Tracker of unchanged pages.
+            writer (PageWriter): Writer storing the pages.
+            category (str): The category of the property.
+            type_ (str): The type of transaction (rental/sale).
+        """
+        state = await self.__scrape_page(fetcher, tracker, writer, category, type_, 1)
+        if not state:
+            return
+
+        if state.total_pages is not None:
+            await asyncio.gather(*(
+                self.__scrape_page(fetcher, tracker, writer, category, type_, page_num)
+                for page_num in range(2, state.total_pages + 1)
+            ))
+            return
+
+        # No pagination data, walk the pages one by one
+        page_num = 1
+        while state and state.next_url:
+            page_num += 1
+            state = await self.__scrape_page(fetcher, tracker, writer, category, type_, page_num)
+
+    async def __scrape(self) -> None:
+        """Scrape all type and category listings concurrently."""
+        tracker = PageTracker(Site.OTODOM)
+        async with (
+            Fetcher(headers={"User-Agent": self.__USER_AGENT}) as fetcher,
+            PageWriter(self.__service, tracker) as writer,
+        ):
+            await asyncio.gather(*(
+                self.__scrape_listing(fetcher, tracker, writer, category, t)
+                for t in self.__TYPE for category in self.__CATEGORIES
+            ))
+        fetcher.report()
+        tracker.report()
+        writer.report()
 
     def scrape(self) -> None:
         """Scrape data from Otodom."""
-        for t in self.__TYPE:
-            for category in self.__CATEGORIES:
-                page_num = 1
-                next_page = True
-                while next_page:
-                    print(f"Scrape {page_num} page of {category} {t} data from otodom.pl")
-
-                    content = self.__get_content(
-                        category=category,
-                        type_=t,
-                        page_num=page_num
-                    )
-                    if content:
-                        data = Otodom(category=category, sub_category=t, data=content)
-                        self.__service.create(data)
-                        print("Content saved to MongoDB")
-
-                    next_page = self.__is_next_page(content)
-                    page_num += 1
-
+        asyncio.run(self.__scrape())
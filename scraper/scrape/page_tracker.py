@@ -0,0 +1,119 @@
+import asyncio
+import hashlib
+from typing import List, Optional, Tuple, Union
+
+from data.crawl_mode import CrawlMode
+from data.page_state import PageState
+from data.site import Site
+from service.page_state_service import PageStateService
+from .fetcher import Fetcher
+
+
+class PageTracker:
+    """
+    Detects listing pages that did not change since the previous run.
+
+    For every (site, crawl mode, category, sub_category, page) the ETag, Last-Modified and
+    a hash of the content are kept. Pages are requested conditionally, and a page answered
+    with 304 or with the same content hash is reported as unchanged, so it is neither
+    stored nor parsed again.
+    """
+
+    def __init__(self, site: Site, mode: CrawlMode = CrawlMode.FULL):
+        """
+        Initialize the tracker.
+
+        Args:
+            site (Site): The scraped site.
+            mode (CrawlMode): The crawl mode, pages of different modes are tracked separately.
+        """
+        self.site = site
+        self.mode = mode
+        self.unchanged = 0
+        self.__service = PageStateService()
+
+    @staticmethod
+    def __hash(content: bytes) -> str:
+        """
+        Hash page content.
+
+        Args:
+            content (bytes): The page content.
+
+        Returns:
+            str: Hex digest of the content.
+        """
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    async def fetch(
+            self,
+            fetcher: Fetcher,
+            url: str,
+            category: str,
+            sub_category: Union[int, str],
+            page: int
+    ) -> Optional[Tuple[Optional[bytes], PageState]]:
+        """
+        Fetch a page unless it did not change.
+
+        Args:
+            fetcher (Fetcher): Shared fetcher.
+            url (str): The page URL.
+            category (str): The category of the page.
+            sub_category (Union[int, str]): The sub-category of the page.
+            page (int): The page number.
+
+        Returns:
+            Optional[Tuple[Optional[bytes], PageState]]: None if the request failed, otherwise the raw
+                page content (None when unchanged) and its state. The state of a changed page must be
+                passed to `save_many` once the page is stored.
+        """
+        previous = await asyncio.to_thread(
+            self.__service.get, self.site.value, self.mode.value, category, sub_category, page
+        )
+
+        headers = {}
+        if previous and previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous and previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+
+        response = await fetcher.get(url, headers=headers)
+        if not response:
+            return None
+        if response.status_code == 304:
+            self.unchanged += 1
+            return None, previous
+
+        content_hash = self.__hash(response.content)
+        state = PageState(
+            site=self.site.value,
+            mode=self.mode.value,
+            category=category,
+            sub_category=sub_category,
+            page=page,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+            content_hash=content_hash,
+        )
+        if previous and previous.content_hash == content_hash:
+            self.unchanged += 1
+            state.next_url, state.total_pages = previous.next_url, previous.total_pages
+            await asyncio.to_thread(self.__service.save, state)
+            return None, state
+        return response.content, state
+
+    def save_many(self, states: List[PageState]) -> None:
+        """
+        Save the states of stored pages.
+
+        Args:
+            states (List[PageState]): The page states.
+        """
+        self.__service.save_many(states)
+
+    def report(self) -> None:
+        """
+        Print the number of pages skipped as unchanged.
+        """
+        print(f"Skipped {self.unchanged} unchanged pages")
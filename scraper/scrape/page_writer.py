@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from typing import Any, List, Tuple, Union
+
+from config.settings import settings
+from data.olx import Olx
+from data.otodom import Otodom
+from data.page_state import PageState
+from utils.compression import compress, resolve_encoding
+from .page_tracker import PageTracker
+
+
+class PageWriter:
+    """
+    Buffers scraped pages and stores them in batches.
+
+    Pages are compressed and written with one `insert_many` per `flush_size` pages, off the
+    event loop. The states of the pages are saved right after their batch, so a page is
+    never reported as unchanged unless it was stored. Use it as an async context manager,
+    leaving it flushes the remaining pages.
+
+    Attributes:
+        pages (int): Number of stored pages.
+        raw_bytes (int): Size of the stored pages before compression.
+        stored_bytes (int): Size of the stored pages after compression.
+    """
+
+    def __init__(
+            self,
+            service: Any,
+            tracker: PageTracker,
+            flush_size: int = settings.SCRAPER_FLUSH_SIZE,
+            encoding: str = settings.SCRAPER_COMPRESSION,
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            service (Any): Service of the scraped site, with a `create_many` method.
+            tracker (PageTracker): Tracker saving the states of stored pages.
+            flush_size (int): Number of pages written at once.
+            encoding (str): Compression of the stored pages: "zstd", "gzip" or "none".
+        """
+        self.service = service
+        self.tracker = tracker
+        self.flush_size = max(flush_size, 1)
+        self.encoding = resolve_encoding(encoding)
+        self.pages = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self._write_time = 0.0
+        self._pending: List[Tuple[Union[Olx, Otodom], PageState]] = []
+        self._lock = threading.Lock()
+
+    async def __aenter__(self) -> "PageWriter":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.flush()
+
+    async def add(self, page: Union[Olx, Otodom], state: PageState) -> None:
+        """
+        Queue a page for storage, flushing when the batch is full.
+
+        Args:
+            page (Union[Olx, Otodom]): The page, with its raw content in `data`.
+            state (PageState): State of the page, saved once the page is stored.
+        """
+        self._pending.append((page, state))
+        if len(self._pending) >= self.flush_size:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Store the queued pages.
+        """
+        batch, self._pending = self._pending, []
+        if batch:
+            await asyncio.to_thread(self.__write, batch)
+
+    def __write(self, batch: List[Tuple[Union[Olx, Otodom], PageState]]) -> None:
+        """
+        Compress and store a batch of pages, then save their states.
+
+        Args:
+            batch (List[Tuple[Union[Olx, Otodom], PageState]]): Pages with their states.
+        """
+        started_at = time.perf_counter()
+        raw_bytes = stored_bytes = 0
+        pages = []
+        for page, _ in batch:
+            data = compress(page.data, self.encoding)
+            raw_bytes += len(page.data)
+            stored_bytes += len(data)
+            pages.append(page.model_copy(update={"data": data, "encoding": self.encoding}))
+
+        self.service.create_many(pages)
+        self.tracker.save_many([state for _, state in batch])
+        print(f"Saved {len(pages)} pages to MongoDB")
+
+        with self._lock:
+            self.pages += len(pages)
+            self.raw_bytes += raw_bytes
+            self.stored_bytes += stored_bytes
+            self._write_time += time.perf_counter() - started_at
+
+    def report(self) -> None:
+        """
+        Print raw versus stored size and write throughput of the stored pages.
+        """
+        raw_mib, stored_mib = self.raw_bytes / 1024 / 1024, self.stored_bytes / 1024 / 1024
+        ratio = self.raw_bytes / self.stored_bytes if self.stored_bytes else 0
+        rate = self.pages / self._write_time if self._write_time else 0
+        print(
+            f"Stored {self.pages} pages: {raw_mib:.1f} MiB raw, {stored_mib:.1f} MiB with "
+            f"{self.encoding or 'no'} compression ({ratio:.1f}x), {rate:.0f} pages/sec "
+            f"({raw_mib / self._write_time if self._write_time else 0:.1f} MiB/sec) written"
+        )
@@ -0,0 +1,239 @@
+import asyncio
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens are refilled at `rate` per second up to `capacity`, every request takes one.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        """
+        Initialize the bucket, initially full.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (int): Maximum number of tokens, i.e. the allowed burst.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """
+        Wait until a token is available and take it.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hand out no tokens for the given time, e.g. when the host asked to retry later.
+
+        Args:
+            seconds (float): Pause length, in seconds.
+        """
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker that stops requests to a host after consecutive failures.
+
+    After `failure_threshold` failures in a row the circuit opens and requests are
+    rejected for `reset_timeout` seconds. Then a single trial request is let through
+    (half-open); its success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize the breaker, initially closed.
+
+        Args:
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Time the circuit stays open, in seconds.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Whether requests are currently being rejected or waiting for a trial request.
+        """
+        return self._opened_at is not None
+
+    def allow(self) -> bool:
+        """
+        Check whether a request may be sent.
+
+        Returns:
+            bool: True if the circuit is closed or a half-open trial request may be sent.
+        """
+        if self._opened_at is None:
+            return True
+        if self._trial_running or time.monotonic() - self._opened_at < self.reset_timeout:
+            return False
+        self._trial_running = True
+        return True
+
+    def record_success(self) -> None:
+        """
+        Record a successful request, closing the circuit.
+        """
+        self._failures = 0
+        self._opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        """
+        Record a failed request, opening the circuit when the threshold is reached.
+        """
+        self._failures += 1
+        if self._trial_running or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+        self._trial_running = False
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency limiter whose limit follows the host's behaviour (AIMD).
+
+    The limit grows by one slot per window of fast successful requests, and is halved
+    when a request fails or is slower than the target latency.
+    """
+
+    def __init__(self, min_limit: int, max_limit: int, target_latency: float):
+        """
+        Initialize the limiter, starting halfway between the bounds.
+
+        Args:
+            min_limit (int): Lowest number of concurrent requests.
+            max_limit (int): Highest number of concurrent requests.
+            target_latency (float): Latency under which the limit may grow, in seconds.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency
+        self.limit = float(max(min_limit, (min_limit + max_limit) // 2))
+        self._in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self) -> "AdaptiveLimiter":
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        async with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def record_success(self, latency: float) -> None:
+        """
+        Adjust the limit after a successful request.
+
+        Args:
+            latency (float): Duration of the request, in seconds.
+        """
+        if latency > self.target_latency:
+            self.record_failure()
+        else:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def record_failure(self) -> None:
+        """
+        Halve the limit after a failed or slow request.
+        """
+        self.limit = max(self.min_limit, self.limit / 2)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with full jitter.
+
+    Args:
+        attempt (int): Number of the failed attempt, starting at 0.
+        base (float): Delay of the first retry, in seconds.
+        cap (float): Maximum delay, in seconds.
+
+    Returns:
+        float: Random delay between 0 and the exponential bound, in seconds.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given either as seconds or as an HTTP date.
+
+    Args:
+        value (Optional[str]): Header value.
+
+    Returns:
+        Optional[float]: Delay in seconds, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HostThrottle:
+    """
+    Rate limit, circuit breaker and concurrency limit of a single host.
+    """
+
+    def __init__(
+            self,
+            rate: float,
+            burst: int,
+            max_concurrency: int,
+            target_latency: float,
+            failure_threshold: int,
+            reset_timeout: float,
+    ):
+        """
+        Initialize the throttle.
+
+        Args:
+            rate (float): Requests per second.
+            burst (int): Requests that may be sent at once after an idle period.
+            max_concurrency (int): Highest number of concurrent requests.
+            target_latency (float): Latency under which concurrency may grow, in seconds.
+            failure_threshold (int): Consecutive failures that open the circuit.
+            reset_timeout (float): Time the circuit stays open, in seconds.
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.limiter = AdaptiveLimiter(1, max_concurrency, target_latency)
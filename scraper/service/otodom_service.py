@@ -1,3 +1,5 @@
+from typing import Any, List, Optional, Tuple
+
 from data.otodom import Otodom
 from repository.otodom_repository import OtodomRepository
 
@@ -32,6 +34,30 @@ class OtodomService:
         """
         return self.repository.create(data)
 
+    def create_many(self, data: List[Otodom]):
+        """
+        Create many Otodom data entries at once.
+
+        Parameters:
+        - data (List[Otodom]): The Otodom data to be created.
+
+        Returns:
+        - None
+        """
+        return self.repository.create_many(data)
+
+    def get_sample(self, size: int):
+        """
+        Retrieve randomly chosen Otodom data entries.
+
+        Parameters:
+        - size (int): Number of entries to retrieve.
+
+        Returns:
+        - List[Any]: The sampled entries.
+        """
+        return self.repository.get_sample(size)
+
     def get_all_unparsed(self):
         """
         Retrieve all unparsed Otodom data.
@@ -41,21 +67,52 @@ class OtodomService:
         """
         return self.repository.get_all_unparsed()
 
-    def update_parsed(self, _id: str):
+    def update_parsed(self, _id: Any):
         """
         Update the 'parsed' field of an Otodom data entry.
 
         Parameters:
-        - _id (str): The ID of the Otodom data entry to update.
+        - _id (Any): The ID of the Otodom data entry to update.
 
         Returns:
         - None
         """
-        obj = self.repository.get_by_id(_id)
-        if not obj:
-            return
         return self.repository.update_parsed(_id)
 
+    def update_many_parsed(self, ids: List[Any]):
+        """
+        Update the 'parsed' field of many Otodom data entries at once.
+
+        Parameters:
+        - ids (List[Any]): The IDs of the Otodom data entries to update.
+
+        Returns:
+        - None
+        """
+        return self.repository.update_many_parsed(ids)
+
+    def iter_unparsed(self, batch_size: int, id_range: Optional[Tuple[Any, Any]] = None):
+        """
+        Stream unparsed Otodom data without loading it all at once.
+
+        Parameters:
+        - batch_size (int): Number of entries fetched per round trip.
+        - id_range (Optional[Tuple[Any, Any]]): Lowest and highest ID to return, both inclusive.
+
+        Returns:
+        - Iterator[Any]: Unparsed entries.
+        """
+        return self.repository.iter_unparsed(batch_size, id_range)
+
+    def iter_unparsed_ids(self):
+        """
+        Stream the IDs of unparsed Otodom data entries.
+
+        Returns:
+        - Iterator[Any]: IDs of unparsed entries, in ascending order.
+        """
+        return self.repository.iter_unparsed_ids()
+
     def update_send(self, _id: str):
         """
         Update the 'send' field of an Otodom data entry.
@@ -0,0 +1,64 @@
+from typing import List, Optional, Union
+
+from config.database import get_collection
+from data.page_state import PageState
+from repository.page_state_repository import PageStateRepository
+
+
+class PageStateService:
+    """A class to provide services related to the state of scraped pages."""
+
+    def __init__(self):
+        """Initialize the page state service with a page state repository."""
+        self.repository = PageStateRepository(get_collection("page_state"))
+
+    def get(
+            self, site: str, mode: str, category: str, sub_category: Union[int, str], page: int
+    ) -> Optional[PageState]:
+        """
+        Retrieve the state of a page.
+
+        Parameters:
+        - site (str): The scraped site.
+        - mode (str): The crawl mode the page was requested in.
+        - category (str): The category of the page.
+        - sub_category (Union[int, str]): The sub-category of the page.
+        - page (int): The page number.
+
+        Returns:
+        - Optional[PageState]: The page state, or None if the page was never scraped.
+        """
+        return self.repository.get(site, mode, category, sub_category, page)
+
+    def save(self, state: PageState) -> None:
+        """
+        Insert or replace the state of a page.
+
+        Parameters:
+        - state (PageState): The page state.
+
+        Returns:
+        - None
+        """
+        return self.repository.save(state)
+
+    def save_many(self, states: List[PageState]) -> None:
+        """
+        Insert or replace the state of many pages.
+
+        Parameters:
+        - states (List[PageState]): The page states.
+
+        Returns:
+        - None
+        """
+        return self.repository.save_many(states)
+
+    def delete_all(self) -> None:
+        """
+        Forget the state of every page, so the next run stores every page again.
+
+        Returns:
+        - None
+        """
+        return self.repository.delete_all()
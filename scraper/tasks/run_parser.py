@@ -1,39 +1,292 @@
+import multiprocessing
+import time
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Iterator, List, Optional, Set, Tuple
+
+from config.database import close_client
+from config.settings import settings
+from data.offer import Offer
+from data.sink import Sink
 from data.site import Site
+from export.db_sink import DatabaseSink
 from export.save import save_offer
 from parser import olx_parser, otodom_parser
 from parser.parser import Parser
 from service.olx_service import OlxService
 from service.otodom_service import OtodomService
+from utils.compression import decompress
 
 
-def run_parser(site: Site) -> None:
+def get_site(site: Site) -> Tuple[Any, Parser]:
     """
-    Run the parser for the specified site.
+    Get the service and the parser of a site.
 
     Args:
         site (Site): The site to parse.
 
     Returns:
-        None
+        Tuple[Any, Parser]: The service and the parser.
     """
     if site == Site.OLX:
-        service = OlxService()
-        parser = olx_parser.OlxParser()
-
+        return OlxService(), Parser(olx_parser.OlxParser())
     elif site == Site.OTODOM:
-        service = OtodomService()
-        parser = otodom_parser.OtodomParser()
-
+        return OtodomService(), Parser(otodom_parser.OtodomParser())
     else:
         raise ValueError(f"Unknown site: {site}")
 
-    for d in service.get_all_unparsed():
+
+def get_sink(sink: Sink) -> Callable[[List[Offer]], Optional[Set[str]]]:
+    """
+    Get the function storing parsed offers.
+
+    Args:
+        sink (Sink): Where offers are stored, the app API or directly the app database.
+
+    Returns:
+        Callable[[List[Offer]], Optional[Set[str]]]: Function saving a batch of offers, returning the URLs
+            of the offers rejected as invalid, or None if saving failed.
+    """
+    if sink == Sink.DB:
+        return DatabaseSink().save
+    return save_offer
+
+
+def parse_documents(
+        service: Any,
+        parser: Parser,
+        read_batch_size: int,
+        id_range: Optional[Tuple[Any, Any]] = None,
+) -> Iterator[Tuple[Any, List[Offer]]]:
+    """
+    Stream unparsed pages from the database and parse them one by one.
+
+    Args:
+        service (Any): Service of the parsed site.
+        parser (Parser): Parser of the site.
+        read_batch_size (int): Number of pages fetched from the database per round trip.
+        id_range (Optional[Tuple[Any, Any]]): Lowest and highest page id to parse, both inclusive.
+
+    Returns:
+        Iterator[Tuple[Any, List[Offer]]]: The id of every page with the offers parsed from it.
+    """
+    for d in service.iter_unparsed(read_batch_size, id_range):
         # Get 'data' field from collection
-        data = d.get("data", None)
+        data = decompress(d.get("data", None), d.get("encoding", None))
         # Get 'category' and 'sub_category' fields from collection
         category, sub_category = d.get("category", None), d.get("sub_category", None)
 
-        parse = Parser(parser).parse(data, category=category, sub_category=sub_category)
-        save_offer(parse)
-        service.update_parsed(d.get("id"))
-        print(f"Offer with id: {d.get('_id')} parsed")
+        yield d.get("_id"), parser.parse(data, category=category, sub_category=sub_category) or []
+
+
+def accepted_pages(pages: List[Tuple[Any, List[Offer]]], rejected: Set[str]) -> List[Any]:
+    """
+    Get the pages whose offers were all saved, reporting the pages with rejected offers.
+
+    Pages with rejected offers are not marked as parsed, so they stay visible as unparsed
+    and are parsed again once the parser or the server is fixed.
+
+    Args:
+        pages (List[Tuple[Any, List[Offer]]]): The id of every saved page with its offers.
+        rejected (Set[str]): URLs of the offers rejected as invalid.
+
+    Returns:
+        List[Any]: Ids of the pages to mark as parsed.
+    """
+    ids = []
+    for _id, offers in pages:
+        page_rejected = [offer.url for offer in offers if offer.url in rejected]
+        if page_rejected:
+            print(f"Page {_id} left unparsed, {len(page_rejected)} of its offers were rejected")
+        else:
+            ids.append(_id)
+    return ids
+
+
+def run_parser(
+        site: Site,
+        sink: Sink = Sink.API,
+        batch_size: int = settings.PARSER_BATCH_SIZE,
+        read_batch_size: int = settings.PARSER_READ_BATCH_SIZE,
+) -> None:
+    """
+    Run the parser for the specified site.
+
+    Pages are streamed from the database and their offers are posted in batches of about
+    `batch_size`. Pages are marked as parsed only after their offers were accepted by the
+    server, so if posting fails the run stops and the remaining pages are parsed next time.
+    Pages with offers rejected as invalid are left unparsed too, without stopping the run.
+
+    Args:
+        site (Site): The site to parse.
+        sink (Sink): Where offers are stored.
+        batch_size (int): Number of offers posted at once, batches end on a page boundary.
+        read_batch_size (int): Number of pages fetched from the database per round trip.
+
+    Returns:
+        None
+    """
+    service, parser = get_site(site)
+    save = get_sink(sink)
+
+    started_at = time.perf_counter()
+    pages = offers_count = 0
+    pending_pages, pending_offers = [], []
+
+    def flush() -> bool:
+        nonlocal pages, offers_count
+        rejected = save(pending_offers) if pending_offers else set()
+        if rejected is None:
+            print(f"Saving offers failed, {len(pending_pages)} pages left unparsed")
+            return False
+        ids = accepted_pages(pending_pages, rejected)
+        if ids:
+            service.update_many_parsed(ids)
+        pages += len(ids)
+        offers_count += sum(offer.url not in rejected for offer in pending_offers)
+        pending_pages.clear()
+        pending_offers.clear()
+        return True
+
+    for _id, offers in parse_documents(service, parser, read_batch_size):
+        pending_pages.append((_id, offers))
+        pending_offers.extend(offers)
+        if len(pending_offers) >= batch_size and not flush():
+            break
+    else:
+        flush()
+
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"Parsed {pages} pages, {offers_count} offers in {elapsed:.1f}s, "
+        f"{offers_count / elapsed if elapsed else 0:.1f} offers/sec"
+    )
+
+
+def get_shards(service: Any, shard_size: int) -> Iterator[Tuple[Any, Any]]:
+    """
+    Split the unparsed pages into ranges of consecutive ids.
+
+    Args:
+        service (Any): Service of the parsed site.
+        shard_size (int): Number of pages per range.
+
+    Returns:
+        Iterator[Tuple[Any, Any]]: Lowest and highest id of every range, in ascending order.
+    """
+    ids = service.iter_unparsed_ids()
+    while shard := list(islice(ids, shard_size)):
+        yield shard[0], shard[-1]
+
+
+_worker_site: Optional[Tuple[Any, Parser, Callable[[List[Offer]], Optional[Set[str]]]]] = None
+
+
+def _init_worker(site: Site, sink: Sink) -> None:
+    """
+    Prepare a worker process: drop the MongoDB client inherited from the parent and create the site's parser.
+
+    Args:
+        site (Site): The site to parse.
+        sink (Sink): Where offers are stored.
+    """
+    global _worker_site
+    close_client()
+    _worker_site = (*get_site(site), get_sink(sink))
+
+
+def _parse_shard(id_range: Tuple[Any, Any], batch_size: int, read_batch_size: int) -> Tuple[List[Any], int, bool]:
+    """
+    Parse the pages of one id range in a worker process and post their offers.
+
+    Args:
+        id_range (Tuple[Any, Any]): Lowest and highest page id, both inclusive.
+        batch_size (int): Number of offers posted at once.
+        read_batch_size (int): Number of pages fetched from the database per round trip.
+
+    Returns:
+        Tuple[List[Any], int, bool]: Ids of the pages to mark as parsed, number of saved offers and whether
+            saving succeeded. When it failed, the ids of the pages read so far are returned instead.
+    """
+    service, parser, save = _worker_site
+    read_ids, accepted_ids = [], []
+    pages, offers = [], []
+    offers_count = 0
+
+    def flush() -> bool:
+        nonlocal offers_count
+        rejected = save(offers) if offers else set()
+        if rejected is None:
+            return False
+        accepted_ids.extend(accepted_pages(pages, rejected))
+        offers_count += sum(offer.url not in rejected for offer in offers)
+        pages.clear()
+        offers.clear()
+        return True
+
+    for _id, parsed in parse_documents(service, parser, read_batch_size, id_range):
+        read_ids.append(_id)
+        pages.append((_id, parsed))
+        offers.extend(parsed)
+        if len(offers) >= batch_size and not flush():
+            return read_ids, offers_count, False
+    if not flush():
+        return read_ids, offers_count, False
+    return accepted_ids, offers_count, True
+
+
+def run_parser_parallel(
+        site: Site,
+        workers: int,
+        sink: Sink = Sink.API,
+        shard_size: int = settings.PARSER_SHARD_SIZE,
+        batch_size: int = settings.PARSER_BATCH_SIZE,
+        read_batch_size: int = settings.PARSER_READ_BATCH_SIZE,
+) -> None:
+    """
+    Run the parser for the specified site in a pool of worker processes.
+
+    Unparsed pages are split into ranges of consecutive ids, every worker parses a range and
+    posts its offers. Ranges are acknowledged in id order: the pages of a range are marked as
+    parsed only once it and all ranges before it were saved, so after a failure everything
+    from the first failed range on is parsed again by the next run. Posting is idempotent,
+    offers already saved by a later range are skipped by the server. Pages with offers rejected
+    as invalid are left unparsed without failing their range.
+
+    Args:
+        site (Site): The site to parse.
+        workers (int): Number of worker processes.
+        sink (Sink): Where offers are stored.
+        shard_size (int): Number of pages per range.
+        batch_size (int): Number of offers posted at once.
+        read_batch_size (int): Number of pages fetched from the database per round trip.
+
+    Returns:
+        None
+    """
+    shards = list(get_shards(get_site(site)[0], shard_size))
+    if not shards:
+        print("Nothing to parse")
+        return
+    # Workers must not inherit open connections, the parent reconnects after the fork
+    close_client()
+
+    started_at = time.perf_counter()
+    pages = offers_count = 0
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(site, sink)) as pool:
+        service, _ = get_site(site)
+        parse_shard = partial(_parse_shard, batch_size=batch_size, read_batch_size=read_batch_size)
+        for ids, shard_offers, saved in pool.imap(parse_shard, shards):
+            if not saved:
+                print(f"Saving offers failed, pages from id {ids[0]} on left unparsed")
+                pool.terminate()
+                break
+            service.update_many_parsed(ids)
+            pages += len(ids)
+            offers_count += shard_offers
+
+    elapsed = time.perf_counter() - started_at
+    print(
+        f"Parsed {pages} pages, {offers_count} offers in {elapsed:.1f}s with {workers} workers, "
+        f"{offers_count / elapsed if elapsed else 0:.1f} offers/sec"
+    )
@@ -2,18 +2,19 @@ from data.site import Site
 from scrape import olx_scraper, scraper, otodom_scraper
 
 
-def run_scrape(site: Site) -> None:
+def run_scrape(site: Site, incremental: bool = False) -> None:
     """
     Run scraping for the specified site.
 
     Args:
         site (Site): The site to scrape.
+        incremental (bool): Stop at already known offers, only supported for OLX.
 
     Returns:
         None
     """
     if site == Site.OLX:
-        site_scraper = olx_scraper.OlxScraper()
+        site_scraper = olx_scraper.OlxScraper(incremental=incremental)
     elif site == Site.OTODOM:
         site_scraper = otodom_scraper.OtodomScraper()
     else:
@@ -0,0 +1,110 @@
+import gzip
+import time
+from typing import Any, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional, gzip is used without it
+    zstandard = None
+
+GZIP = "gzip"
+ZSTD = "zstd"
+
+
+def available_encodings() -> Tuple[str, ...]:
+    """
+    Get the compression encodings supported in this environment.
+
+    Returns:
+        Tuple[str, ...]: Encoding names.
+    """
+    return (GZIP, ZSTD) if zstandard else (GZIP,)
+
+
+def resolve_encoding(encoding: Optional[str]) -> Optional[str]:
+    """
+    Map a configured encoding to a supported one, falling back from zstd to gzip.
+
+    Args:
+        encoding (Optional[str]): Configured encoding, "none" or empty disables compression.
+
+    Returns:
+        Optional[str]: Encoding to use, None for no compression.
+    """
+    if not encoding or encoding == "none":
+        return None
+    if encoding == ZSTD and not zstandard:
+        print("zstandard is not installed, compressing with gzip")
+        return GZIP
+    if encoding not in (GZIP, ZSTD):
+        raise ValueError(f"Unknown compression: {encoding}")
+    return encoding
+
+
+def compress(raw: bytes, encoding: Optional[str]) -> bytes:
+    """
+    Compress a raw payload.
+
+    Args:
+        raw (bytes): The payload.
+        encoding (Optional[str]): Encoding returned by `resolve_encoding`.
+
+    Returns:
+        bytes: The compressed payload, or the raw one without encoding.
+    """
+    if encoding == ZSTD:
+        return zstandard.ZstdCompressor(level=3).compress(raw)
+    if encoding == GZIP:
+        return gzip.compress(raw, compresslevel=6)
+    return raw
+
+
+def decompress(data: Any, encoding: Optional[str]) -> Any:
+    """
+    Restore a stored payload.
+
+    Documents stored before compression was introduced keep their data (a parsed JSON
+    document or a string) and are returned unchanged.
+
+    Args:
+        data (Any): Stored payload.
+        encoding (Optional[str]): Encoding the payload was stored with.
+
+    Returns:
+        Any: The decoded payload, a string for raw payloads.
+    """
+    if not isinstance(data, bytes):
+        return data
+    if encoding == ZSTD:
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif encoding == GZIP:
+        data = gzip.decompress(data)
+    return data.decode("utf-8")
+
+
+def compare_encodings(payloads: List[bytes]) -> None:
+    """
+    Print the compression ratio and throughput of every available encoding on sample payloads.
+
+    Args:
+        payloads (List[bytes]): Raw payloads.
+    """
+    raw_size = sum(len(payload) for payload in payloads)
+    print(f"{len(payloads)} pages, {raw_size / 1024 / 1024:.2f} MiB raw")
+    for encoding in available_encodings():
+        started_at = time.perf_counter()
+        compressed = [compress(payload, encoding) for payload in payloads]
+        compress_time = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        for data in compressed:
+            decompress(data, encoding)
+        decompress_time = time.perf_counter() - started_at
+
+        size = sum(len(data) for data in compressed)
+        raw_mib = raw_size / 1024 / 1024
+        print(
+            f"{encoding}: {size / 1024 / 1024:.2f} MiB ({raw_size / size if size else 0:.1f}x), "
+            f"compress {raw_mib / compress_time if compress_time else 0:.1f} MiB/sec, "
+            f"decompress {raw_mib / decompress_time if decompress_time else 0:.1f} MiB/sec"
+        )